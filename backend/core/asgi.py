@@ -3,6 +3,18 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The async endpoints (e.g. /api/transactions/async/dashboard/) only overlap
+their queries when served by an ASGI server, for example:
+
+    gunicorn core.asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+
+or, for local development:
+
+    uvicorn core.asgi:application --reload
+
+Under WSGI (core/wsgi.py) they still work, each request just runs its
+event loop in the worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +26,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Build the in-process customer autocomplete index before the first request
+from transactions.autocomplete import customer_index  # noqa: E402
+
+customer_index.warm()
@@ -0,0 +1,133 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+# Responses whose body compresses well. Parquet, gzip downloads and images
+# are already compressed and pass through untouched.
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|vnd\.apache\.arrow\.stream))'
+)
+
+_ACCEPT_ENCODING_ITEM = re.compile(r'\s*([A-Za-z0-9*_-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*')
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header; unparseable q counts as 0"""
+    encodings = {}
+    for item in (header or '').split(','):
+        match = _ACCEPT_ENCODING_ITEM.fullmatch(item)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) is not None else 1.0
+        except ValueError:
+            q = 0.0
+        encodings[match.group(1).lower()] = q
+    return encodings
+
+
+def choose_encoding(header):
+    """zstd or gzip, whichever the client weighs higher (zstd on a tie), or None"""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    offered = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = encodings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def zstd_sequence(sequence, level):
+    """Compress an iterable of bytes into one zstd frame, flushing after each chunk"""
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    for chunk in sequence:
+        data = compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with zstd or gzip according to Accept-Encoding.
+
+    Like Django's GZipMiddleware, but also speaks zstd (when the zstandard
+    package is installed), only compresses text-like content types, and
+    skips bodies smaller than COMPRESSION_MIN_SIZE bytes as well as
+    resumable (Accept-Ranges: bytes) downloads. Streaming responses (the
+    CSV exports) are compressed chunk by chunk as they are sent, so they
+    keep streaming. Keep it first in MIDDLEWARE so it sees the final
+    response.
+    """
+
+    # Random bytes in the gzip header, as GZipMiddleware adds against BREACH
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.zstd_level = getattr(settings, 'COMPRESSION_ZSTD_LEVEL', 3)
+
+    def compress(self, coding, content):
+        if coding == 'zstd':
+            return zstandard.ZstdCompressor(level=self.zstd_level).compress(content)
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def compress_stream(self, coding, chunks):
+        if coding == 'zstd':
+            return zstd_sequence(chunks, self.zstd_level)
+        return compress_sequence(chunks, max_random_bytes=self.max_random_bytes)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        # Ranged downloads address bytes of the stored file; compressing would shift them
+        if response.get('Accept-Ranges') == 'bytes':
+            return response
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def compressed():
+                    # One self-contained member/frame per chunk; both formats allow concatenation
+                    async for chunk in original_iterator:
+                        yield self.compress(coding, chunk)
+
+                response.streaming_content = compressed()
+            else:
+                response.streaming_content = self.compress_stream(coding, response.streaming_content)
+            # The compressed length is not known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            compressed_content = self.compress(coding, response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # A strong ETag names the uncompressed bytes; weaken it as GZipMiddleware does
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
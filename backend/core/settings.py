@@ -55,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it compresses the final response (zstd/gzip by Accept-Encoding)
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -65,6 +67,20 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+# Files written by background export jobs (transactions.export_jobs)
+EXPORT_ROOT = BASE_DIR / 'exports'
+# Run export jobs on a thread of the web process; turn off when a separate
+# `python manage.py run_export_jobs --loop` worker runs them
+EXPORT_JOBS_IN_PROCESS = True
+
+# Delete tombstones (transactions.DeletedRecord) older than this with
+# `python manage.py purge_sync_tombstones`; sync tokens older than this get
+# a full snapshot, since the deletes they would need may be gone
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -86,6 +102,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 # Database
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process customer autocomplete index before the first request
+from transactions.autocomplete import customer_index  # noqa: E402
+
+customer_index.warm()
@@ -0,0 +1,22 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def restore_search_triggers(sender, using='default', verbosity=1, **kwargs):
+    from .search import ensure_search_triggers
+
+    restored = ensure_search_triggers(using)
+    if restored and verbosity:
+        print(f"Restored search triggers dropped by a table rebuild: {', '.join(restored)}")
+
+
+class TransactionsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'transactions'
+
+    def ready(self):
+        # Register signal handlers that keep the in-process indexes current
+        from . import signals  # noqa: F401
+
+        # A migration that rebuilds the transactions table drops the FTS5 triggers
+        post_migrate.connect(restore_search_triggers, sender=self)
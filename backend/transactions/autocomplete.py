@@ -0,0 +1,180 @@
+import heapq
+import math
+import threading
+from bisect import bisect_left, insort
+
+from django.db import DatabaseError
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from .customers import normalize_customer_name
+
+# Sorts after any character a customer name can contain; closes a prefix range
+_PREFIX_END = '\U0010ffff'
+
+
+class CustomerNameIndex:
+    """
+    In-process prefix index of customer names for autocomplete.
+
+    Every known spelling (CustomerAlias) is stored normalized in a sorted
+    array, once whole and once from each later word, so "aung" finds
+    "Ko Aung". A prefix is two bisects; the candidates are ranked by how
+    often and how recently the customer was used. Like the profit index it
+    is per process, kept current by the signal handlers in
+    transactions.signals, and rebuilt with rebuild() after bulk changes.
+    """
+
+    # Ranking is "frecency": log2(1 + uses) + days of last use / HALF_LIFE_DAYS,
+    # so doubling the use count is worth HALF_LIFE_DAYS of recency. The score
+    # depends only on stored values, so the order never has to be recomputed
+    # as time passes.
+    HALF_LIFE_DAYS = 14
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []
+        self._owners = []
+        self._stats = None
+        # (-score, name, customer_id) of every customer, best first, for empty prefixes
+        self._ranked = []
+
+    @property
+    def is_built(self):
+        return self._stats is not None
+
+    def _customer_stats(self, customers):
+        from .models import Transaction
+
+        latest = Transaction.objects.filter(customer_ref=OuterRef('pk')).order_by('-date_time', '-id')
+        return {
+            row['id']: {
+                'customer_id': row['id'],
+                'name': row['name'],
+                'transaction_count': row['transaction_count'],
+                'last_used': row['last_used'],
+                'last_rate': row['last_rate'],
+                'last_type': row['last_type'],
+                'score': self._score(row['transaction_count'], row['last_used']),
+            }
+            for row in customers.annotate(
+                transaction_count=Count('transactions'),
+                last_used=Max('transactions__date_time'),
+                last_rate=Subquery(latest.values('rate')[:1]),
+                last_type=Subquery(latest.values('transaction_type')[:1]),
+            ).values('id', 'name', 'transaction_count', 'last_used', 'last_rate', 'last_type')
+        }
+
+    @staticmethod
+    def _index_keys(normalized):
+        words = normalized.split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def rebuild(self):
+        """Load every customer and alias from the database"""
+        from .models import Customer, CustomerAlias
+
+        stats = self._customer_stats(Customer.objects.all())
+        entries = sorted(
+            (key, customer_id)
+            for normalized, customer_id in CustomerAlias.objects.values_list('normalized', 'customer_id')
+            for key in self._index_keys(normalized)
+        )
+        ranked = sorted(self._rank_entry(s) for s in stats.values() if s['transaction_count'])
+        with self._lock:
+            self._keys = [key for key, _ in entries]
+            self._owners = [customer_id for _, customer_id in entries]
+            self._stats = stats
+            self._ranked = ranked
+
+    def warm(self):
+        """Build at worker start; if the database is not ready the first lookup builds it"""
+        try:
+            self.rebuild()
+        except DatabaseError as e:
+            print(f"Customer autocomplete index not built at startup: {e}")
+
+    def _ensure_built(self):
+        if not self.is_built:
+            with self._lock:
+                if not self.is_built:
+                    self.rebuild()
+
+    def refresh_customer(self, customer_id):
+        """Re-read one customer's aliases and usage after a write"""
+        from .models import Customer, CustomerAlias
+
+        if not self.is_built or customer_id is None:
+            return
+        stats = self._customer_stats(Customer.objects.filter(id=customer_id))
+        keys = set()
+        for normalized in CustomerAlias.objects.filter(customer_id=customer_id).values_list('normalized', flat=True):
+            keys |= self._index_keys(normalized)
+
+        with self._lock:
+            previous = self._stats.pop(customer_id, None)
+            if previous and previous['transaction_count']:
+                entry = self._rank_entry(previous)
+                position = bisect_left(self._ranked, entry)
+                if position < len(self._ranked) and self._ranked[position] == entry:
+                    del self._ranked[position]
+            if customer_id in stats:
+                self._stats[customer_id] = stats[customer_id]
+                if stats[customer_id]['transaction_count']:
+                    insort(self._ranked, self._rank_entry(stats[customer_id]))
+
+            known = {key for key, owner in zip(self._keys, self._owners) if owner == customer_id}
+            if known - keys:
+                # Removed spellings (merge or delete) are rare; re-lay the arrays
+                entries = [
+                    (key, owner) for key, owner in zip(self._keys, self._owners)
+                    if owner != customer_id or key in keys
+                ]
+                self._keys = [key for key, _ in entries]
+                self._owners = [owner for _, owner in entries]
+            for key in sorted(keys - known):
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._owners.insert(position, customer_id)
+
+    def _score(self, transaction_count, last_used):
+        score = math.log2(1 + transaction_count)
+        if last_used:
+            score += last_used.timestamp() / 86400 / self.HALF_LIFE_DAYS
+        return score
+
+    @staticmethod
+    def _rank_entry(stats):
+        return (-stats['score'], stats['name'], stats['customer_id'])
+
+    def suggest(self, prefix, limit=10):
+        """Top `limit` customers with a spelling or word starting with prefix"""
+        self._ensure_built()
+        prefix = normalize_customer_name(prefix)
+
+        with self._lock:
+            if not prefix:
+                best = [self._stats[entry[2]] for entry in self._ranked[:limit]]
+            else:
+                lo = bisect_left(self._keys, prefix)
+                hi = bisect_left(self._keys, prefix + _PREFIX_END, lo)
+                candidates = {self._owners[i] for i in range(lo, hi)}
+                best = heapq.nsmallest(limit, (
+                    self._rank_entry(self._stats[c]) for c in candidates
+                    if c in self._stats and self._stats[c]['transaction_count']
+                ))
+                best = [self._stats[entry[2]] for entry in best]
+
+        return [
+            {
+                'customer_id': s['customer_id'],
+                'name': s['name'],
+                'transaction_count': s['transaction_count'],
+                'last_used': s['last_used'],
+                'last_rate': float(s['last_rate']) if s['last_rate'] is not None else None,
+                'last_type': s['last_type'],
+            }
+            for s in best
+        ]
+
+
+customer_index = CustomerNameIndex()
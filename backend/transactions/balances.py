@@ -0,0 +1,90 @@
+"""
+Daily balance totals over a date range.
+
+Balances and exchange rates are entered on some days only. The timeline
+carries each account's last entered balance, and the last saved rate,
+forward over the days in between. It reads two windowed queries (the
+balance rows and the rate rows in effect during the range) and makes one
+pass over them in date order, instead of the per-day lookups of
+balance_summary.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import F, Value, Window
+from django.db.models.functions import Lead
+
+# Rate used before any rate has been saved, as in balance_summary
+DEFAULT_RATE = Decimal('0.8')
+MAX_TIMELINE_DAYS = 3660
+
+
+def _in_effect(queryset, end_date, start_date, partition_by=None):
+    """
+    Rows dated up to end_date that are still current on start_date or
+    later: the window gives each row the date of the next one (of the same
+    account), and a row superseded before start_date is never shown.
+    """
+    next_date = Window(
+        Lead('date', default=Value(date.max)),
+        partition_by=partition_by, order_by=F('date').asc()
+    )
+    return queryset.filter(date__lte=end_date).annotate(next_date=next_date).filter(
+        next_date__gt=start_date
+    ).order_by('date')
+
+
+def balance_timeline(start_date, end_date):
+    """
+    One entry per day from start_date to end_date with the THB and MMK
+    totals over all accounts, the rate and the MMK total in THB. Days
+    before the first entered balance are left out. Unlike balance_summary,
+    which shows only the accounts entered on the day it falls back to, an
+    account missing from a day's entries keeps its last balance.
+    """
+    from .models import DailyBalance, DailyExchangeRate
+
+    balances = _in_effect(
+        DailyBalance.objects.all(), end_date, start_date, partition_by=[F('bank_account_id')]
+    ).values_list('date', 'bank_account_id', 'bank_account__currency', 'balance')
+    rates = _in_effect(DailyExchangeRate.objects.all(), end_date, start_date).values_list('date', 'rate')
+
+    balance_rows = iter(balances)
+    rate_rows = iter(rates)
+    next_balance = next(balance_rows, None)
+    next_rate = next(rate_rows, None)
+
+    current = {}
+    totals = {'THB': Decimal('0'), 'MMK': Decimal('0')}
+    rate = DEFAULT_RATE
+    rate_date = None
+    timeline = []
+
+    day = start_date
+    while day <= end_date:
+        entered = False
+        while next_balance is not None and next_balance[0] <= day:
+            balance_date, account_id, currency, balance = next_balance
+            totals[currency] += balance - current.get(account_id, Decimal('0'))
+            current[account_id] = balance
+            entered = entered or balance_date == day
+            next_balance = next(balance_rows, None)
+        while next_rate is not None and next_rate[0] <= day:
+            rate_date, rate = next_rate
+            next_rate = next(rate_rows, None)
+
+        if current:
+            mmk_in_thb = totals['MMK'] / rate if rate > 0 else Decimal('0')
+            timeline.append({
+                'date': day,
+                'thb_total': float(totals['THB']),
+                'mmk_total': float(totals['MMK']),
+                'mmk_in_thb': float(mmk_in_thb),
+                'grand_total_thb': float(totals['THB'] + mmk_in_thb),
+                'rate': float(rate),
+                # False when the day shows balances or a rate carried from an earlier day
+                'balances_entered': entered,
+                'rate_saved': rate_date == day,
+            })
+        day += timedelta(days=1)
+    return timeline
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+def table_version(model, collection=None):
+    """
+    Version of one table: row count, latest updated_at and, for a synced
+    collection, its latest deletion (the count alone misses a delete
+    followed by an insert).
+    """
+    from .models import DeletedRecord
+
+    stats = model.objects.order_by().aggregate(count=Count('id'), changed=Max('updated_at'))
+    parts = [str(stats['count']), stats['changed'] and stats['changed'].isoformat()]
+    if collection is not None:
+        deleted = DeletedRecord.objects.filter(collection=collection).aggregate(latest=Max('deleted_at'))['latest']
+        parts.append(deleted and deleted.isoformat())
+    return ':'.join(str(part) for part in parts)
+
+
+def data_version():
+    """
+    Version of the transaction data. Cached results include it in their
+    key, so a write makes them unreachable. It is read from the database
+    rather than kept in the cache, which is per process (LocMemCache), so a
+    write in one worker invalidates the results cached by every other
+    worker too.
+    """
+    from .models import Transaction
+
+    return table_version(Transaction, 'transactions')
+
+
+def get_or_build(key_parts, builder, timeout=24 * 60 * 60):
+    """Return the cached value for key_parts at the current data version, building it on a miss"""
+    key = ':'.join(['transactions', data_version()] + [str(part) for part in key_parts])
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
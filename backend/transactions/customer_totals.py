@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+from django.db import transaction as db_transaction
+from django.db.models import Max, Min, Sum
+
+from .models import Customer, CustomerMonthlyTotal
+from .reports import build_report_queryset
+
+TOTAL_METRICS = {
+    'count': 'transaction_count',
+    'thb_volume': 'thb_volume',
+    'mmk_volume': 'mmk_volume',
+    'profit': 'profit',
+    'first_seen': 'first_seen',
+    'last_seen': 'last_seen',
+}
+
+LEADERBOARD_ORDERING = ('thb_volume', 'mmk_volume', 'profit', 'transaction_count')
+
+
+def month_floor(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def parse_month(value):
+    """Parse YYYY-MM (or YYYY-MM-DD) into the first day of that month"""
+    for fmt in ('%Y-%m', '%Y-%m-%d'):
+        try:
+            return month_floor(datetime.strptime(value, fmt).date())
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Invalid month: {value}. Use YYYY-MM.")
+
+
+def refresh_customer_totals(customers=None, start_date=None, end_date=None, batch_size=1000):
+    """
+    Recompute CustomerMonthlyTotal rows from transactions with one grouped query.
+
+    The scope is every month touched by start_date..end_date (all months when
+    omitted), optionally limited to some customer ids. With no arguments this
+    is a full rebuild. Transactions not yet linked to a Customer are skipped
+    until backfill_customers has run.
+    """
+    filters = {}
+    scope = CustomerMonthlyTotal.objects.all()
+    if start_date:
+        first_month = month_floor(start_date)
+        filters['start_date'] = first_month
+        scope = scope.filter(month__gte=first_month)
+    if end_date:
+        last_month = month_floor(end_date)
+        filters['end_date'] = next_month(last_month) - timedelta(days=1)
+        scope = scope.filter(month__lte=last_month)
+
+    grouped = build_report_queryset(list(TOTAL_METRICS), ['customer', 'month'], filters)
+    grouped = grouped.filter(customer_ref__isnull=False)
+    names = Customer.objects.all()
+    if customers is not None:
+        customers = list(set(customers))
+        grouped = grouped.filter(customer_ref__in=customers)
+        scope = scope.filter(customer_ref__in=customers)
+        names = names.filter(id__in=customers)
+    names = dict(names.values_list('id', 'name'))
+
+    with db_transaction.atomic():
+        scope.delete()
+        batch = []
+        for row in grouped.iterator(chunk_size=batch_size):
+            batch.append(CustomerMonthlyTotal(
+                customer_ref_id=row['customer_ref_id'],
+                customer=names.get(row['customer_ref_id'], ''),
+                month=row['month'],
+                **{field: row[metric] for metric, field in TOTAL_METRICS.items()}
+            ))
+            if len(batch) >= batch_size:
+                CustomerMonthlyTotal.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            CustomerMonthlyTotal.objects.bulk_create(batch)
+
+
+def leaderboard(start_month, end_month, order_by='thb_volume', limit=10):
+    """
+    Top customers between two months (inclusive) by merging their monthly rows
+    """
+    if order_by not in LEADERBOARD_ORDERING:
+        raise ValueError(f"order_by must be one of {', '.join(LEADERBOARD_ORDERING)}")
+
+    rows = (
+        CustomerMonthlyTotal.objects
+        .filter(month__gte=start_month, month__lte=end_month)
+        .order_by()
+        .values('customer_ref_id')
+        .annotate(
+            customer=Max('customer'),
+            transaction_count=Sum('transaction_count'),
+            thb_volume=Sum('thb_volume'),
+            mmk_volume=Sum('mmk_volume'),
+            profit=Sum('profit'),
+            first_seen=Min('first_seen'),
+            last_seen=Max('last_seen'),
+        )
+        .order_by(f'-{order_by}', 'customer_ref_id')[:limit]
+    )
+    return [
+        {
+            'customer_id': row['customer_ref_id'],
+            'customer': row['customer'],
+            'transaction_count': row['transaction_count'],
+            'thb_volume': float(row['thb_volume']),
+            'mmk_volume': float(row['mmk_volume']),
+            'profit': float(row['profit']),
+            'first_seen': row['first_seen'],
+            'last_seen': row['last_seen'],
+        }
+        for row in rows
+    ]
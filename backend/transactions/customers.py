@@ -0,0 +1,110 @@
+import re
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.utils import timezone
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_customer_name(name):
+    """Key that spellings of the same name share: trimmed, single-spaced, case-folded"""
+    return _WHITESPACE.sub(' ', (name or '').strip()).casefold()
+
+
+def resolve_customer_ids(names):
+    """
+    Map each name to a Customer id through its alias, creating a customer
+    (with the name as its canonical spelling) for names not seen before.
+    """
+    from .models import Customer, CustomerAlias
+
+    keys = {name: normalize_customer_name(name) for name in set(names)}
+    found = dict(
+        CustomerAlias.objects.filter(normalized__in=set(keys.values()))
+        .values_list('normalized', 'customer_id')
+    )
+
+    for name, key in keys.items():
+        if key in found:
+            continue
+        try:
+            with db_transaction.atomic():
+                customer = Customer.objects.create(name=_WHITESPACE.sub(' ', (name or '').strip()))
+                CustomerAlias.objects.create(customer=customer, name=customer.name, normalized=key)
+            found[key] = customer.id
+        except IntegrityError:
+            # Another writer created the same alias first
+            found[key] = CustomerAlias.objects.get(normalized=key).customer_id
+
+    return {name: found[key] for name, key in keys.items()}
+
+
+def customer_id_for(name):
+    """Existing Customer id for a name (any known spelling), or None"""
+    from .models import CustomerAlias
+
+    return (
+        CustomerAlias.objects.filter(normalized=normalize_customer_name(name))
+        .values_list('customer_id', flat=True).first()
+    )
+
+
+def assign_customer_refs(transactions):
+    """Set customer_ref on unsaved Transaction objects, for bulk_create() paths"""
+    ids = resolve_customer_ids([tx.customer for tx in transactions])
+    for tx in transactions:
+        tx.customer_ref_id = ids[tx.customer]
+
+
+def backfill_customer_refs(chunk_size=2000, only_missing=True):
+    """
+    Point transactions at their Customer in chunks of chunk_size rows,
+    walking the primary key so each chunk is one indexed range read.
+    Returns the number of transactions updated.
+    """
+    from .models import Transaction
+
+    queryset = Transaction.objects.order_by('id')
+    if only_missing:
+        queryset = queryset.filter(customer_ref__isnull=True)
+
+    last_id = 0
+    updated = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).values_list('id', 'customer')[:chunk_size])
+        if not rows:
+            return updated
+        last_id = rows[-1][0]
+
+        ids = resolve_customer_ids([name for _, name in rows])
+        by_customer = defaultdict(list)
+        for pk, name in rows:
+            by_customer[ids[name]].append(pk)
+        # updated_at moves the cache data version and delta sync past the relinked rows
+        now = timezone.now()
+        with db_transaction.atomic():
+            for customer_id, pks in by_customer.items():
+                Transaction.objects.filter(id__in=pks).update(customer_ref_id=customer_id, updated_at=now)
+        updated += len(rows)
+
+
+def merge_customers(source, target):
+    """
+    Fold customer `source` into `target`: its aliases and transactions move
+    over and the source row is deleted. Returns the number of transactions moved.
+    """
+    from .autocomplete import customer_index
+    from .customer_totals import refresh_customer_totals
+    from .models import CustomerAlias, Transaction
+
+    source_id = source.id
+    with db_transaction.atomic():
+        CustomerAlias.objects.filter(customer=source).update(customer=target)
+        # updated_at marks the rows changed for delta sync and export artifacts
+        moved = Transaction.objects.filter(customer_ref=source).update(customer_ref=target, updated_at=timezone.now())
+        source.delete()
+        refresh_customer_totals([target.id])
+        for customer_id in (source_id, target.id):
+            db_transaction.on_commit(lambda customer_id=customer_id: customer_index.refresh_customer(customer_id))
+    return moved
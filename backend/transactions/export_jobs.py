@@ -0,0 +1,290 @@
+"""
+Background export jobs.
+
+Large exports (years of transactions) outlast the web request limit, so
+they are written to a file under EXPORT_ROOT by a worker and downloaded
+once done. The worker is a daemon thread of the web process (when
+EXPORT_JOBS_IN_PROCESS is on) and/or the run_export_jobs management
+command; both claim jobs with a conditional UPDATE, so a job runs once.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from .caching import data_version, table_version
+from .exports import (
+    COLUMNAR_FORMATS, CSV_FORMATS, DAILY_SUMMARY_CSV_HEADER, DAILY_SUMMARY_XLSX_FORMATS, TRANSACTION_CSV_HEADER,
+    XLSX_CONTENT_TYPE, ExportError, csv_stream, daily_summary_csv_rows, daily_summary_range,
+    daily_summary_xlsx_rows, transaction_csv_rows, transaction_workbook_sheets, transactions_export_queryset,
+    write_columnar, write_xlsx
+)
+
+# Formats each kind of export can be generated in
+EXPORT_FORMATS = {
+    'transactions': (*CSV_FORMATS, *COLUMNAR_FORMATS, 'xlsx'),
+    'daily_summary': (*CSV_FORMATS, 'xlsx'),
+}
+PERIODS = {
+    'transactions': ('all', 'today', 'week', 'month'),
+    'daily_summary': ('all', 'month'),
+}
+# A job still 'running' after this long died with its worker and is run again
+STALE_AFTER = timedelta(hours=1)
+# How long the in-process worker waits for more jobs before its thread exits
+WORKER_IDLE_SECONDS = 5
+
+
+def export_root():
+    return Path(getattr(settings, 'EXPORT_ROOT', Path(settings.BASE_DIR) / 'exports'))
+
+
+def _extension(file_format):
+    return COLUMNAR_FORMATS[file_format][0] if file_format in COLUMNAR_FORMATS else file_format
+
+
+def content_type(file_format):
+    if file_format in COLUMNAR_FORMATS:
+        return COLUMNAR_FORMATS[file_format][1]
+    if file_format == 'xlsx':
+        return XLSX_CONTENT_TYPE
+    return 'application/gzip' if file_format == 'csv.gz' else 'text/csv'
+
+
+def artifact_path(job):
+    return export_root() / f'{job.id}.{_extension(job.file_format)}'
+
+
+def _parse_date(name, value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ExportError(f'Invalid {name}: {value}. Use YYYY-MM-DD.')
+
+
+def normalize_params(kind, file_format, params):
+    """
+    The parameters that decide an export's content, validated and in
+    canonical form, so equal requests hash to the same artifact key.
+    Relative periods are pinned to today's date.
+    """
+    if kind not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export kind: {kind}. Use one of {', '.join(EXPORT_FORMATS)}")
+    if file_format not in EXPORT_FORMATS[kind]:
+        raise ExportError(f"Unknown file_format: {file_format}. Use one of {', '.join(EXPORT_FORMATS[kind])}")
+    period = params.get('period') or 'all'
+    if period not in PERIODS[kind]:
+        raise ExportError(f"Unknown period: {period}. Use one of {', '.join(PERIODS[kind])}")
+
+    today = timezone.localdate()
+    normalized = {'period': period}
+    if kind == 'transactions':
+        for name in ('start_date', 'end_date'):
+            if params.get(name):
+                normalized[name] = _parse_date(name, params[name]).isoformat()
+        if period != 'all':
+            normalized['today'] = today.isoformat()
+    else:
+        selected = _parse_date('date', params['date']) if params.get('date') else today
+        normalized['date'] = selected.isoformat()
+    return normalized
+
+
+def export_data_version():
+    """
+    Version of the data behind the exports: the transactions, plus the
+    balances, bank accounts and daily profits the workbook sheets read.
+    Read from the database (caching.table_version), so every web worker and
+    the job command agree and artifacts outlive restarts.
+    """
+    from .models import BankAccount, DailyBalance, DailyProfit
+
+    return '|'.join([
+        data_version(),
+        table_version(DailyBalance, 'daily_balances'),
+        table_version(BankAccount),
+        table_version(DailyProfit),
+    ])
+
+
+def artifact_key(kind, file_format, params, version):
+    payload = json.dumps([kind, file_format, params, version], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def requeue_stale_jobs():
+    """Put jobs whose worker died mid-run back in the queue"""
+    from .models import ExportJob
+
+    return ExportJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status='pending', started_at=None)
+
+
+def submit_export(kind, file_format, params):
+    """
+    Job producing the requested export: an existing one for the same
+    parameters and data version (done with its file still on disk, or
+    queued/running), else a new pending job. Returns (job, created).
+    """
+    from .models import ExportJob
+
+    params = normalize_params(kind, file_format, params)
+    key = artifact_key(kind, file_format, params, export_data_version())
+    requeue_stale_jobs()
+    for job in ExportJob.objects.filter(artifact_key=key).exclude(status='failed').order_by('-created_at'):
+        if job.status != 'done' or artifact_path(job).exists():
+            return job, False
+
+    job = ExportJob.objects.create(kind=kind, file_format=file_format, params=params, artifact_key=key)
+    if getattr(settings, 'EXPORT_JOBS_IN_PROCESS', True):
+        db_transaction.on_commit(start_worker)
+    return job, True
+
+
+def _write_csv(path, header, rows, compressed):
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    opener = gzip.open if compressed else open
+    with opener(path, 'wt', encoding='utf-8', newline='') as output:
+        for chunk in csv_stream(header, counted()):
+            output.write(chunk)
+    return count
+
+
+def _write_artifact(job, path):
+    """Write the job's export to path; returns (rows, download file name)"""
+    params = job.params
+    if job.kind == 'transactions':
+        today = datetime.strptime(params['today'], '%Y-%m-%d').date() if 'today' in params else None
+        queryset = transactions_export_queryset(
+            params['period'], params.get('start_date'), params.get('end_date'), today
+        )
+        stamp = (today or timezone.localtime(job.created_at).date()).strftime('%Y-%m-%d')
+        file_name = f'money_exchange_transactions_{stamp}.{_extension(job.file_format)}'
+        if job.file_format in COLUMNAR_FORMATS:
+            return write_columnar(queryset, str(path), job.file_format), file_name
+        if job.file_format == 'xlsx':
+            return write_xlsx(str(path), transaction_workbook_sheets(queryset))['Transactions'], file_name
+        rows = _write_csv(path, TRANSACTION_CSV_HEADER, transaction_csv_rows(queryset), job.file_format == 'csv.gz')
+        return rows, file_name
+
+    selected = datetime.strptime(params['date'], '%Y-%m-%d').date()
+    start_date, end_date, file_name = daily_summary_range(params['period'], selected)
+    if job.file_format == 'xlsx':
+        rows = write_xlsx(str(path), [
+            ('Daily Summary', DAILY_SUMMARY_CSV_HEADER, daily_summary_xlsx_rows(start_date, end_date),
+             DAILY_SUMMARY_XLSX_FORMATS)
+        ])['Daily Summary']
+        return rows, file_name.replace('.csv', '.xlsx')
+    rows = _write_csv(
+        path, DAILY_SUMMARY_CSV_HEADER, daily_summary_csv_rows(start_date, end_date), job.file_format == 'csv.gz'
+    )
+    return rows, file_name + ('.gz' if job.file_format == 'csv.gz' else '')
+
+
+def run_job(job):
+    """
+    Claim a pending job and write its file. Returns False if another worker
+    claimed it first. Failures are recorded on the job, not raised.
+    """
+    from .models import ExportJob
+
+    claimed = ExportJob.objects.filter(pk=job.pk, status='pending').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    path = artifact_path(job)
+    # Written under a temporary name so a download never sees a half-written file
+    partial = path.with_name(path.name + '.part')
+    print(f"Running {job.kind} export job {job.id} ({job.file_format})")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows, file_name = _write_artifact(job, partial)
+        os.replace(partial, path)
+    except Exception as e:
+        print(f"Export job {job.id} failed: {str(e)}")
+        partial.unlink(missing_ok=True)
+        ExportJob.objects.filter(pk=job.pk).update(status='failed', error=str(e), finished_at=timezone.now())
+        return True
+
+    ExportJob.objects.filter(pk=job.pk).update(
+        status='done', rows=rows, size=path.stat().st_size, file_name=file_name, finished_at=timezone.now()
+    )
+    print(f"Export job {job.id} wrote {rows} rows to {path}")
+    return True
+
+
+def run_pending_jobs(limit=None):
+    """Run queued jobs oldest first; returns how many this call ran"""
+    from .models import ExportJob
+
+    requeue_stale_jobs()
+    ran = 0
+    while limit is None or ran < limit:
+        job = ExportJob.objects.filter(status='pending').order_by('created_at').first()
+        if job is None:
+            break
+        if run_job(job):
+            ran += 1
+    return ran
+
+
+def purge_exports(older_than):
+    """Delete jobs finished before now - older_than, with their files; returns the count"""
+    from .models import ExportJob
+
+    jobs = list(ExportJob.objects.filter(finished_at__lt=timezone.now() - older_than))
+    for job in jobs:
+        artifact_path(job).unlink(missing_ok=True)
+    ExportJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return len(jobs)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def _drain():
+    global _worker
+    try:
+        while True:
+            _wakeup.clear()
+            if run_pending_jobs():
+                continue
+            if _wakeup.wait(WORKER_IDLE_SECONDS):
+                continue
+            # Exit under the lock, so start_worker either sees this thread
+            # gone or has set _wakeup before it checks
+            with _worker_lock:
+                if not _wakeup.is_set():
+                    _worker = None
+                    return
+    finally:
+        connection.close()
+
+
+def start_worker():
+    """Run pending jobs on a daemon thread of this process, starting one if none is running"""
+    global _worker
+    with _worker_lock:
+        _wakeup.set()
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, name='export-jobs', daemon=True)
+            _worker.start()
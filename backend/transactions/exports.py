@@ -0,0 +1,567 @@
+import csv
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import compress_sequence
+
+# CSV lines joined into one chunk of the response body
+CHUNK_ROWS = 500
+# Date-times in every export are local wall time, as the reports bucket them
+EXPORT_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Rows fetched per database round trip by the iterator() generators
+FETCH_SIZE = 2000
+
+TRANSACTION_CSV_HEADER = [
+    'ID', 'Transaction Type', 'Date & Time', 'Customer Name',
+    'THB Amount', 'MMK Amount', 'Rate', '100K Rate', 'Profit', 'Remarks'
+]
+TRANSACTION_CSV_COLUMNS = (
+    'id', 'transaction_type', 'date_time', 'customer',
+    'thb_amount', 'mmk_amount', 'rate', 'profit', 'remarks'
+)
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    """Yield the CSV text of header and rows, CHUNK_ROWS lines at a time"""
+    writer = csv.writer(Echo())
+    chunk = [writer.writerow(header)]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= CHUNK_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def download_response(stream, filename, content_type='text/csv'):
+    """StreamingHttpResponse sent as a file download, with the export endpoints' headers"""
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"; filename*=UTF-8\'\'{filename}'
+
+    # Add CORS headers to ensure browser allows the download
+    response['Access-Control-Allow-Origin'] = '*'
+    response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+    response['Access-Control-Allow-Headers'] = 'Content-Type, Content-Disposition'
+
+    # Add cache control to prevent caching
+    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response['Pragma'] = 'no-cache'
+    response['Expires'] = '0'
+    return response
+
+
+_BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_byte_range(header, size):
+    """
+    Inclusive (start, end) of a single-range "Range: bytes=..." header on a
+    file of size bytes. None means send the whole file (no header, another
+    unit, several ranges or a malformed one, which RFC 9110 says to ignore);
+    ValueError means the range lies outside the file (416).
+    """
+    match = _BYTE_RANGE.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            raise ValueError(f'Range starts past the end of the {size}-byte file')
+        return start, min(int(last), size - 1) if last else size - 1
+    # bytes=-N: the last N bytes
+    suffix = int(last)
+    if suffix == 0 or size == 0:
+        raise ValueError('Empty suffix range')
+    return max(size - suffix, 0), size - 1
+
+
+def _file_range(path, start, length, chunk_size=64 * 1024):
+    with open(path, 'rb') as output:
+        output.seek(start)
+        while length > 0:
+            chunk = output.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(request, path, filename, content_type, etag):
+    """
+    Download of a finished file on disk that honours Range requests, so an
+    interrupted download resumes where it stopped: 206 with Content-Range for
+    a satisfiable range, 416 for one past the end, the whole file otherwise.
+    If-Range with a different ETag (the file changed) gets the whole file.
+    """
+    size = os.path.getsize(path)
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_byte_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    response = download_response(_file_range(path, start, end - start + 1), filename, content_type)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    # The compression middleware leaves Accept-Ranges responses alone, so
+    # byte offsets always refer to the stored file
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Access-Control-Allow-Headers'] = 'Content-Type, Content-Disposition, Range, If-Range'
+    response['Access-Control-Expose-Headers'] = 'Content-Disposition, Content-Length, Content-Range, Accept-Ranges, ETag'
+    return response
+
+
+# file_format values of the CSV export endpoints; csv.gz is a gzip-compressed download
+CSV_FORMATS = ('csv', 'csv.gz')
+
+
+def csv_download(header, rows, filename, file_format='csv'):
+    """Streamed CSV download of header and rows, gzip-compressed as filename.gz for csv.gz"""
+    stream = csv_stream(header, rows)
+    if file_format == 'csv.gz':
+        compressed = compress_sequence(chunk.encode('utf-8') for chunk in stream)
+        return download_response(compressed, f'{filename}.gz', 'application/gzip')
+    return download_response(stream, filename)
+
+
+def transactions_export_queryset(period='all', start_date=None, end_date=None, today=None):
+    """
+    Transactions of the export, oldest first: period is today, week, month
+    (counted back from today, the current date by default) or all, narrowed
+    by optional YYYY-MM-DD start_date/end_date (unparseable dates are
+    ignored, as the export endpoint always has).
+    """
+    from .models import Transaction
+
+    queryset = Transaction.objects.all().order_by('date_time')
+
+    today = today or timezone.localdate()
+    if period == 'today':
+        queryset = queryset.filter(date_time__date=today)
+    elif period == 'week':
+        week_start = today - timedelta(days=today.weekday())
+        queryset = queryset.filter(date_time__date__gte=week_start)
+    elif period == 'month':
+        month_start = today.replace(day=1)
+        queryset = queryset.filter(date_time__date__gte=month_start)
+
+    for value, lookup in ((start_date, 'date_time__date__gte'), (end_date, 'date_time__date__lte')):
+        if value:
+            try:
+                queryset = queryset.filter(**{lookup: datetime.strptime(value, '%Y-%m-%d').date()})
+            except ValueError:
+                pass
+    return queryset
+
+
+def local_export_time(value):
+    """
+    Naive local date-time in whole seconds: what a CSV writes as text and
+    an XLSX cell holds (Excel has no time zones; openpyxl refuses aware ones)
+    """
+    return timezone.localtime(value).replace(tzinfo=None, microsecond=0)
+
+
+def _hundred_k_rate(rate):
+    """
+    The 100K rate both export formats write: derived from the rate and
+    rounded to cents, as the importer and the transaction form compute it.
+    """
+    return (Decimal('100000') / rate).quantize(Decimal('0.01')) if rate else Decimal('0')
+
+
+def transaction_csv_rows(queryset):
+    """CSV rows of a Transaction queryset, read in chunks with values_list().iterator()"""
+    rows = queryset.values_list(*TRANSACTION_CSV_COLUMNS).iterator(chunk_size=FETCH_SIZE)
+    for pk, transaction_type, date_time, customer, thb_amount, mmk_amount, rate, profit, remarks in rows:
+        yield [
+            pk,
+            transaction_type,
+            local_export_time(date_time).strftime(EXPORT_DATETIME_FORMAT),
+            customer,
+            float(thb_amount),
+            float(mmk_amount),
+            float(rate),
+            float(_hundred_k_rate(rate)),
+            float(profit or 0),
+            remarks or ''
+        ]
+
+
+def _cents(value):
+    # Grouped SQLite sums can carry float noise (4.20999999999996); aggregate() rounded it away
+    return float(Decimal(value or 0).quantize(Decimal('0.01')))
+
+
+DAILY_SUMMARY_CSV_HEADER = ['Date', 'Transactions', 'THB Volume', 'MMK Volume', 'Profit (THB)']
+
+
+def daily_summary_range(period, selected_date):
+    """
+    (start_date, end_date, filename) of the daily summary export: the month
+    of selected_date for period=month, otherwise from the first transaction
+    up to selected_date.
+    """
+    from .models import Transaction
+
+    if period == 'month':
+        start_date = selected_date.replace(day=1)
+        if selected_date.month == 12:
+            next_month = selected_date.replace(year=selected_date.year + 1, month=1, day=1)
+        else:
+            next_month = selected_date.replace(month=selected_date.month + 1, day=1)
+        return start_date, next_month - timedelta(days=1), f"daily_summary_{start_date.strftime('%Y-%m')}.csv"
+
+    first = Transaction.objects.order_by('date_time').values_list('date_time', flat=True).first()
+    # Default to the selected date if there are no transactions
+    start_date = timezone.localtime(first).date() if first else selected_date
+    return start_date, selected_date, f"daily_summary_all_to_{selected_date.strftime('%Y-%m-%d')}.csv"
+
+
+def _daily_summary_values(start_date, end_date):
+    from .reports import build_report_queryset
+
+    days = build_report_queryset(
+        ['count', 'thb_volume', 'mmk_volume', 'profit'], ['day'],
+        {'start_date': start_date, 'end_date': end_date}
+    ).order_by('day').values_list('day', 'count', 'thb_volume', 'mmk_volume', 'profit')
+    return days.iterator(chunk_size=FETCH_SIZE)
+
+
+def daily_summary_csv_rows(start_date, end_date):
+    """One CSV row per day with transactions, from a single grouped query"""
+    for day, count, thb_volume, mmk_volume, profit in _daily_summary_values(start_date, end_date):
+        yield [
+            day.strftime('%Y-%m-%d'),
+            count,
+            _cents(thb_volume),
+            _cents(mmk_volume),
+            _cents(profit)
+        ]
+
+
+# Columnar (Parquet / Arrow IPC) export. pyarrow is imported on first use so
+# the CSV paths work without it.
+COLUMNAR_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrows', 'application/vnd.apache.arrow.stream'),
+}
+COLUMNAR_COLUMNS = (
+    'id', 'transaction_type', 'date_time', 'customer', 'customer_ref_id',
+    'thb_amount', 'mmk_amount', 'rate', 'hundred_k_rate', 'profit', 'remarks'
+)
+# Rows per Arrow record batch (and Parquet row group)
+ARROW_BATCH_ROWS = 50000
+
+
+class ExportError(Exception):
+    """A requested export cannot be produced (unknown format, missing library)"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("Parquet/Arrow export needs the pyarrow package")
+    return pyarrow
+
+
+def transaction_arrow_schema():
+    """
+    Arrow schema of the columnar export: exact decimals with the model's
+    precision, UTC timestamps, and dictionary-encoded (categorical) type and
+    customer columns.
+    """
+    pa = _pyarrow()
+    return pa.schema([
+        ('id', pa.int64()),
+        ('transaction_type', pa.dictionary(pa.int8(), pa.string())),
+        ('date_time', pa.timestamp('us', tz='UTC')),
+        ('customer', pa.dictionary(pa.int32(), pa.string())),
+        ('customer_id', pa.int64()),
+        ('thb_amount', pa.decimal128(10, 2)),
+        ('mmk_amount', pa.decimal128(15, 2)),
+        ('rate', pa.decimal128(10, 4)),
+        ('hundred_k_rate', pa.decimal128(10, 2)),
+        ('profit', pa.decimal128(10, 2)),
+        ('remarks', pa.string()),
+    ])
+
+
+def record_batches(rows, schema, batch_rows=ARROW_BATCH_ROWS):
+    """Arrow record batches of schema from an iterable of row tuples, batch_rows at a time"""
+    pa = _pyarrow()
+
+    def to_batch(columns):
+        arrays = []
+        for field, values in zip(schema, columns):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, pa.string()).dictionary_encode().cast(field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    columns = [[] for _ in schema]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        if len(columns[0]) >= batch_rows:
+            yield to_batch(columns)
+            columns = [[] for _ in schema]
+    if columns[0]:
+        yield to_batch(columns)
+
+
+def arrow_batches(queryset, batch_rows=ARROW_BATCH_ROWS):
+    """Record batches of a Transaction queryset, one chunked read per batch"""
+    rows = queryset.values_list(*COLUMNAR_COLUMNS).iterator(chunk_size=FETCH_SIZE)
+    return record_batches(rows, transaction_arrow_schema(), batch_rows)
+
+
+def file_chunks(output, chunk_size=64 * 1024):
+    """Yield a finished export file from the start, closing it at the end"""
+    try:
+        output.seek(0)
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        output.close()
+
+
+def write_batches(sink, schema, batches, file_format):
+    """Write record batches to sink as Parquet or an Arrow IPC stream; returns the number of rows"""
+    if file_format not in COLUMNAR_FORMATS:
+        raise ExportError(f"Unknown format: {file_format}. Use one of {', '.join(COLUMNAR_FORMATS)}")
+    pa = _pyarrow()
+    if file_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    count = 0
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def write_columnar(queryset, sink, file_format, batch_rows=ARROW_BATCH_ROWS):
+    """
+    Write a Transaction queryset to sink (a path or binary file) as Parquet
+    or as an Arrow IPC stream, batch by batch. Returns the number of rows.
+    """
+    if file_format not in COLUMNAR_FORMATS:
+        raise ExportError(f"Unknown format: {file_format}. Use one of {', '.join(COLUMNAR_FORMATS)}")
+    return write_batches(sink, transaction_arrow_schema(), arrow_batches(queryset, batch_rows), file_format)
+
+
+def match_ledger_arrow_schema():
+    """Columns of matching.MATCH_LEDGER_HEADER, typed as in the transaction export"""
+    pa = _pyarrow()
+    return pa.schema([
+        ('matched_at', pa.timestamp('us', tz='UTC')),
+        ('buy_id', pa.int64()),
+        ('buy_date', pa.timestamp('us', tz='UTC')),
+        ('buy_customer', pa.dictionary(pa.int32(), pa.string())),
+        ('sell_id', pa.int64()),
+        ('sell_date', pa.timestamp('us', tz='UTC')),
+        ('sell_customer', pa.dictionary(pa.int32(), pa.string())),
+        ('mmk_matched', pa.decimal128(15, 2)),
+        ('buy_rate', pa.decimal128(10, 4)),
+        ('sell_rate', pa.decimal128(10, 4)),
+        ('thb_buy', pa.decimal128(15, 2)),
+        ('thb_sell', pa.decimal128(15, 2)),
+        ('profit', pa.decimal128(15, 2)),
+        ('profit_booked_to', pa.int64()),
+    ])
+
+
+def match_ledger_csv_rows(rows):
+    """Ledger rows (matching.match_ledger_rows) with their timestamps as CSV text"""
+    for row in rows:
+        for index in (0, 2, 5):
+            row[index] = local_export_time(row[index]).strftime(EXPORT_DATETIME_FORMAT)
+        yield row
+
+
+# XLSX export in openpyxl's write-only mode. openpyxl is imported on first
+# use; with lxml installed it serializes the sheets about twice as fast.
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+AMOUNT_FORMAT = '#,##0.00'
+RATE_FORMAT = '0.0000'
+
+# Excel number formats by column index
+TRANSACTION_XLSX_FORMATS = {4: AMOUNT_FORMAT, 5: AMOUNT_FORMAT, 6: RATE_FORMAT, 7: AMOUNT_FORMAT, 8: AMOUNT_FORMAT}
+DAILY_SUMMARY_XLSX_FORMATS = {2: AMOUNT_FORMAT, 3: AMOUNT_FORMAT, 4: AMOUNT_FORMAT}
+BALANCE_HEADER = ['Date', 'Currency', 'Bank Name', 'Balance', 'Notes']
+BALANCE_XLSX_FORMATS = {3: AMOUNT_FORMAT}
+
+
+def _openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ExportError("XLSX export needs the openpyxl package")
+    return openpyxl
+
+
+def transaction_xlsx_rows(queryset):
+    """
+    Typed rows of a Transaction queryset for a worksheet: exact decimals, a
+    real date-time and the 100K rate, with the same values the CSV writes.
+    """
+    rows = queryset.values_list(*TRANSACTION_CSV_COLUMNS).iterator(chunk_size=FETCH_SIZE)
+    for pk, transaction_type, date_time, customer, thb_amount, mmk_amount, rate, profit, remarks in rows:
+        yield [
+            pk,
+            transaction_type,
+            local_export_time(date_time),
+            customer,
+            thb_amount,
+            mmk_amount,
+            rate,
+            _hundred_k_rate(rate),
+            profit or Decimal('0'),
+            remarks or None
+        ]
+
+
+def daily_summary_xlsx_rows(start_date, end_date):
+    """Typed daily summary rows: a date cell and decimal volumes rounded to cents"""
+    cent = Decimal('0.01')
+    for day, count, thb_volume, mmk_volume, profit in _daily_summary_values(start_date, end_date):
+        yield [
+            day,
+            count,
+            Decimal(thb_volume or 0).quantize(cent),
+            Decimal(mmk_volume or 0).quantize(cent),
+            Decimal(profit or 0).quantize(cent)
+        ]
+
+
+def daily_balance_xlsx_rows(start_date=None, end_date=None):
+    """Every account's recorded balance per day in the range, oldest day first"""
+    from .models import DailyBalance
+
+    balances = DailyBalance.objects.all()
+    if start_date:
+        balances = balances.filter(date__gte=start_date)
+    if end_date:
+        balances = balances.filter(date__lte=end_date)
+    rows = balances.order_by('date', 'bank_account__currency', 'bank_account__name').values_list(
+        'date', 'bank_account__currency', 'bank_account__name', 'balance', 'notes'
+    )
+    for date, currency, name, balance, notes in rows.iterator(chunk_size=FETCH_SIZE):
+        yield [date, currency, name, balance, notes or None]
+
+
+def transaction_workbook_sheets(queryset):
+    """
+    Sheets of the transactions workbook: the transactions, then the daily
+    summary and the recorded balances over the days they span.
+    """
+    from django.db.models import Max, Min
+
+    span = queryset.order_by().aggregate(first=Min('date_time'), last=Max('date_time'))
+    sheets = [('Transactions', TRANSACTION_CSV_HEADER, transaction_xlsx_rows(queryset), TRANSACTION_XLSX_FORMATS)]
+    if span['first'] is not None:
+        # Local days, as the daily summary rows are bucketed
+        start_date = timezone.localtime(span['first']).date()
+        end_date = timezone.localtime(span['last']).date()
+        sheets += [
+            ('Daily Summary', DAILY_SUMMARY_CSV_HEADER, daily_summary_xlsx_rows(start_date, end_date),
+             DAILY_SUMMARY_XLSX_FORMATS),
+            ('Balances', BALANCE_HEADER, daily_balance_xlsx_rows(start_date, end_date), BALANCE_XLSX_FORMATS),
+        ]
+    return sheets
+
+
+def write_xlsx(sink, sheets):
+    """
+    Write sheets to sink (a path or binary file) as an XLSX workbook.
+
+    sheets is a sequence of (title, header, rows, number_formats), where
+    number_formats maps a column index to an Excel number format. The
+    workbook is in write-only mode: each row goes straight to a temporary
+    file per sheet, so memory stays flat however many rows there are.
+    Returns {title: rows written}.
+    """
+    openpyxl = _openpyxl()
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    from openpyxl.styles import Font
+
+    workbook = openpyxl.Workbook(write_only=True)
+    bold = Font(bold=True)
+    counts = {}
+    for title, header, rows, number_formats in sheets:
+        sheet = workbook.create_sheet(title)
+        sheet.freeze_panes = 'A2'
+        header_cells = []
+        for value in header:
+            cell = WriteOnlyCell(sheet, value)
+            cell.font = bold
+            header_cells.append(cell)
+        sheet.append(header_cells)
+
+        count = 0
+        for row in rows:
+            for index, value in enumerate(row):
+                if isinstance(value, str):
+                    # Control characters are invalid in XML; a leading "=" would become a formula
+                    value = ILLEGAL_CHARACTERS_RE.sub('', value)
+                    if value.startswith('='):
+                        cell = WriteOnlyCell(sheet, value)
+                        cell.data_type = 's'
+                        value = cell
+                    row[index] = value
+                elif index in number_formats and value is not None:
+                    cell = WriteOnlyCell(sheet, value)
+                    cell.number_format = number_formats[index]
+                    row[index] = cell
+            sheet.append(row)
+            count += 1
+        counts[title] = count
+    workbook.save(sink)
+    return counts
+
+
+def xlsx_download(sheets, filename):
+    """Download of an XLSX workbook of sheets (see write_xlsx)"""
+    # The zip container is written when the workbook is saved, so the file is
+    # built first; the spooled file moves to disk once it outgrows memory
+    output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    counts = write_xlsx(output, sheets)
+    print(f"Exported {', '.join(f'{rows} {title}' for title, rows in counts.items())} rows to XLSX file: {filename}")
+    return download_response(file_chunks(output), filename, XLSX_CONTENT_TYPE)
@@ -0,0 +1,284 @@
+import csv
+import hashlib
+import io
+import re
+from datetime import datetime, time, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .customers import normalize_customer_name
+
+# Column headers accepted for each field, compared after _header_key();
+# includes the headers written by export/ so an export can be re-imported
+COLUMN_ALIASES = {
+    'transaction_type': ('transaction_type', 'type'),
+    'date_time': ('date_time', 'datetime', 'created_at', 'date'),
+    'customer': ('customer', 'customer_name', 'name'),
+    'thb_amount': ('thb_amount', 'thb'),
+    'mmk_amount': ('mmk_amount', 'mmk'),
+    'rate': ('rate',),
+    'hundred_k_rate': ('hundred_k_rate', '100k_rate'),
+    'remarks': ('remarks', 'remark', 'notes', 'note'),
+}
+REQUIRED_COLUMNS = ('transaction_type', 'date_time', 'customer', 'thb_amount', 'mmk_amount', 'rate')
+TRANSACTION_TYPES = ('BUY', 'SELL', 'OTHER')
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+# Only the first few bad rows are kept so memory stays flat on large files
+MAX_REPORTED_ERRORS = 50
+
+
+class TransactionImportError(Exception):
+    """The file cannot be imported at all (unknown format, missing columns)"""
+
+
+def _quantized(value, places):
+    return str(Decimal(value).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+
+def transaction_fingerprint(date_time, customer, thb_amount, mmk_amount, rate):
+    """
+    Hash identifying a transaction by what was written on the slip: the time
+    (UTC, to the second), the normalized customer name, both amounts and the
+    rate. Re-importing the same ledger row gives the same fingerprint.
+    """
+    if timezone.is_aware(date_time):
+        date_time = date_time.astimezone(dt_timezone.utc)
+    key = '|'.join([
+        date_time.strftime('%Y-%m-%dT%H:%M:%S'),
+        normalize_customer_name(customer),
+        _quantized(thb_amount, 2),
+        _quantized(mmk_amount, 2),
+        _quantized(rate, 4),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _header_key(header):
+    return re.sub(r'[^0-9a-z]+', '_', str(header or '').strip().lower()).strip('_')
+
+
+def _column_map(headers):
+    """Map field name -> column position; raises TransactionImportError on missing columns"""
+    positions = {_header_key(header): i for i, header in reversed(list(enumerate(headers)))}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[field] = positions[alias]
+                break
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise TransactionImportError(f"Missing columns: {', '.join(missing)}")
+    return columns
+
+
+def _parse_date_time(value):
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or '').strip()
+        parsed = parse_datetime(text)
+        if parsed is None:
+            for fmt in DATETIME_FORMATS:
+                try:
+                    parsed = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+        if parsed is None:
+            day = parse_date(text)
+            if day is None:
+                raise ValueError(f"Invalid date_time: {text!r}")
+            parsed = datetime.combine(day, time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _decimal(Transaction, field, value):
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"{field} is required")
+    try:
+        number = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid {field}: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Invalid {field}: {value!r}")
+    model_field = Transaction._meta.get_field(field)
+    try:
+        # Spreadsheet cells often carry float noise past the column's precision
+        number = number.quantize(Decimal(1).scaleb(-model_field.decimal_places), rounding=ROUND_HALF_UP)
+        return model_field.clean(number, None)
+    except InvalidOperation:
+        raise ValueError(f"Invalid {field}: {value!r}")
+    except ValidationError as e:
+        raise ValueError(f"Invalid {field}: {'; '.join(e.messages)}")
+
+
+def _build_transaction(Transaction, values):
+    """One parsed row (field -> raw cell) as an unsaved Transaction; raises ValueError"""
+    transaction_type = str(values.get('transaction_type') or '').strip().upper()
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError(f"Invalid transaction_type: {values.get('transaction_type')!r}")
+    customer = str(values.get('customer') or '').strip()
+    if not customer:
+        raise ValueError("customer is required")
+
+    thb_amount = _decimal(Transaction, 'thb_amount', values.get('thb_amount'))
+    mmk_amount = _decimal(Transaction, 'mmk_amount', values.get('mmk_amount'))
+    rate = _decimal(Transaction, 'rate', values.get('rate'))
+    if values.get('hundred_k_rate') not in (None, ''):
+        hundred_k_rate = _decimal(Transaction, 'hundred_k_rate', values['hundred_k_rate'])
+    else:
+        hundred_k_rate = (Decimal('100000') / rate).quantize(Decimal('0.01')) if rate else Decimal('0')
+
+    remarks = values.get('remarks')
+    tx = Transaction(
+        transaction_type=transaction_type,
+        date_time=_parse_date_time(values.get('date_time')),
+        customer=customer,
+        thb_amount=thb_amount,
+        mmk_amount=mmk_amount,
+        rate=rate,
+        hundred_k_rate=hundred_k_rate,
+        # BUY/SELL profit is set by the matching pass after the import
+        profit=thb_amount if transaction_type == 'OTHER' else Decimal('0.00'),
+        remarks=str(remarks).strip() if remarks not in (None, '') else None,
+    )
+    tx.refresh_derived_fields()
+    return tx
+
+
+def _csv_rows(stream):
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    yield from csv.reader(text)
+
+
+def _xlsx_rows(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise TransactionImportError("XLSX import needs the openpyxl package")
+    # read_only streams the sheet XML instead of loading the whole workbook
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        return 'xlsx'
+    if name.endswith('.csv'):
+        return 'csv'
+    raise TransactionImportError("Unsupported file type; upload a .csv or .xlsx file")
+
+
+def _insert_chunk(Transaction, chunk, result):
+    """Drop duplicates of the chunk (within it and already stored) and insert the rest"""
+    from .customers import assign_customer_refs
+
+    unique = {}
+    for tx in chunk:
+        unique.setdefault(tx.fingerprint, tx)
+    existing = set(
+        Transaction.objects.filter(fingerprint__in=list(unique)).values_list('fingerprint', flat=True)
+    )
+    new_transactions = [tx for fingerprint, tx in unique.items() if fingerprint not in existing]
+    result['duplicates'] += len(chunk) - len(new_transactions)
+
+    if new_transactions:
+        with db_transaction.atomic():
+            assign_customer_refs(new_transactions)
+            Transaction.objects.bulk_create(new_transactions)
+        result['created'] += len(new_transactions)
+        first = min(tx.date_time for tx in new_transactions)
+        last = max(tx.date_time for tx in new_transactions)
+        result['first'] = min(result['first'] or first, first)
+        result['last'] = max(result['last'] or last, last)
+
+
+def _finish_import(result):
+    """Rebuild profits and derived data once for everything the import added"""
+    from .autocomplete import customer_index
+    from .customer_totals import refresh_customer_totals
+    from .matching import apply_matching
+
+    result['profits_updated'] = len(apply_matching(since=result['first']))
+    refresh_customer_totals(
+        start_date=timezone.localtime(result['first']).date(),
+        end_date=timezone.localtime(result['last']).date()
+    )
+    if customer_index.is_built:
+        customer_index.rebuild()
+
+
+def import_transactions(stream, file_format='csv', chunk_size=1000):
+    """
+    Stream-parse a CSV or XLSX ledger into Transaction rows.
+
+    The first row holds the column headers (see COLUMN_ALIASES). Rows are
+    validated one at a time and inserted chunk_size at a time, so memory
+    stays flat however large the file is. Rows whose fingerprint already
+    exists are skipped, which makes re-running an import safe. Profits are
+    re-matched once at the end.
+
+    Returns a summary dict: rows, created, duplicates, error_count, errors
+    (the first MAX_REPORTED_ERRORS, with their line numbers) and
+    profits_updated. Raises TransactionImportError when the file cannot be read.
+    """
+    from .models import Transaction
+
+    if file_format == 'csv':
+        rows = _csv_rows(stream)
+    elif file_format == 'xlsx':
+        rows = _xlsx_rows(stream)
+    else:
+        raise TransactionImportError(f"Unsupported format: {file_format}")
+
+    result = {
+        'rows': 0, 'created': 0, 'duplicates': 0, 'error_count': 0, 'errors': [],
+        'profits_updated': 0, 'first': None, 'last': None,
+    }
+    try:
+        headers = next(rows)
+    except StopIteration:
+        raise TransactionImportError("The file is empty")
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise TransactionImportError(f"Unreadable file: {e}")
+    columns = _column_map(headers)
+
+    chunk = []
+    for line, row in enumerate(rows, start=2):
+        if not row or all(cell in (None, '') for cell in row):
+            continue
+        result['rows'] += 1
+        values = {field: row[i] if i < len(row) else None for field, i in columns.items()}
+        try:
+            chunk.append(_build_transaction(Transaction, values))
+        except ValueError as e:
+            result['error_count'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append({'line': line, 'error': str(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            _insert_chunk(Transaction, chunk, result)
+            chunk = []
+    if chunk:
+        _insert_chunk(Transaction, chunk, result)
+
+    if result['created']:
+        _finish_import(result)
+    del result['first'], result['last']
+    return result
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from transactions.customer_totals import refresh_customer_totals
+from transactions.customers import backfill_customer_refs
+from transactions.models import Customer
+
+
+class Command(BaseCommand):
+    help = 'Links transactions to Customer rows by name in chunks, then rebuilds the customer totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Transactions per chunk')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-resolve every transaction, not only those without a customer'
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_customer_refs(
+            chunk_size=options['chunk_size'],
+            only_missing=not options['all']
+        )
+        refresh_customer_totals()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Linked {updated} transactions; {Customer.objects.count()} customers'
+        ))
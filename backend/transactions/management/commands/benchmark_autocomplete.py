@@ -0,0 +1,60 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from transactions.autocomplete import customer_index
+from transactions.management.commands.benchmark_dashboard import percentile
+from transactions.models import CustomerAlias
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p99 latency of customer autocomplete lookups for random name prefixes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=2000, help='Lookups per run')
+        parser.add_argument('--limit', type=int, default=10, help='Suggestions per lookup')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        names = list(CustomerAlias.objects.values_list('name', flat=True))
+        if not names:
+            self.stdout.write(self.style.WARNING('No customers to look up'))
+            return
+
+        # Prefixes of 0-4 characters of whole names and of their words
+        words = names + [word for name in names for word in name.split()[1:]]
+        prefixes = [random.choice(words)[:random.randint(0, 4)] for _ in range(options['queries'])]
+
+        started = time.perf_counter()
+        customer_index.rebuild()
+        self.stdout.write(
+            f'Index built in {(time.perf_counter() - started) * 1000:.1f} ms '
+            f'({len(names)} spellings)'
+        )
+
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            customer_index.suggest(prefix, options['limit'])
+            latencies.append(time.perf_counter() - started)
+        self.report('index lookup', latencies)
+
+        client = Client(HTTP_HOST=options['host'])
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            response = client.get('/api/transactions/customers/autocomplete/', {'q': prefix, 'limit': options['limit']})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f'autocomplete returned {response.status_code}')
+        self.report('endpoint    ', latencies)
+
+    def report(self, label, latencies):
+        self.stdout.write(
+            f'{label}: p50 {percentile(latencies, 50) * 1000:.3f} ms, '
+            f'p99 {percentile(latencies, 99) * 1000:.3f} ms, '
+            f'mean {statistics.mean(latencies) * 1000:.3f} ms'
+        )
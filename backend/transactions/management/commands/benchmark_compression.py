@@ -0,0 +1,87 @@
+import contextlib
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.test import RequestFactory
+from django.utils.text import compress_sequence, compress_string
+
+from core.middleware import zstandard, zstd_sequence
+from transactions import views
+from transactions.exports import TRANSACTION_CSV_HEADER, csv_stream, transaction_csv_rows
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes saved and CPU time of gzip/zstd compression on representative responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per codec and payload')
+        parser.add_argument('--zstd-level', type=int, default=3)
+        parser.add_argument(
+            '--bandwidth-kbps', type=int, default=1000,
+            help='Link speed for the transfer time estimate (default: 1 Mbit/s mobile)'
+        )
+
+    def render(self, view, params):
+        request = RequestFactory().get('/', params)
+        # The views log every request; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = view(request)
+            response.render()
+        if response.status_code != 200:
+            raise CommandError(f'{view.__name__} returned {response.status_code}')
+        return response.content
+
+    def payloads(self):
+        yield 'export CSV (streamed)', [
+            chunk.encode('utf-8')
+            for chunk in csv_stream(TRANSACTION_CSV_HEADER, transaction_csv_rows(Transaction.objects.order_by('date_time')))
+        ]
+        yield 'list_transactions page_size=1000', [
+            self.render(views.list_transactions, {'page_size': 1000, 'show_all': 'true'})
+        ]
+        # calculate_profits rewrites every profit; measure its response and roll the writes back
+        with db_transaction.atomic():
+            content = self.render(views.calculate_profits, {})
+            db_transaction.set_rollback(True)
+        yield 'calculate_profits', [content]
+        yield 'dashboard', [self.render(views.dashboard, {})]
+
+    def codecs(self, level):
+        codecs = {
+            'gzip': lambda chunks: b''.join(compress_sequence(chunks))
+            if len(chunks) > 1 else compress_string(chunks[0]),
+        }
+        if zstandard is not None:
+            codecs['zstd'] = lambda chunks: b''.join(zstd_sequence(chunks, level))
+        return codecs
+
+    def handle(self, *args, **options):
+        if not Transaction.objects.exists():
+            raise CommandError('No transactions to build payloads from')
+        if zstandard is None:
+            self.stdout.write(self.style.WARNING('zstandard is not installed; measuring gzip only'))
+
+        bytes_per_second = options['bandwidth_kbps'] * 1000 / 8
+        for label, chunks in self.payloads():
+            size = sum(len(chunk) for chunk in chunks)
+            self.stdout.write(
+                f'{label}: {size:,} bytes in {len(chunks)} chunk(s), '
+                f'{size / bytes_per_second * 1000:.0f} ms to transfer uncompressed'
+            )
+            for codec, compress in self.codecs(options['zstd_level']).items():
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    compressed = compress(chunks)
+                    timings.append(time.perf_counter() - started)
+                cpu = statistics.median(timings)
+                saved = 1 - len(compressed) / size
+                self.stdout.write(
+                    f'    {codec}: {len(compressed):,} bytes ({saved:.1%} saved), '
+                    f'{cpu * 1000:.1f} ms CPU ({size / cpu / 1e6:.0f} MB/s), '
+                    f'{len(compressed) / bytes_per_second * 1000:.0f} ms to transfer'
+                )
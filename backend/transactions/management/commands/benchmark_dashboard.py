@@ -0,0 +1,82 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+ENDPOINTS = {
+    'dashboard': ('/api/transactions/dashboard/', '/api/transactions/async/dashboard/'),
+    'stats': ('/api/transactions/transactions/stats/', '/api/transactions/async/stats/'),
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Compare p50/p99 latency of the sync (WSGI) and async (ASGI) dashboard and stats endpoints under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=list(ENDPOINTS), default='dashboard')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        sync_path, async_path = ENDPOINTS[options['endpoint']]
+        total = options['requests']
+        concurrency = options['concurrency']
+        host = options['host']
+
+        self.stdout.write(f'{total} requests, concurrency {concurrency}, endpoint {options["endpoint"]}')
+
+        sync_latencies, sync_elapsed = self.run_sync(sync_path, total, concurrency, host)
+        self.report('sync  (WSGI)', sync_latencies, sync_elapsed)
+
+        async_latencies, async_elapsed = asyncio.run(self.run_async(async_path, total, concurrency, host))
+        self.report('async (ASGI)', async_latencies, async_elapsed)
+
+    def run_sync(self, path, total, concurrency, host):
+        def one(_):
+            client = Client(HTTP_HOST=host)
+            started = time.perf_counter()
+            response = client.get(path)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise RuntimeError(f'{path} returned {response.status_code}')
+            return elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one, range(total)))
+        return latencies, time.perf_counter() - started
+
+    async def run_async(self, path, total, concurrency, host):
+        client = AsyncClient(headers={'host': host})
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                elapsed = time.perf_counter() - started
+                if response.status_code != 200:
+                    raise RuntimeError(f'{path} returned {response.status_code}')
+                return elapsed
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(total)))
+        return list(latencies), time.perf_counter() - started
+
+    def report(self, label, latencies, elapsed):
+        self.stdout.write(
+            f'{label}: p50 {percentile(latencies, 50) * 1000:.1f} ms, '
+            f'p99 {percentile(latencies, 99) * 1000:.1f} ms, '
+            f'mean {statistics.mean(latencies) * 1000:.1f} ms, '
+            f'{len(latencies) / elapsed:.1f} req/s'
+        )
@@ -0,0 +1,46 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer, transaction_rows
+
+
+class Command(BaseCommand):
+    help = 'Compare TransactionSerializer with the read-only fast path: identical JSON and time per 1,000 rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per run')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per path')
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.order_by('-date_time', '-id')[:options['rows']]
+        renderer = JSONRenderer()
+
+        def model_serializer():
+            return renderer.render(TransactionSerializer(queryset, many=True).data)
+
+        def fast_path():
+            return renderer.render(transaction_rows.serialize(transaction_rows.values(queryset)))
+
+        if model_serializer() != fast_path():
+            raise CommandError('Fast path JSON differs from TransactionSerializer')
+        rows = queryset.count()
+        self.stdout.write(f'{rows} rows, JSON byte-identical')
+        if not rows:
+            return
+
+        results = {}
+        for label, run in (('ModelSerializer', model_serializer), ('fast path      ', fast_path)):
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            results[label] = statistics.median(timings) * 1000 * 1000 / rows
+            self.stdout.write(f'{label}: {results[label]:.2f} ms per 1,000 rows (query + serialize + render)')
+
+        model_time, fast_time = results.values()
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {model_time / fast_time:.1f}x'))
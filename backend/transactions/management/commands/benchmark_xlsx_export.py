@@ -0,0 +1,107 @@
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.exports import (
+    TRANSACTION_CSV_HEADER, TRANSACTION_XLSX_FORMATS, transaction_xlsx_rows, write_xlsx
+)
+from transactions.models import Transaction
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS to report
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_rows(count, seed=99):
+    """Transaction-shaped typed rows, so the benchmark can reach row counts the database does not have"""
+    rng = random.Random(seed)
+    customers = [f'Customer {n}' for n in range(2000)]
+    started = datetime(2020, 1, 1, 8, 0)
+    for pk in range(1, count + 1):
+        rate = Decimal(rng.randint(7600, 8400)) / Decimal(1000000)
+        thb = Decimal(rng.randint(1000, 5000000)) / Decimal(100)
+        yield [
+            pk,
+            rng.choice(('BUY', 'SELL')),
+            started + timedelta(minutes=pk * 3),
+            rng.choice(customers),
+            thb,
+            (thb / rate).quantize(Decimal('0.01')),
+            rate,
+            (Decimal(100000) / rate).quantize(Decimal('0.01')),
+            Decimal(rng.randint(-5000, 50000)) / Decimal(100),
+            None if pk % 10 else 'cash',
+        ]
+
+
+class Command(BaseCommand):
+    help = 'Measure time and peak memory of the write-only XLSX export at large row counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument(
+            '--source', choices=['synthetic', 'db'], default='synthetic',
+            help='Generated rows (default) or the stored transactions, capped at --rows'
+        )
+        parser.add_argument('--output', help='Keep the workbook at this path instead of a temporary file')
+        parser.add_argument('--progress', type=int, default=100000, help='Report every this many rows')
+
+    def handle(self, *args, **options):
+        count = options['rows']
+        if options['source'] == 'db':
+            queryset = Transaction.objects.order_by('date_time')[:count]
+            count = queryset.count()
+            if not count:
+                raise CommandError('No transactions to export')
+            rows = transaction_xlsx_rows(queryset)
+        else:
+            rows = synthetic_rows(count)
+
+        try:
+            from openpyxl.xml import LXML
+        except ImportError:
+            raise CommandError('XLSX export needs the openpyxl package')
+        self.stdout.write(f'Writing {count:,} rows ({options["source"]}), lxml {"on" if LXML else "off"}')
+
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+
+        def progress(rows):
+            for done, row in enumerate(rows, 1):
+                yield row
+                if done % options['progress'] == 0:
+                    elapsed = time.perf_counter() - started
+                    rss = peak_rss_mb()
+                    self.stdout.write(
+                        f'    {done:,} rows, {elapsed:.1f} s, {done / elapsed:,.0f} rows/s'
+                        + (f', peak RSS {rss:.0f} MB' if rss is not None else '')
+                    )
+
+        sheets = [('Transactions', TRANSACTION_CSV_HEADER, progress(rows), TRANSACTION_XLSX_FORMATS)]
+        if options['output']:
+            write_xlsx(options['output'], sheets)
+            size = os.path.getsize(options['output'])
+        else:
+            with tempfile.TemporaryFile() as output:
+                write_xlsx(output, sheets)
+                size = output.seek(0, os.SEEK_END)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{count:,} rows in {elapsed:.1f} s ({count / elapsed:,.0f} rows/s), {size / 1e6:.1f} MB'
+        ))
+        if rss_before is not None:
+            self.stdout.write(f'Peak RSS {peak_rss_mb():.0f} MB (was {rss_before:.0f} MB before writing)')
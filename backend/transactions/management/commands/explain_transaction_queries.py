@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from transactions.models import Transaction
+from transactions.reports import apply_filters
+
+# Filter combinations the transaction lists send, and the index each should use
+CASES = [
+    ('date range + amount + rate', ['start_date', 'end_date', 'min_mmk_amount', 'max_mmk_amount', 'min_rate', 'max_rate'],
+     'transaction_datetime_mmk_idx'),
+    ('date range + amount', ['start_date', 'end_date', 'min_mmk_amount', 'max_mmk_amount'],
+     'transaction_datetime_mmk_idx'),
+    ('type + date range', ['type', 'start_date', 'end_date'], 'transaction_type_datetime_idx'),
+    ('amount only', ['min_mmk_amount', 'max_mmk_amount'], 'transaction_mmk_datetime_idx'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Show the query plans of the transaction list filters and check they use the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Fail if a query does not use its index')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+
+    def sample_filters(self):
+        """Realistic values taken from the data: the last week and an amount seen in it"""
+        latest = Transaction.objects.order_by('-date_time').first()
+        if latest is None:
+            raise CommandError('No transactions to plan against')
+        end = latest.date_time.date()
+        amount = latest.mmk_amount
+        return {
+            'start_date': (end - timedelta(days=6)).isoformat(),
+            'end_date': end.isoformat(),
+            'type': latest.transaction_type,
+            'min_mmk_amount': amount * 99 / 100,
+            'max_mmk_amount': amount * 101 / 100,
+            'min_rate': latest.rate - 1,
+            'max_rate': latest.rate + 1,
+        }
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def handle(self, *args, **options):
+        sample = self.sample_filters()
+        failures = []
+        for label, names, index in CASES:
+            queryset = apply_filters(Transaction.objects.all(), {name: sample[name] for name in names})
+            page = queryset.order_by('-date_time').values('id', 'date_time')[:10]
+            plan = self.plan(page)
+
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(page)
+                rows = queryset.count()
+            elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+
+            used = any(index in line for line in plan)
+            if not used:
+                failures.append(f'{label}: expected {index}')
+            self.stdout.write(f'{label}: {rows} rows, page + count {elapsed:.2f} ms')
+            for line in plan:
+                self.stdout.write(f'    {line}')
+            self.stdout.write(self.style.SUCCESS(f'    uses {index}') if used else self.style.WARNING(f'    does not use {index}'))
+
+        if failures and options['check']:
+            raise CommandError('Indexes not used: ' + '; '.join(failures))
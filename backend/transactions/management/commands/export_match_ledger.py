@@ -0,0 +1,52 @@
+import csv
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.exports import (
+    ExportError, match_ledger_arrow_schema, match_ledger_csv_rows, record_batches, write_batches
+)
+from transactions.matching import MATCH_LEDGER_HEADER, match_ledger_rows
+
+
+class Command(BaseCommand):
+    help = 'Exports the BUY/SELL pairings of the profit matching (the match ledger) to CSV or Parquet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output file')
+        parser.add_argument('--format', choices=['csv', 'parquet'], help='File format (default: from the extension)')
+        parser.add_argument('--start-date', help='First day of matches to export (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day of matches to export (YYYY-MM-DD)')
+
+    def parse_date(self, value, name):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid {name}: {value}. Use YYYY-MM-DD.')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        file_format = options['format'] or ('parquet' if output.endswith('.parquet') else 'csv')
+        rows = match_ledger_rows(
+            self.parse_date(options['start_date'], 'start date'),
+            self.parse_date(options['end_date'], 'end date')
+        )
+
+        if file_format == 'parquet':
+            schema = match_ledger_arrow_schema()
+            try:
+                count = write_batches(output, schema, record_batches(rows, schema), 'parquet')
+            except ExportError as e:
+                raise CommandError(str(e))
+        else:
+            count = 0
+            with open(output, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(MATCH_LEDGER_HEADER)
+                for row in match_ledger_csv_rows(rows):
+                    writer.writerow(row)
+                    count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} matches to {output}'))
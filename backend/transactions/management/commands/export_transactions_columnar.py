@@ -0,0 +1,75 @@
+import os
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.customer_totals import next_month
+from transactions.exports import ARROW_BATCH_ROWS, COLUMNAR_FORMATS, ExportError, write_columnar
+from transactions.models import Transaction
+from transactions.reports import local_day_start
+
+
+class Command(BaseCommand):
+    help = 'Exports transactions to Parquet or Arrow IPC, optionally partitioned by month'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output file, or directory with --partition-by month')
+        parser.add_argument('--format', choices=list(COLUMNAR_FORMATS), default='parquet')
+        parser.add_argument(
+            '--partition-by', choices=['month'],
+            help='Write one file per month as <output>/month=YYYY-MM/transactions.<ext>'
+        )
+        parser.add_argument('--start-date', help='First day to export (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day to export (YYYY-MM-DD)')
+        parser.add_argument('--batch-rows', type=int, default=ARROW_BATCH_ROWS, help='Rows per record batch')
+
+    def parse_date(self, value, name):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid {name}: {value}. Use YYYY-MM-DD.')
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.order_by('date_time', 'id')
+        if options['start_date']:
+            start = self.parse_date(options['start_date'], 'start date')
+            queryset = queryset.filter(date_time__gte=local_day_start(start))
+        if options['end_date']:
+            end = self.parse_date(options['end_date'], 'end date')
+            queryset = queryset.filter(date_time__lt=local_day_start(end + timedelta(days=1)))
+
+        file_format = options['format']
+        extension = COLUMNAR_FORMATS[file_format][0]
+        try:
+            if not options['partition_by']:
+                rows = write_columnar(queryset, options['output'], file_format, options['batch_rows'])
+                self.stdout.write(self.style.SUCCESS(f"Wrote {rows} transactions to {options['output']}"))
+                return
+
+            first = queryset.first()
+            last = queryset.last()
+            if first is None:
+                self.stdout.write('No transactions to export')
+                return
+            month = timezone.localtime(first.date_time).date().replace(day=1)
+            last_month = timezone.localtime(last.date_time).date().replace(day=1)
+            total = files = 0
+            while month <= last_month:
+                following = next_month(month)
+                month_rows = queryset.filter(
+                    date_time__gte=local_day_start(month), date_time__lt=local_day_start(following)
+                )
+                if month_rows.exists():
+                    directory = os.path.join(options['output'], f"month={month.strftime('%Y-%m')}")
+                    os.makedirs(directory, exist_ok=True)
+                    path = os.path.join(directory, f'transactions.{extension}')
+                    rows = write_columnar(month_rows, path, file_format, options['batch_rows'])
+                    self.stdout.write(f'{path}: {rows} rows')
+                    total += rows
+                    files += 1
+                month = following
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} transactions in {files} monthly files"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.importer import TransactionImportError, detect_format, import_transactions
+
+
+class Command(BaseCommand):
+    help = 'Imports transactions from a CSV or XLSX ledger, skipping rows that are already stored'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file; the first row holds the column headers')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='File format (default: from the extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        try:
+            file_format = options['format'] or detect_format(options['path'])
+            with open(options['path'], 'rb') as stream:
+                result = import_transactions(stream, file_format, chunk_size=options['chunk_size'])
+        except (OSError, TransactionImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... and {result['error_count'] - len(result['errors'])} more invalid rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {result['rows']} rows: {result['created']} imported, "
+            f"{result['duplicates']} duplicates skipped, {result['error_count']} invalid; "
+            f"{result['profits_updated']} profits re-matched"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.customers import customer_id_for, merge_customers
+from transactions.models import Customer
+
+
+class Command(BaseCommand):
+    help = 'Merges one customer into another so both spellings resolve to the same customer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Name (any known spelling) of the customer to merge away')
+        parser.add_argument('target', help='Name (any known spelling) of the customer to keep')
+
+    def handle(self, *args, **options):
+        customers = []
+        for name in (options['source'], options['target']):
+            customer_id = customer_id_for(name)
+            if customer_id is None:
+                raise CommandError(f'Unknown customer: {name}')
+            customers.append(Customer.objects.get(id=customer_id))
+        source, target = customers
+        if source.id == target.id:
+            raise CommandError('Both names already belong to the same customer')
+
+        moved = merge_customers(source, target)
+        self.stdout.write(self.style.SUCCESS(
+            f'Merged "{source.name}" into "{target.name}" ({moved} transactions moved)'
+        ))
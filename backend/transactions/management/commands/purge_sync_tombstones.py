@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from transactions.sync import purge_tombstones, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than the retention window (run daily as a scheduled task)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Keep tombstones this many days (default: SYNC_TOMBSTONE_RETENTION_DAYS). '
+                 'Sync tokens older than the setting get a full snapshot, so do not go below it.'
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(days=options['days']) if options['days'] is not None else tombstone_retention()
+        purged = purge_tombstones(older_than)
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} tombstone(s) older than {older_than.days} days'))
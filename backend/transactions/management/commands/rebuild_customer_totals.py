@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from transactions.customer_totals import parse_month, next_month, refresh_customer_totals
+from transactions.models import CustomerMonthlyTotal
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-customer monthly totals used by the customer leaderboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-month', help='First month to rebuild (YYYY-MM); default all')
+        parser.add_argument('--end-month', help='Last month to rebuild (YYYY-MM); default all')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        start_date = parse_month(options['start_month']) if options['start_month'] else None
+        end_date = parse_month(options['end_month']) if options['end_month'] else None
+
+        refresh_customer_totals(
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=options['batch_size']
+        )
+
+        rows = CustomerMonthlyTotal.objects.all()
+        if start_date:
+            rows = rows.filter(month__gte=start_date)
+        if end_date:
+            rows = rows.filter(month__lt=next_month(end_date))
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt customer totals: {rows.count()} customer-month rows')
+        )
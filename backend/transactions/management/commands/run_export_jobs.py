@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from transactions.export_jobs import purge_exports, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background export jobs (as a scheduled or always-on task) and purge old export files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs instead of exiting')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+        parser.add_argument(
+            '--purge-days', type=int, default=7,
+            help='Delete jobs and files finished more than this many days ago (0 to keep everything)'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days']:
+            purged = purge_exports(timedelta(days=options['purge_days']))
+            if purged:
+                self.stdout.write(f'Purged {purged} old export(s)')
+
+        while True:
+            ran = run_pending_jobs()
+            if ran:
+                self.stdout.write(self.style.SUCCESS(f'Ran {ran} export job(s)'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
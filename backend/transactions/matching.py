@@ -0,0 +1,212 @@
+from collections import deque
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Transaction
+
+CENT = Decimal('0.01')
+
+
+MATCHED_TYPES = ('BUY', 'SELL')
+
+
+def iter_matches(rows, open_rows=None):
+    """
+    FIFO-match BUY and SELL rows, yielding each match as it is made.
+
+    rows are tuples starting (id, transaction_type, mmk_amount, rate) in
+    chronological order; further fields ride along untouched. This is the
+    same matching as calculate_profits: each BUY or SELL consumes the
+    oldest open rows of the other side, and every match earns
+    mmk / sell_rate - mmk / buy_rate (rounded to 0.01, half up). Yields
+    (buy_row, sell_row, mmk_matched, profit, profit_id), profit_id being
+    the row the profit is booked to: whichever side the match used up (the
+    waiting row when both are). Only rows still open are held in memory.
+    open_rows continues from an earlier state (see open_rows_before).
+    """
+    if open_rows is None:
+        open_rows = {'BUY': deque(), 'SELL': deque()}
+
+    for row in rows:
+        tx_type = row[1]
+        if tx_type not in open_rows:
+            continue
+        other_side = open_rows['SELL' if tx_type == 'BUY' else 'BUY']
+        tx_mmk = row[2]
+
+        while other_side and tx_mmk > 0:
+            waiting = other_side[0]
+            waiting_row, waiting_remaining = waiting
+            buy_row, sell_row = (row, waiting_row) if tx_type == 'BUY' else (waiting_row, row)
+            buy_rate, sell_rate = buy_row[3], sell_row[3]
+            if buy_rate == 0 or sell_rate == 0:
+                other_side.popleft()
+                continue
+
+            match_amount = min(waiting_remaining, tx_mmk)
+            profit = (match_amount / sell_rate - match_amount / buy_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+            if match_amount == waiting_remaining:
+                profit_id = waiting_row[0]
+                other_side.popleft()
+            else:
+                profit_id = row[0]
+                waiting[1] = waiting_remaining - match_amount
+            tx_mmk -= match_amount
+            yield buy_row, sell_row, match_amount, profit, profit_id
+
+        if tx_mmk > 0:
+            open_rows[tx_type].append([row, tx_mmk])
+
+
+def match_profits(rows, open_rows=None):
+    """
+    FIFO-match BUY and SELL rows (see iter_matches) and return {id: profit}
+    for every BUY and SELL row, and every row of open_rows. It runs in
+    memory; nothing is written.
+    """
+    profits = {}
+    for side in (open_rows or {}).values():
+        for row, _ in side:
+            profits[row[0]] = Decimal('0.00')
+
+    def registered(rows):
+        for row in rows:
+            if row[1] in MATCHED_TYPES:
+                profits[row[0]] = Decimal('0.00')
+            yield row
+
+    for _, _, _, profit, profit_id in iter_matches(registered(rows), open_rows):
+        profits[profit_id] += profit
+    return profits
+
+
+def open_rows_before(moment, fields):
+    """
+    The matching's queue of open rows just before `moment`, in the form
+    iter_matches continues from, without replaying the history.
+
+    Only one side is ever open (a row only waits once the other side is
+    used up), FIFO uses each side up in date order, and every matched MMK
+    pairs a BUY with a SELL. So the open rows are the newest rows of the
+    side with more MMK in total, covering the difference of the two totals,
+    the oldest of them only partly. That is one aggregate plus a backward
+    read of just the open rows. Rows with a zero rate or negative amount
+    are dropped by the matching rather than matched, which this does not
+    model; returns None when any come before `moment`.
+    """
+    earlier = Transaction.objects.filter(transaction_type__in=MATCHED_TYPES, date_time__lt=moment)
+    totals = earlier.aggregate(
+        buy=Sum('mmk_amount', filter=Q(transaction_type='BUY', mmk_amount__gt=0)),
+        sell=Sum('mmk_amount', filter=Q(transaction_type='SELL', mmk_amount__gt=0)),
+        irregular=Count('id', filter=Q(rate=0) | Q(mmk_amount__lt=0)),
+    )
+    if totals['irregular']:
+        return None
+
+    open_rows = {'BUY': deque(), 'SELL': deque()}
+    buy, sell = totals['buy'] or Decimal('0'), totals['sell'] or Decimal('0')
+    if buy == sell:
+        return open_rows
+    side = 'BUY' if buy > sell else 'SELL'
+    outstanding = abs(buy - sell)
+    newest_first = earlier.filter(transaction_type=side, mmk_amount__gt=0).order_by('-date_time', '-id')
+    for row in newest_first.values_list(*fields).iterator(chunk_size=100):
+        remaining = min(row[2], outstanding)
+        open_rows[side].appendleft([row, remaining])
+        outstanding -= remaining
+        if outstanding <= 0:
+            break
+    return open_rows
+
+
+MATCH_LEDGER_HEADER = [
+    'Matched At', 'Buy ID', 'Buy Date', 'Buy Customer', 'Sell ID', 'Sell Date', 'Sell Customer',
+    'MMK Matched', 'Buy Rate', 'Sell Rate', 'THB Buy', 'THB Sell', 'Profit', 'Profit Booked To'
+]
+
+
+def match_ledger_rows(start_date=None, end_date=None, chunk_size=2000):
+    """
+    The BUY/SELL pairings made by the matching, one row per match under
+    MATCH_LEDGER_HEADER, for matches made between start_date and end_date.
+
+    A match is made when its later transaction arrives, so that is its
+    date. Matching depends on every earlier row, so the transactions are
+    read from the first one in chunks, and reading stops after end_date;
+    nothing but the open rows is kept in memory. The THB sides are rounded
+    to cents; the profit is rounded from the exact difference, as stored.
+    """
+    from .reports import local_day, local_day_start
+
+    queryset = Transaction.objects.filter(transaction_type__in=MATCHED_TYPES)
+    if end_date:
+        queryset = queryset.filter(date_time__lt=local_day_start(end_date + timedelta(days=1)))
+    rows = queryset.order_by('date_time', 'id').values_list(
+        'id', 'transaction_type', 'mmk_amount', 'rate', 'date_time', 'customer'
+    ).iterator(chunk_size=chunk_size)
+
+    for buy_row, sell_row, mmk, profit, profit_id in iter_matches(rows):
+        matched_at = max(buy_row[4], sell_row[4])
+        if start_date and local_day(matched_at) < start_date:
+            continue
+        buy_id, _, _, buy_rate, buy_date, buy_customer = buy_row
+        sell_id, _, _, sell_rate, sell_date, sell_customer = sell_row
+        yield [
+            matched_at, buy_id, buy_date, buy_customer, sell_id, sell_date, sell_customer, mmk,
+            buy_rate, sell_rate,
+            (mmk / buy_rate).quantize(CENT, rounding=ROUND_HALF_UP),
+            (mmk / sell_rate).quantize(CENT, rounding=ROUND_HALF_UP),
+            profit, profit_id
+        ]
+
+
+def apply_matching(since=None):
+    """
+    Re-run the matching and write back only the profits that changed, with
+    one bulk_update. Returns the list of changed transactions.
+
+    With since (the earliest date_time a write touched), only the rows from
+    then on are replayed, continuing from the open rows before it
+    (open_rows_before): a row matched up before `since` keeps its profit,
+    and the open ones have none booked yet. Without it, or when the open
+    rows cannot be derived, every BUY/SELL transaction is replayed.
+
+    bulk_update skips the post_save handlers, so the customer totals of the
+    changed rows are refreshed here, with one grouped query for all of them
+    once the write commits.
+    """
+    from .customer_totals import refresh_customer_totals
+    from .reports import local_day
+
+    fields = ('id', 'transaction_type', 'mmk_amount', 'rate', 'profit', 'customer_ref_id', 'date_time')
+    queryset = Transaction.objects.filter(transaction_type__in=MATCHED_TYPES)
+    open_rows = open_rows_before(since, fields) if since is not None else None
+    if open_rows is not None:
+        queryset = queryset.filter(date_time__gte=since)
+    rows = list(queryset.order_by('date_time', 'id').values_list(*fields))
+    # Listed before matching, which pops the rows it uses up
+    open_before = [row for side in (open_rows or {}).values() for row, _ in side]
+    profits = match_profits(rows, open_rows)
+
+    now = timezone.now()
+    changed = []
+    for tx_id, _, _, _, stored_profit, customer_id, date_time in open_before + rows:
+        if profits[tx_id] != stored_profit:
+            tx = Transaction(
+                id=tx_id, profit=profits[tx_id], customer_ref_id=customer_id, date_time=date_time, updated_at=now
+            )
+            changed.append(tx)
+    if not changed:
+        return changed
+
+    customers = {tx.customer_ref_id for tx in changed if tx.customer_ref_id is not None}
+    first_day = local_day(min(tx.date_time for tx in changed))
+    last_day = local_day(max(tx.date_time for tx in changed))
+    with db_transaction.atomic():
+        Transaction.objects.bulk_update(changed, ['profit', 'updated_at'], batch_size=500)
+        db_transaction.on_commit(lambda: refresh_customer_totals(customers, first_day, last_day))
+    return changed
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:48
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_local_buckets(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    batch = []
+    for tx in Transaction.objects.only('id', 'date_time').order_by('id').iterator(chunk_size=2000):
+        local_time = timezone.localtime(tx.date_time) if timezone.is_aware(tx.date_time) else tx.date_time
+        tx.local_hour = local_time.hour
+        tx.local_weekday = local_time.weekday()
+        batch.append(tx)
+        if len(batch) >= 2000:
+            Transaction.objects.bulk_update(batch, ['local_hour', 'local_weekday'])
+            batch = []
+    if batch:
+        Transaction.objects.bulk_update(batch, ['local_hour', 'local_weekday'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0018_alter_bankaccount_options_alter_dailybalance_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='local_hour',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='local_weekday',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='0 = Monday'),
+        ),
+        migrations.RunPython(fill_local_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0019_transaction_local_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerMonthlyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer', models.CharField(max_length=200)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('thb_volume', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('mmk_volume', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('profit', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-month', 'customer'],
+                'indexes': [models.Index(fields=['month', 'customer'], name='transaction_month_12f9fd_idx')],
+                'unique_together': {('customer', 'month')},
+            },
+        ),
+    ]
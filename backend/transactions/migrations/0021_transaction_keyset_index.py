@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0020_customermonthlytotal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date_time', 'id'], name='transaction_datetime_id_idx'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+from django.db import migrations
+
+# SQLite: an external-content FTS5 table over customer and remarks, kept in
+# step with the transactions table by triggers. The trigram tokenizer matches
+# any substring of three or more characters, so Burmese text (which has no
+# spaces between words) is searchable the same way as Latin names.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE transactions_transaction_fts USING fts5(
+        customer, remarks,
+        content='transactions_transaction', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ai AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ad AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_au AFTER UPDATE OF customer, remarks ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+        INSERT INTO transactions_transaction_fts(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ai",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_au",
+    "DROP TABLE IF EXISTS transactions_transaction_fts",
+]
+
+# PostgreSQL: trigram GIN indexes on the same UPPER(col::text) expression that
+# Django's icontains lookup generates, so the existing filter can use them
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS transactions_transaction_customer_trgm
+    ON transactions_transaction USING gin (UPPER(customer::text) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS transactions_transaction_remarks_trgm
+    ON transactions_transaction USING gin (UPPER(remarks::text) gin_trgm_ops)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS transactions_transaction_customer_trgm",
+    "DROP INDEX IF EXISTS transactions_transaction_remarks_trgm",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+                cursor.execute("DROP TABLE temp.fts_probe")
+            except Exception:
+                # No FTS5 or SQLite older than 3.34; search keeps using LIKE
+                return
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0021_transaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
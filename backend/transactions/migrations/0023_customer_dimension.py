@@ -0,0 +1,112 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copy of the customer resolution in transactions.customers as of
+# this migration, so later changes to the app code do not change it
+
+
+def link_transactions(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    Customer = apps.get_model('transactions', 'Customer')
+    CustomerAlias = apps.get_model('transactions', 'CustomerAlias')
+    whitespace = re.compile(r'\s+')
+
+    def canonical(name):
+        return whitespace.sub(' ', (name or '').strip())
+
+    found = dict(CustomerAlias.objects.values_list('normalized', 'customer_id'))
+    last_id = 0
+    while True:
+        rows = list(
+            Transaction.objects.filter(customer_ref__isnull=True, id__gt=last_id).order_by('id')
+            .values_list('id', 'customer')[:2000]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        by_customer = defaultdict(list)
+        for pk, name in rows:
+            key = canonical(name).casefold()
+            if key not in found:
+                customer = Customer.objects.create(name=canonical(name))
+                CustomerAlias.objects.create(customer=customer, name=customer.name, normalized=key)
+                found[key] = customer.id
+            by_customer[found[key]].append(pk)
+        for customer_id, pks in by_customer.items():
+            Transaction.objects.filter(id__in=pks).update(customer_ref_id=customer_id)
+
+
+def clear_customer_totals(apps, schema_editor):
+    # The totals are derived data keyed by name; backfill_customers rebuilds them by customer id
+    apps.get_model('transactions', 'CustomerMonthlyTotal').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0022_transaction_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, help_text='Canonical name', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Spelling as first seen', max_length=200)),
+                ('normalized', models.CharField(help_text='Trimmed, single-spaced, case-folded name', max_length=200, unique=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='transactions.customer')),
+            ],
+            options={
+                'ordering': ['normalized'],
+            },
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='customer_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='transactions.customer'),
+        ),
+        migrations.RunPython(link_transactions, migrations.RunPython.noop),
+        migrations.RunPython(clear_customer_totals, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='customermonthlytotal',
+            unique_together=set(),
+        ),
+        migrations.RemoveIndex(
+            model_name='customermonthlytotal',
+            name='transaction_month_12f9fd_idx',
+        ),
+        migrations.AddField(
+            model_name='customermonthlytotal',
+            name='customer_ref',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='transactions.customer'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='customermonthlytotal',
+            name='customer',
+            field=models.CharField(help_text='Canonical name at the time of the refresh', max_length=200),
+        ),
+        migrations.AlterUniqueTogether(
+            name='customermonthlytotal',
+            unique_together={('customer_ref', 'month')},
+        ),
+        migrations.AddIndex(
+            model_name='customermonthlytotal',
+            index=models.Index(fields=['month', 'customer_ref'], name='transaction_month_cust_ref_idx'),
+        ),
+    ]
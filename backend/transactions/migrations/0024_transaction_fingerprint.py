@@ -0,0 +1,58 @@
+import hashlib
+import re
+from datetime import timezone as dt_timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def transaction_fingerprint(date_time, customer, thb_amount, mmk_amount, rate):
+    # Frozen copy of transactions.importer.transaction_fingerprint as of this migration
+    def quantized(value, places):
+        return str(Decimal(value).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+    if timezone.is_aware(date_time):
+        date_time = date_time.astimezone(dt_timezone.utc)
+    key = '|'.join([
+        date_time.strftime('%Y-%m-%dT%H:%M:%S'),
+        re.sub(r'\s+', ' ', (customer or '').strip()).casefold(),
+        quantized(thb_amount, 2),
+        quantized(mmk_amount, 2),
+        quantized(rate, 4),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def fill_fingerprints(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    last_id = 0
+    while True:
+        chunk = list(
+            Transaction.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'date_time', 'customer', 'thb_amount', 'mmk_amount', 'rate')[:2000]
+        )
+        if not chunk:
+            break
+        for tx in chunk:
+            tx.fingerprint = transaction_fingerprint(
+                tx.date_time, tx.customer, tx.thb_amount, tx.mmk_amount, tx.rate
+            )
+        Transaction.objects.bulk_update(chunk, ['fingerprint'])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0023_customer_dimension'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0025_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', 'date_time'], name='transaction_type_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date_time', 'mmk_amount'], name='transaction_datetime_mmk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['mmk_amount', 'date_time'], name='transaction_mmk_datetime_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0027_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['customer_ref', 'date_time'], name='transaction_custref_dt_idx'),
+        ),
+    ]
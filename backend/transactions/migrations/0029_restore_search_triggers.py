@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# On SQLite, AddField of a column with a default (0024 fingerprint, 0025
+# updated_at) rebuilds transactions_transaction, and the rebuild drops the
+# triggers that 0022 created to keep the FTS5 index in step. Recreate them
+# and rebuild the index from the table, so rows written since are found.
+# Frozen copy of the 0022 statements.
+SQLITE_FORWARD = [
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ai",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_au",
+    """
+    CREATE TRIGGER transactions_transaction_fts_ai AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ad AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_au AFTER UPDATE OF customer, remarks ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+        INSERT INTO transactions_transaction_fts(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts) VALUES ('rebuild')",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_transaction_fts'"
+        )
+        if cursor.fetchone() is None:
+            # 0022 found no FTS5 support; search uses LIKE
+            return
+    for statement in SQLITE_FORWARD:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0028_customer_statement_index'),
+    ]
+
+    operations = [
+        # 0022's reverse drops the triggers along with the index
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
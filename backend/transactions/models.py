@@ -1,6 +1,40 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 
+from .customers import resolve_customer_ids
+from .importer import transaction_fingerprint
+
+class Customer(models.Model):
+    """
+    One real customer. Transactions keep the name as typed in `customer`
+    and point here through `customer_ref`; every spelling seen is recorded
+    as a CustomerAlias.
+    """
+    name = models.CharField(max_length=200, db_index=True, help_text="Canonical name")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+class CustomerAlias(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='aliases')
+    name = models.CharField(max_length=200, help_text="Spelling as first seen")
+    normalized = models.CharField(max_length=200, unique=True, help_text="Trimmed, single-spaced, case-folded name")
+
+    class Meta:
+        ordering = ['normalized']
+
+    def __str__(self):
+        return f"{self.name} -> {self.customer.name}"
+
+# Fields that transaction_fingerprint() hashes
+FINGERPRINT_FIELDS = {'date_time', 'customer', 'thb_amount', 'mmk_amount', 'rate'}
+
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
         ('BUY', 'Buy'),
@@ -11,18 +45,93 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=5, choices=TRANSACTION_TYPES, default='BUY', db_index=True)
     date_time = models.DateTimeField(default=timezone.now, db_index=True)
     customer = models.CharField(max_length=200, db_index=True)
+    # Integer key for customer filters and group-bys, resolved from `customer` on save
+    customer_ref = models.ForeignKey(
+        Customer, on_delete=models.PROTECT, null=True, blank=True, related_name='transactions'
+    )
     thb_amount = models.DecimalField(max_digits=10, decimal_places=2)
     mmk_amount = models.DecimalField(max_digits=15, decimal_places=2)
     rate = models.DecimalField(max_digits=10, decimal_places=4)
     hundred_k_rate = models.DecimalField(max_digits=10, decimal_places=2)
     profit = models.DecimalField(max_digits=10, decimal_places=2)
     remarks = models.TextField(blank=True, null=True)
+    # Local-time buckets of date_time, stored so hour/weekday reports can group
+    # on plain columns instead of applying datetime functions to every row
+    local_hour = models.PositiveSmallIntegerField(default=0, editable=False)
+    local_weekday = models.PositiveSmallIntegerField(default=0, editable=False, help_text="0 = Monday")
+    # Hash of (date_time, customer, amounts, rate) that imports use to skip rows already stored
+    fingerprint = models.CharField(max_length=40, blank=True, default='', db_index=True, editable=False)
+    # Last write, for delta sync; every save (including update_fields saves) sets it
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.date_time.strftime('%Y-%m-%d %H:%M')} - {self.customer} ({self.transaction_type})"
 
+    def refresh_derived_fields(self):
+        """
+        Recompute the stored columns derived from other fields. save() calls
+        this; code that writes with bulk_create() must call it itself, along
+        with customers.assign_customer_refs() for the customer key.
+        """
+        local_time = timezone.localtime(self.date_time) if timezone.is_aware(self.date_time) else self.date_time
+        self.local_hour = local_time.hour
+        self.local_weekday = local_time.weekday()
+        self.fingerprint = transaction_fingerprint(
+            self.date_time, self.customer, self.thb_amount, self.mmk_amount, self.rate
+        )
+
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'customer' in update_fields:
+            self.customer_ref_id = resolve_customer_ids([self.customer])[self.customer]
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'customer_ref'}
+        if update_fields is not None and 'date_time' in update_fields:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'local_hour', 'local_weekday'}
+        if update_fields is not None and FINGERPRINT_FIELDS & set(update_fields):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'fingerprint'}
+        if update_fields is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'updated_at'}
+        super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-date_time'] 
+        ordering = ['-date_time']
+        indexes = [
+            # Keyset pagination walks (date_time, id) in either direction
+            models.Index(fields=['date_time', 'id'], name='transaction_datetime_id_idx'),
+            # Type filter plus date range, already in date_time order
+            models.Index(fields=['transaction_type', 'date_time'], name='transaction_type_datetime_idx'),
+            # Date range narrowed by amount without reading the table rows
+            models.Index(fields=['date_time', 'mmk_amount'], name='transaction_datetime_mmk_idx'),
+            # "The 2,000,000 MMK one" with no date range
+            models.Index(fields=['mmk_amount', 'date_time'], name='transaction_mmk_datetime_idx'),
+            # One customer's statement, in date order
+            models.Index(fields=['customer_ref', 'date_time'], name='transaction_custref_dt_idx'),
+        ]
+
+class CustomerMonthlyTotal(models.Model):
+    """
+    Per-customer, per-month transaction totals, maintained on every
+    transaction write so leaderboards never have to scan transactions.
+    """
+    customer_ref = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='monthly_totals')
+    customer = models.CharField(max_length=200, help_text="Canonical name at the time of the refresh")
+    month = models.DateField(help_text="First day of the month")
+    transaction_count = models.PositiveIntegerField(default=0)
+    thb_volume = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    mmk_volume = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    profit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['customer_ref', 'month']
+        indexes = [models.Index(fields=['month', 'customer_ref'], name='transaction_month_cust_ref_idx')]
+        ordering = ['-month', 'customer']
+
+    def __str__(self):
+        return f"{self.customer} {self.month.strftime('%Y-%m')}: {self.transaction_count} transactions"
 
 class BankAccount(models.Model):
     CURRENCY_CHOICES = [
@@ -47,7 +156,7 @@ class DailyExchangeRate(models.Model):
     date = models.DateField(unique=True)
     rate = models.DecimalField(max_digits=10, decimal_places=4, help_text="MMK to THB exchange rate")
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"{self.date}: {self.rate} MMK/THB"
@@ -61,7 +170,7 @@ class DailyBalance(models.Model):
     balance = models.DecimalField(max_digits=15, decimal_places=2)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         unique_together = ['bank_account', 'date']  # Prevent duplicate entries
@@ -109,7 +218,7 @@ class Expense(models.Model):
     remarks = models.TextField(blank=True, null=True)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-date', '-created_at']
@@ -117,6 +226,65 @@ class Expense(models.Model):
     def __str__(self):
         return f"{self.date} - {self.expense_type.name}: {self.amount}"
 
+class DeletedRecord(models.Model):
+    """
+    Tombstone of a deleted row, so delta sync can tell clients to drop it
+    from their local copy. Written by the post_delete handlers in
+    transactions.signals.
+    """
+    collection = models.CharField(max_length=30, help_text="Sync collection name, e.g. transactions")
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['collection', 'deleted_at'], name='deletedrecord_coll_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection} #{self.object_id} deleted at {self.deleted_at}"
+
+class ExportJob(models.Model):
+    """
+    An export generated in the background (transactions.export_jobs) and
+    kept on disk under EXPORT_ROOT. artifact_key hashes the kind, format,
+    parameters and data version, so an identical request reuses the file.
+    """
+    KINDS = [
+        ('transactions', 'Transactions'),
+        ('daily_summary', 'Daily summary'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KINDS)
+    file_format = models.CharField(max_length=10)
+    params = models.JSONField(default=dict, blank=True)
+    artifact_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    file_name = models.CharField(max_length=255, blank=True, help_text="Download name of the artifact")
+    size = models.BigIntegerField(null=True, blank=True)
+    rows = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} export ({self.file_format}) {self.status}"
+
 # Temporary management command for clearing Expense records
 if __name__ == '__main__':
     from django.conf import settings
@@ -124,4 +292,4 @@ if __name__ == '__main__':
     django.setup()
     from transactions.models import Expense
     Expense.objects.all().delete()
-    print('All Expense records deleted.') 
\ No newline at end of file
+    print('All Expense records deleted.')
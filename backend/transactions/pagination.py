@@ -0,0 +1,144 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Keyset pagination walks transactions in (date_time, id) order, so a page is
+# always "the next N rows after this key" - one indexed range scan, no OFFSET
+# and no COUNT, whatever the depth.
+KEYSET_ORDERINGS = ('-date_time', 'date_time')
+
+
+def encode_cursor(date_time, pk, backwards=False):
+    """Opaque cursor pointing just past the (date_time, id) key of a row"""
+    payload = {'d': date_time.isoformat(), 'i': pk}
+    if backwards:
+        payload['b'] = 1
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (date_time, id, backwards); raises ValueError on a bad cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        date_time = parse_datetime(payload['d'])
+        pk = int(payload['i'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if date_time is None:
+        raise ValueError("Invalid cursor")
+    return date_time, pk, bool(payload.get('b'))
+
+
+def _row_key(row):
+    if isinstance(row, dict):
+        return row['date_time'], row['id']
+    return row.date_time, row.pk
+
+
+def keyset_page(queryset, cursor=None, page_size=10, ordering='-date_time'):
+    """
+    Fetch one page of a Transaction queryset by keyset on (date_time, id).
+
+    The queryset may yield model instances or values() dicts that include
+    date_time and id. cursor is an opaque value from a previous page (None
+    for the first page).
+    Returns (rows, next_cursor, previous_cursor); a cursor is None when there
+    is nothing further in that direction.
+    """
+    if ordering not in KEYSET_ORDERINGS:
+        raise ValueError(f"Cursor pagination supports ordering by {' or '.join(KEYSET_ORDERINGS)}")
+    descending = ordering.startswith('-')
+
+    backwards = False
+    if cursor:
+        date_time, pk, backwards = decode_cursor(cursor)
+        # Rows strictly after the key in the direction being walked
+        after = descending != backwards
+        if after:
+            queryset = queryset.filter(
+                Q(date_time__lt=date_time) | Q(date_time=date_time, id__lt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(date_time__gt=date_time) | Q(date_time=date_time, id__gt=pk)
+            )
+
+    walk_descending = descending != backwards
+    order = ('-date_time', '-id') if walk_descending else ('date_time', 'id')
+    rows = list(queryset.order_by(*order)[:page_size + 1])
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_more or backwards:
+            next_cursor = encode_cursor(*_row_key(last))
+        if (has_more and backwards) or (cursor and not backwards):
+            previous_cursor = encode_cursor(*_row_key(first), backwards=True)
+    return rows, next_cursor, previous_cursor
+
+
+class TransactionPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; switches to keyset pagination when
+    the request carries a cursor (or ?pagination=cursor for the first page).
+
+    Keyset pages follow the view's date_time ordering and return next/previous
+    links without a total count.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def use_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get('pagination') == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.use_cursor(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        ordering = queryset.query.order_by[0] if queryset.query.order_by else '-date_time'
+        if ordering not in KEYSET_ORDERINGS:
+            ordering = '-date_time'
+        try:
+            rows, self.next_cursor, self.previous_cursor = keyset_page(
+                queryset,
+                request.query_params.get(self.cursor_query_param) or None,
+                self.get_page_size(request),
+                ordering
+            )
+        except ValueError as e:
+            raise ValidationError({'error': str(e)})
+        return rows
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), 'pagination')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self._cursor_link(self.next_cursor),
+            'previous': self._cursor_link(self.previous_cursor),
+            'results': data
+        })
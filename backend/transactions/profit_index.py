@@ -0,0 +1,142 @@
+import threading
+from decimal import Decimal
+
+from django.utils import timezone
+
+
+class FenwickTree:
+    """
+    Binary indexed tree of fixed size whose slots hold tuples of numbers.
+
+    add() and prefix_sum() are O(log n); range_sum(lo, hi) is inclusive.
+    """
+
+    def __init__(self, size, width):
+        self.size = size
+        self.width = width
+        self._tree = [[0] * width for _ in range(size + 1)]
+
+    @classmethod
+    def from_values(cls, values, width):
+        """Build a tree from a list of per-slot tuples in O(n)"""
+        tree = cls(len(values), width)
+        nodes = tree._tree
+        for i, value in enumerate(values, start=1):
+            node = nodes[i]
+            for k in range(width):
+                node[k] += value[k]
+            parent = i + (i & -i)
+            if parent <= tree.size:
+                parent_node = nodes[parent]
+                for k in range(width):
+                    parent_node[k] += node[k]
+        return tree
+
+    def add(self, index, deltas):
+        i = index + 1
+        while i <= self.size:
+            node = self._tree[i]
+            for k in range(self.width):
+                node[k] += deltas[k]
+            i += i & -i
+
+    def prefix_sum(self, index):
+        totals = [0] * self.width
+        i = min(index + 1, self.size)
+        while i > 0:
+            node = self._tree[i]
+            for k in range(self.width):
+                totals[k] += node[k]
+            i -= i & -i
+        return totals
+
+    def range_sum(self, lo, hi):
+        if hi < lo:
+            return [0] * self.width
+        upper = self.prefix_sum(hi)
+        if lo <= 0:
+            return upper
+        lower = self.prefix_sum(lo - 1)
+        return [u - l for u, l in zip(upper, lower)]
+
+
+class ProfitRangeIndex:
+    """
+    In-process prefix-sum index of per-day profit, volume and transaction count.
+
+    Profits come from DailyProfit rows; volume and count come from the
+    transactions of each day. Each worker process holds its own tree,
+    tagged with the data version it was built from (caching.data_version
+    plus the DailyProfit table's). A read whose version differs rebuilds
+    it first, so writes from other workers, queryset updates, bulk_create()
+    and imports are all picked up.
+    """
+
+    FIELDS = (
+        'buy_sell_profit', 'other_profit', 'total_profit',
+        'thb_volume', 'mmk_volume', 'transaction_count',
+    )
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tree = None
+        self._origin = None
+        self._version = None
+
+    def _zero(self):
+        return [Decimal('0')] * (len(self.FIELDS) - 1) + [0]
+
+    @staticmethod
+    def current_version():
+        from .caching import data_version, table_version
+        from .models import DailyProfit
+
+        return f'{data_version()}|{table_version(DailyProfit)}'
+
+    def rebuild(self, version=None):
+        """Load every day from the database and rebuild the tree in O(n)"""
+        from .models import DailyProfit
+        from .reports import build_report_queryset
+
+        # Read before the rows: a write in between leaves an older version, so
+        # the next read rebuilds again rather than serving a stale tree
+        version = version or self.current_version()
+        points = {}
+        for day, buy_sell, other, total in DailyProfit.objects.values_list(
+            'date', 'buy_sell_profit', 'other_profit', 'total_profit'
+        ):
+            point = points.setdefault(day, self._zero())
+            point[0:3] = [buy_sell, other, total]
+
+        volumes = build_report_queryset(['thb_volume', 'mmk_volume', 'count'], ['day'])
+        for day, thb_volume, mmk_volume, count in volumes.values_list(
+            'day', 'thb_volume', 'mmk_volume', 'count'
+        ):
+            point = points.setdefault(day, self._zero())
+            point[3:6] = [thb_volume or Decimal('0'), mmk_volume or Decimal('0'), count]
+
+        origin = min(points) if points else timezone.localdate()
+        values = [self._zero() for _ in range(((max(points) - origin).days + 1) if points else 1)]
+        for day, point in points.items():
+            values[(day - origin).days] = point
+        with self._lock:
+            self._origin = origin
+            self._tree = FenwickTree.from_values(values, len(self.FIELDS))
+            self._version = version
+
+    def range_totals(self, start_date, end_date):
+        """Totals for start_date..end_date (inclusive) in O(log n), rebuilding first if the data changed"""
+        version = self.current_version()
+        with self._lock:
+            if version != self._version:
+                self.rebuild(version)
+            lo = max((start_date - self._origin).days, 0)
+            hi = min((end_date - self._origin).days, self._tree.size - 1)
+            sums = self._tree.range_sum(lo, hi)
+
+        totals = {name: float(value) for name, value in zip(self.FIELDS, sums)}
+        totals['transaction_count'] = int(sums[-1])
+        return totals
+
+
+profit_index = ProfitRangeIndex()
@@ -0,0 +1,69 @@
+from rest_framework.renderers import JSONRenderer
+
+from .serializers import requested_fields
+
+
+def to_columnar(data, columns=None):
+    """
+    Turn a list of row dicts into {'columns': [...], 'rows': [[...], ...]}.
+    Paginated payloads keep their other keys and get `results` converted;
+    anything else (errors, single objects) is returned unchanged. Without
+    columns, the names come from the first row.
+    """
+    if isinstance(data, dict):
+        if isinstance(data.get('results'), list):
+            return {**data, 'results': to_columnar(data['results'], columns)}
+        return data
+    if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+        if columns is None:
+            columns = list(data[0]) if data else []
+        return {
+            'columns': columns,
+            'rows': [[row.get(column) for column in columns] for row in data],
+        }
+    return data
+
+
+def columnar_serializer(serializer_class):
+    """
+    Name the serializer whose fields are the columns of an @api_view list
+    endpoint (put it above @api_view), so empty pages still carry them
+    """
+    def decorator(view):
+        view.cls.columnar_serializer_class = serializer_class
+        return view
+    return decorator
+
+
+def list_columns(renderer_context):
+    """
+    Columns of a list response: the readable fields of the view's serializer,
+    narrowed by ?fields=. None when the view is not a list of serializer rows.
+    """
+    view = renderer_context.get('view')
+    serializer_class = getattr(view, 'columnar_serializer_class', None)
+    if serializer_class is not None:
+        serializer = serializer_class()
+    elif getattr(view, 'action', None) == 'list' and hasattr(view, 'get_serializer'):
+        serializer = view.get_serializer()
+    else:
+        return None
+    available = [name for name, field in serializer.fields.items() if not field.write_only]
+    return requested_fields(renderer_context.get('request'), available) or available
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    ?format=columnar: list responses as column names plus row arrays, so
+    keys are sent once instead of once per row
+    """
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        rows = data.get('results') if isinstance(data, dict) else data
+        response = renderer_context.get('response')
+        columns = None
+        if isinstance(rows, list) and (response is None or not response.exception):
+            columns = list_columns(renderer_context)
+        return super().render(to_columnar(data, columns), accepted_media_type, renderer_context)
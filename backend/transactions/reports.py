@@ -0,0 +1,277 @@
+import calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Avg, Count, DateField, F, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .customers import customer_id_for
+from .models import Customer, Transaction
+
+
+class ReportError(ValueError):
+    """Raised when a report definition names an unknown metric, dimension or filter."""
+
+
+# Aggregates that can be requested as report columns
+METRICS = {
+    'count': lambda: Count('id'),
+    'thb_volume': lambda: Sum('thb_amount'),
+    'mmk_volume': lambda: Sum('mmk_amount'),
+    'profit': lambda: Sum('profit'),
+    'avg_rate': lambda: Avg('rate'),
+    'first_seen': lambda: Min('date_time'),
+    'last_seen': lambda: Max('date_time'),
+}
+
+# Group-by keys. Time buckets use the current timezone, the same as the
+# date_time__date lookups used by the hand-written reports. Hour and weekday
+# read the stored local buckets rather than extracting them per row.
+DIMENSIONS = {
+    'day': lambda: TruncDate('date_time'),
+    'week': lambda: TruncWeek('date_time', output_field=DateField()),
+    'month': lambda: TruncMonth('date_time', output_field=DateField()),
+    'hour': lambda: F('local_hour'),
+    'weekday': lambda: F('local_weekday'),
+    'type': lambda: F('transaction_type'),
+    'customer': lambda: F('customer_ref_id'),
+}
+
+# Dimensions grouped directly on a column, mapped to the row key they produce.
+# Customer groups on the integer customer_ref_id key; run_report() turns the ids
+# back into canonical names.
+COLUMN_DIMENSIONS = {
+    'customer': 'customer_ref_id',
+}
+
+# Numeric columns with min_<field>/max_<field> range filters (bounds inclusive)
+RANGE_FIELDS = ('mmk_amount', 'thb_amount', 'rate', 'profit')
+RANGE_FILTERS = tuple(f'{bound}_{field}' for field in RANGE_FIELDS for bound in ('min', 'max'))
+
+FILTERS = ('start_date', 'end_date', 'type', 'customer', 'customer_id', *RANGE_FILTERS)
+
+
+def _parse_date(value, name):
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ReportError(f"Invalid {name} format. Use YYYY-MM-DD.")
+
+
+def _split(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value if item and item.strip()]
+
+
+def local_day_start(day):
+    """Aware datetime of local midnight at the start of day"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def local_day(value):
+    """Local calendar day of a datetime (naive values are taken as local already)"""
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def apply_filters(queryset, filters):
+    """
+    Apply report filters (start_date, end_date, type, customer, min_/max_ ranges) to a Transaction queryset
+    """
+    filters = {key: value for key, value in (filters or {}).items() if value not in (None, '')}
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ReportError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+
+    # Plain date_time ranges (rather than date_time__date) keep the date_time index usable
+    if 'start_date' in filters:
+        start = _parse_date(filters['start_date'], 'start_date')
+        queryset = queryset.filter(date_time__gte=local_day_start(start))
+    if 'end_date' in filters:
+        end = _parse_date(filters['end_date'], 'end_date')
+        queryset = queryset.filter(date_time__lt=local_day_start(end + timedelta(days=1)))
+    if 'type' in filters:
+        types = [t.upper() for t in _split(filters['type'])]
+        valid_types = [t[0] for t in Transaction.TRANSACTION_TYPES]
+        invalid = [t for t in types if t not in valid_types]
+        if invalid:
+            raise ReportError(f"Invalid transaction type. Must be one of {', '.join(valid_types)}")
+        queryset = queryset.filter(transaction_type__in=types)
+    if 'customer' in filters:
+        # Any known spelling of the name selects the customer's integer key
+        customer_id = customer_id_for(filters['customer'])
+        queryset = queryset.filter(customer_ref_id=customer_id) if customer_id else queryset.none()
+    if 'customer_id' in filters:
+        try:
+            queryset = queryset.filter(customer_ref_id=int(filters['customer_id']))
+        except (TypeError, ValueError):
+            raise ReportError("customer_id must be an integer")
+    for name in RANGE_FILTERS:
+        if name in filters:
+            bound, field = name.split('_', 1)
+            try:
+                value = Decimal(str(filters[name]).replace(',', ''))
+            except InvalidOperation:
+                raise ReportError(f"{name} must be a number")
+            if not value.is_finite():
+                raise ReportError(f"{name} must be a number")
+            lookup = 'gte' if bound == 'min' else 'lte'
+            queryset = queryset.filter(**{f'{field}__{lookup}': value})
+    return queryset
+
+
+def _validate(metrics, dimensions):
+    if not metrics:
+        raise ReportError("At least one metric is required")
+    unknown_metrics = [m for m in metrics if m not in METRICS]
+    if unknown_metrics:
+        raise ReportError(
+            f"Unknown metric(s): {', '.join(unknown_metrics)}. Must be one of {', '.join(METRICS)}"
+        )
+    unknown_dimensions = [d for d in dimensions if d not in DIMENSIONS]
+    if unknown_dimensions:
+        raise ReportError(
+            f"Unknown dimension(s): {', '.join(unknown_dimensions)}. Must be one of {', '.join(DIMENSIONS)}"
+        )
+    if len(set(metrics)) != len(metrics) or len(set(dimensions)) != len(dimensions):
+        raise ReportError("Metrics and dimensions must not be repeated")
+
+
+def build_report_queryset(metrics, dimensions, filters=None):
+    """
+    Compile metrics x dimensions into a single GROUP BY query.
+
+    Returns a values() queryset whose rows carry one key per dimension and
+    one key per metric, ordered by the dimensions. Dimensions listed in
+    COLUMN_DIMENSIONS appear under their column name (customer_ref_id).
+    """
+    metrics = _split(metrics)
+    dimensions = _split(dimensions)
+    _validate(metrics, dimensions)
+    if not dimensions:
+        raise ReportError("At least one dimension is required for a grouped report")
+
+    # Column dimensions are grouped on directly; Django refuses an annotation
+    # that shadows a field of the same name
+    keys = [COLUMN_DIMENSIONS.get(d, d) for d in dimensions]
+    annotations = {d: DIMENSIONS[d]() for d in dimensions if d not in COLUMN_DIMENSIONS}
+
+    # order_by() clears Meta.ordering so it does not leak into the GROUP BY
+    queryset = apply_filters(Transaction.objects.order_by(), filters)
+    return (
+        queryset
+        .annotate(**annotations)
+        .values(*keys)
+        .annotate(**{m: METRICS[m]() for m in metrics})
+        .order_by(*keys)
+    )
+
+
+def _to_json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def run_report(metrics, dimensions=(), filters=None):
+    """
+    Run a report and return it in columnar form:
+
+        {'dimensions': [...], 'metrics': [...], 'row_count': n,
+         'columns': {'day': [...], 'profit': [...], ...}}
+    """
+    metrics = _split(metrics)
+    dimensions = _split(dimensions)
+    names = dimensions + metrics
+
+    if dimensions:
+        keys = [COLUMN_DIMENSIONS.get(d, d) for d in dimensions]
+        rows = build_report_queryset(metrics, dimensions, filters).values_list(*keys, *metrics)
+    else:
+        # Without dimensions the report is a single row of grand totals
+        _validate(metrics, dimensions)
+        totals = apply_filters(Transaction.objects.all(), filters).aggregate(
+            **{m: METRICS[m]() for m in metrics}
+        )
+        rows = [[totals[m] for m in metrics]]
+
+    columns = {name: [] for name in names}
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        for name, value in zip(names, row):
+            columns[name].append(_to_json_value(value))
+
+    if 'customer' in columns:
+        customer_names = dict(
+            Customer.objects.filter(id__in=set(columns['customer'])).values_list('id', 'name')
+        )
+        columns['customer'] = [customer_names.get(pk) for pk in columns['customer']]
+
+    return {
+        'dimensions': dimensions,
+        'metrics': metrics,
+        'row_count': row_count,
+        'columns': columns,
+    }
+
+
+def daily_summary(start_date, end_date):
+    """
+    Per-day transaction count, THB volume, MMK volume and profit between two
+    dates (inclusive), in the row format used by the dashboard.
+    """
+    report = run_report(
+        metrics=['count', 'thb_volume', 'mmk_volume', 'profit'],
+        dimensions=['day'],
+        filters={'start_date': start_date, 'end_date': end_date},
+    )
+    columns = report['columns']
+    return [
+        {
+            'date': columns['day'][i],
+            'thb_volume': columns['thb_volume'][i] or 0.0,
+            'mmk_volume': columns['mmk_volume'][i] or 0.0,
+            'profit': columns['profit'][i] or 0.0,
+            'transaction_count': columns['count'][i],
+        }
+        for i in range(report['row_count'])
+    ]
+
+
+HEATMAP_METRICS = ('count', 'thb_volume', 'mmk_volume')
+
+
+def volume_heatmap(weeks):
+    """
+    Transaction count, THB volume and MMK volume by local weekday and hour
+    over the last `weeks` weeks (including today), as 7x24 matrices indexed
+    [weekday][hour] with Monday as weekday 0.
+    """
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=weeks * 7 - 1)
+    rows = build_report_queryset(
+        HEATMAP_METRICS, ['weekday', 'hour'], {'start_date': start_date, 'end_date': end_date}
+    ).values_list('weekday', 'hour', *HEATMAP_METRICS)
+
+    matrices = {metric: [[0] * 24 for _ in range(7)] for metric in HEATMAP_METRICS}
+    for weekday, hour, *values in rows:
+        for metric, value in zip(HEATMAP_METRICS, values):
+            matrices[metric][weekday][hour] = _to_json_value(value) or 0
+
+    return {
+        'weeks': weeks,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'timezone': timezone.get_current_timezone_name(),
+        'weekdays': list(calendar.day_name),
+        'hours': list(range(24)),
+        'metrics': matrices,
+    }
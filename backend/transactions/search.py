@@ -0,0 +1,134 @@
+from django.db import connections
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# FTS5 shadow table created by migration 0022 (SQLite only). A migration that
+# makes SQLite rebuild transactions_transaction drops the triggers feeding it;
+# ensure_search_triggers() puts them back after every migrate.
+FTS_TABLE = 'transactions_transaction_fts'
+
+SEARCH_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+    END
+    """,
+    f'{FTS_TABLE}_au': f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF customer, remarks ON transactions_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, customer, remarks)
+        VALUES ('delete', old.id, old.customer, old.remarks);
+        INSERT INTO {FTS_TABLE}(rowid, customer, remarks)
+        VALUES (new.id, new.customer, new.remarks);
+    END
+    """,
+}
+
+# The trigram tokenizer only indexes runs of three or more characters;
+# shorter tokens are matched with LIKE inside the indexed candidates
+MIN_INDEXED_LENGTH = 3
+
+_fts_tables = {}
+
+
+def _tokens(query):
+    tokens = []
+    for token in (query or '').split():
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def _fts_available(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_tables[key] = cursor.fetchone() is not None
+    return _fts_tables[key]
+
+
+def ensure_search_triggers(using='default'):
+    """
+    Recreate the FTS5 triggers a table rebuild dropped, then rebuild the
+    index from the table so rows written without them are found. Runs after
+    every migrate (see TransactionsConfig.ready). Returns the recreated
+    trigger names.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for name, in cursor.fetchall()}
+        if FTS_TABLE not in existing or 'transactions_transaction' not in existing:
+            # Migrated back past 0022, or 0022 found no FTS5 support
+            return []
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return missing
+
+
+def _contains(queryset, tokens):
+    for token in tokens:
+        queryset = queryset.filter(Q(customer__icontains=token) | Q(remarks__icontains=token))
+    return queryset
+
+
+def search_transactions(queryset, query, rank=False):
+    """
+    Filter a Transaction queryset to rows whose customer or remarks contain
+    every whitespace-separated token of query (case-insensitive substrings,
+    so prefixes and Burmese/Latin mixes work alike).
+
+    On SQLite the tokens are answered by the FTS5 trigram index; on other
+    databases by icontains, which PostgreSQL serves from trigram indexes.
+    With rank=True the rows are annotated with search_rank (higher is a
+    better match) for ordering=relevance. Composes with any other filters.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return queryset
+
+    connection = connections[queryset.db]
+    indexed = [token for token in tokens if len(token) >= MIN_INDEXED_LENGTH]
+
+    if connection.vendor == 'sqlite' and indexed and _fts_available(connection):
+        match = ' AND '.join('"%s"' % token.replace('"', '""') for token in indexed)
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        ))
+        queryset = _contains(queryset, [token for token in tokens if token not in indexed])
+        if rank:
+            # bm25() is smaller for better matches; customer hits weigh double
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = transactions_transaction.id",
+                [match],
+                output_field=FloatField()
+            ))
+        return queryset
+
+    queryset = _contains(queryset, tokens)
+    if rank:
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramWordSimilarity
+            queryset = queryset.annotate(search_rank=TrigramWordSimilarity(query, 'customer'))
+        else:
+            queryset = queryset.annotate(search_rank=Case(
+                When(customer__iexact=query, then=Value(3)),
+                When(customer__istartswith=query, then=Value(2)),
+                When(customer__icontains=query, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            ))
+    return queryset
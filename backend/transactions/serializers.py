@@ -1,9 +1,72 @@
-from rest_framework import serializers
+import decimal
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Transaction, BankAccount, DailyBalance, DailyExchangeRate, DailyProfit, Expense, ExpenseType
 # from core.serializers import StandardDateField, StandardDateTimeField, DisplayDateTimeField
 # from core.utils import DateTimeService
 import logging
 
+def requested_fields(request, available):
+    """
+    Fields named in ?fields=a,b (in `available` order), or None when the
+    request does not ask for a sparse fieldset. Unknown names are a 400.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    wanted = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = wanted - set(available)
+    if unknown:
+        raise serializers.ValidationError(
+            {'error': f"Unknown field(s): {', '.join(sorted(unknown))}. Must be among {', '.join(available)}"}
+        )
+    return [name for name in available if name in wanted]
+
+
+def narrow_queryset(queryset, serializer):
+    """
+    Limit the SELECT to the model columns behind the serializer's fields,
+    joining the related rows that dotted sources (bank_account.name) read
+    """
+    columns = set()
+    related = set()
+    for field in serializer.fields.values():
+        attrs = field.source_attrs
+        if not attrs or attrs == ['*']:
+            return queryset
+        try:
+            model_field = queryset.model._meta.get_field(attrs[0])
+        except Exception:
+            # A property or method source; leave the queryset alone
+            return queryset
+        if len(attrs) > 1:
+            if not model_field.is_relation:
+                return queryset
+            related.add(attrs[0])
+        columns.add('__'.join(attrs))
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin: on GET requests, ?fields=a,b limits the output to the
+    named fields
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'), list(self.fields))
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 class TransactionSerializer(serializers.ModelSerializer):
     date_time = serializers.DateTimeField(required=False)
     
@@ -26,6 +89,128 @@ class TransactionSerializer(serializers.ModelSerializer):
         logger.info(f"Created transaction with date_time: {transaction.date_time}")
         return transaction
 
+class TransactionRowSerializer:
+    """
+    Read-only fast path for lists of transactions.
+
+    Reads only the TransactionSerializer fields with values() and formats
+    them with formatters precomputed from the serializer's own field
+    definitions, giving the same output as TransactionSerializer(many=True)
+    without building a serializer and a field per row.
+    """
+
+    def __init__(self, serializer_class=TransactionSerializer):
+        self.serializer_class = serializer_class
+        self._fields = None
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = self.serializer_class().fields
+        return self._fields
+
+    # Row keys keyset pagination needs even when ?fields= leaves them out
+    KEY_COLUMNS = ('id', 'date_time')
+
+    def values(self, queryset, fields=None):
+        """
+        Queryset of dicts holding just the serialized columns (or the subset
+        in fields), in output order
+        """
+        names = list(fields or self.fields)
+        return queryset.values(*names, *[key for key in self.KEY_COLUMNS if key not in names])
+
+    def _formatters(self, fields=None):
+        formatters = []
+        for name, field in self.fields.items():
+            if fields and name not in fields:
+                continue
+            if isinstance(field, serializers.DecimalField) and self._plain_decimal(field):
+                formatters.append((name, self._decimal_formatter(field, self._model_field(field))))
+            elif isinstance(field, serializers.DateTimeField) and self._iso_datetime(field):
+                formatters.append((name, self._datetime_formatter(field)))
+            elif isinstance(field, (serializers.IntegerField, serializers.CharField, serializers.ChoiceField)):
+                # Values already come back from the database as int / str
+                continue
+            else:
+                formatters.append((name, field.to_representation))
+        return formatters
+
+    @staticmethod
+    def _plain_decimal(field):
+        coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        return coerce and not field.localize and field.decimal_places is not None
+
+    def _model_field(self, field):
+        try:
+            return self.serializer_class.Meta.model._meta.get_field(field.source)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _decimal_formatter(field, model_field=None):
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+        rounding = field.rounding
+        format_fixed = '{:f}'.format
+
+        # The database backends already hand back model decimals quantized to
+        # the column's decimal places, so re-quantizing to the same places is a no-op
+        if getattr(model_field, 'decimal_places', None) == field.decimal_places:
+            def format_decimal(value):
+                if isinstance(value, decimal.Decimal):
+                    return format_fixed(value)
+                return format_fixed(decimal.Decimal(str(value).strip()).quantize(exponent, rounding=rounding, context=context))
+            return format_decimal
+
+        def format_decimal(value):
+            if not isinstance(value, decimal.Decimal):
+                value = decimal.Decimal(str(value).strip())
+            return format_fixed(value.quantize(exponent, rounding=rounding, context=context))
+        return format_decimal
+
+    @staticmethod
+    def _iso_datetime(field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        return output_format is not None and output_format.lower() == ISO_8601
+
+    @staticmethod
+    def _datetime_formatter(field):
+        # Same as DateTimeField.enforce_timezone + isoformat, with the zone looked up once
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+        def format_datetime(value):
+            if isinstance(value, str):
+                return value
+            if field_timezone is not None:
+                value = value.astimezone(field_timezone) if timezone.is_aware(value) else timezone.make_aware(value, field_timezone)
+            elif timezone.is_aware(value):
+                value = timezone.make_naive(value, dt_timezone.utc)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return format_datetime
+
+    def serialize(self, rows, fields=None):
+        """Format rows from values() in place and return them as a list"""
+        formatters = self._formatters(fields)
+        extra = [key for key in self.KEY_COLUMNS if fields and key not in fields]
+        rows = list(rows)
+        for row in rows:
+            for name, format_value in formatters:
+                value = row[name]
+                if value is not None:
+                    row[name] = format_value(value)
+            for key in extra:
+                del row[key]
+        return rows
+
+
+transaction_rows = TransactionRowSerializer()
+
 class BankAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = BankAccount
@@ -43,7 +228,7 @@ class DailyExchangeRateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class DailyBalanceSerializer(serializers.ModelSerializer):
+class DailyBalanceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     currency = serializers.CharField(source='bank_account.currency', read_only=True)
 
@@ -63,7 +248,7 @@ class DailyBalanceSummarySerializer(serializers.Serializer):
     grand_total_thb = serializers.DecimalField(max_digits=15, decimal_places=2)
     rate = serializers.DecimalField(max_digits=10, decimal_places=4)
 
-class DailyProfitSerializer(serializers.ModelSerializer):
+class DailyProfitSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = DailyProfit
         fields = [
@@ -78,7 +263,7 @@ class ExpenseTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     expense_type_name = serializers.CharField(source='expense_type.name', read_only=True)
     amount_thb = serializers.DecimalField(source='amount', max_digits=12, decimal_places=2, read_only=True)
 
@@ -89,18 +274,9 @@ class ExpenseSerializer(serializers.ModelSerializer):
             'remarks', 'date', 'amount', 'amount_thb'
         ]
         read_only_fields = ['id', 'amount_thb']
-
-    def to_representation(self, instance):
-        """
-        Customize the output of the serializer.
-        'amount' is used for writing (creating/updating) expenses,
-        'amount_thb' is used for reading (displaying) them.
-        """
-        representation = super().to_representation(instance)
-        # We don't need to show both 'amount' and 'amount_thb' in the API response.
-        # Let's just show 'amount_thb' to be clear.
-        representation.pop('amount', None)
-        return representation
+        # 'amount' is used for writing (creating/updating) expenses,
+        # 'amount_thb' is used for reading (displaying) them
+        extra_kwargs = {'amount': {'write_only': True}}
 
     def create(self, validated_data):
         # Get the expense_type instance
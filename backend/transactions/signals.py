@@ -0,0 +1,78 @@
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .autocomplete import customer_index
+from .customer_totals import refresh_customer_totals
+from .models import DailyBalance, DailyExchangeRate, DeletedRecord, Expense, Transaction
+from .reports import local_day
+from .sync import collection_for
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_values(sender, instance, update_fields=None, **kwargs):
+    # An edit can move a transaction to another day or customer; remember the old ones
+    instance._previous = None
+    if instance.pk and (update_fields is None or {'date_time', 'customer'} & set(update_fields)):
+        instance._previous = (
+            Transaction.objects.filter(pk=instance.pk).values_list('date_time', 'customer_ref').first()
+        )
+
+
+def refresh_customer_months(keys):
+    """Recompute the monthly totals of (customer id, day) pairs once the write commits"""
+    for customer_id, day in set(keys):
+        if customer_id is None:
+            continue
+        db_transaction.on_commit(
+            lambda customer_id=customer_id, day=day: refresh_customer_totals([customer_id], day, day)
+        )
+
+
+def refresh_customer_suggestions(customer_ids):
+    for customer_id in set(customer_ids):
+        if customer_id is not None:
+            db_transaction.on_commit(lambda customer_id=customer_id: customer_index.refresh_customer(customer_id))
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, update_fields=None, **kwargs):
+    # Profit-only saves come from the matching passes, which refresh the
+    # customer totals once for their whole range when they finish. save()
+    # adds updated_at to every update_fields save.
+    if update_fields is not None and set(update_fields) <= {'profit', 'updated_at'}:
+        return
+
+    customer_keys = [(instance.customer_ref_id, local_day(instance.date_time))]
+    if getattr(instance, '_previous', None):
+        previous_date_time, previous_customer = instance._previous
+        customer_keys.append((previous_customer, local_day(previous_date_time)))
+
+    refresh_customer_months(customer_keys)
+    refresh_customer_suggestions([customer_id for customer_id, _ in customer_keys])
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    day = local_day(instance.date_time)
+    refresh_customer_months([(instance.customer_ref_id, day)])
+    refresh_customer_suggestions([instance.customer_ref_id])
+
+
+def transactions_bulk_created(transactions):
+    """
+    Do for rows written with bulk_create() what post_save does for one row:
+    refresh the customer totals and suggestions once the write commits.
+    """
+    keys = [(tx.customer_ref_id, local_day(tx.date_time)) for tx in transactions]
+    refresh_customer_months(keys)
+    refresh_customer_suggestions(customer_id for customer_id, _ in keys)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=DailyBalance)
+@receiver(post_delete, sender=DailyExchangeRate)
+def record_deletion(sender, instance, **kwargs):
+    # Tombstone for delta sync; part of the deleting transaction, so a rollback drops it too
+    DeletedRecord.objects.create(collection=collection_for(sender), object_id=instance.pk)
@@ -0,0 +1,229 @@
+"""
+Per-customer statements: every transaction of one customer in date order
+with running THB and MMK balances and a subtotal at the end of each period.
+
+The statement is a generator pipeline over one indexed query
+(transaction_custref_dt_idx), so rows are rendered as they are read
+and CSV/JSON responses stream:
+
+    statement_rows -> with_balances -> with_subtotals -> csv/xlsx/json rows
+
+Amounts are signed from the shop's side: a BUY (we buy MMK) adds MMK and
+pays out THB, a SELL pays out MMK and takes in THB, OTHER adds its THB.
+"""
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+
+from .exports import AMOUNT_FORMAT, CHUNK_ROWS, EXPORT_DATETIME_FORMAT, FETCH_SIZE, RATE_FORMAT, local_export_time
+from .reports import local_day, local_day_start
+
+STATEMENT_PERIODS = ('day', 'week', 'month', 'year', 'none')
+STATEMENT_HEADER = [
+    'Date & Time', 'Type', 'ID', 'THB', 'MMK', 'Rate', 'Profit', 'Remarks', 'THB Balance', 'MMK Balance'
+]
+STATEMENT_XLSX_FORMATS = {
+    3: AMOUNT_FORMAT, 4: AMOUNT_FORMAT, 5: RATE_FORMAT, 6: AMOUNT_FORMAT, 8: AMOUNT_FORMAT, 9: AMOUNT_FORMAT
+}
+ZERO = Decimal('0.00')
+
+
+def signed_amounts(transaction_type, thb_amount, mmk_amount):
+    """(THB, MMK) change of the shop's position with the customer"""
+    if transaction_type == 'BUY':
+        return -thb_amount, mmk_amount
+    if transaction_type == 'SELL':
+        return thb_amount, -mmk_amount
+    return thb_amount, ZERO
+
+
+def period_label(moment, period):
+    day = local_day(moment)
+    if period == 'day':
+        return day.isoformat()
+    if period == 'week':
+        year, week, _ = day.isocalendar()
+        return f'{year}-W{week:02d}'
+    if period == 'year':
+        return str(day.year)
+    return day.strftime('%Y-%m')
+
+
+def statement_queryset(customer_id, start_date=None, end_date=None):
+    from .models import Transaction
+
+    # Datetime bounds (not date_time__date) keep the range on the index
+    queryset = Transaction.objects.filter(customer_ref_id=customer_id)
+    if start_date:
+        queryset = queryset.filter(date_time__gte=local_day_start(start_date))
+    if end_date:
+        queryset = queryset.filter(date_time__lt=local_day_start(end_date + timedelta(days=1)))
+    return queryset.order_by('date_time', 'id')
+
+
+def opening_balances(customer_id, start_date):
+    """(THB, MMK) balance carried in from before start_date, from one aggregate"""
+    from .models import Transaction
+
+    if not start_date:
+        return ZERO, ZERO
+    amount = DecimalField(max_digits=15, decimal_places=2)
+    before = Transaction.objects.filter(customer_ref_id=customer_id, date_time__lt=local_day_start(start_date))
+    totals = before.aggregate(
+        thb=Sum(Case(
+            When(transaction_type='BUY', then=-F('thb_amount')),
+            default=F('thb_amount'), output_field=amount
+        )),
+        mmk=Sum(Case(
+            When(transaction_type='BUY', then=F('mmk_amount')),
+            When(transaction_type='SELL', then=-F('mmk_amount')),
+            default=Value(ZERO), output_field=amount
+        )),
+    )
+    # SQLite returns the sums with an arbitrary scale; statements show cents
+    cent = Decimal('0.01')
+    return Decimal(totals['thb'] or 0).quantize(cent), Decimal(totals['mmk'] or 0).quantize(cent)
+
+
+def statement_rows(queryset):
+    return queryset.values_list(
+        'id', 'date_time', 'transaction_type', 'thb_amount', 'mmk_amount', 'rate', 'profit', 'remarks'
+    ).iterator(chunk_size=FETCH_SIZE)
+
+
+def with_balances(rows, opening=(ZERO, ZERO)):
+    """Transaction entries with their signed amounts and the running balances after them"""
+    thb_balance, mmk_balance = opening
+    for pk, date_time, transaction_type, thb_amount, mmk_amount, rate, profit, remarks in rows:
+        thb, mmk = signed_amounts(transaction_type, thb_amount, mmk_amount)
+        thb_balance += thb
+        mmk_balance += mmk
+        yield {
+            'kind': 'transaction',
+            'id': pk,
+            'date_time': date_time,
+            'transaction_type': transaction_type,
+            'thb': thb,
+            'mmk': mmk,
+            'rate': rate,
+            'profit': profit or ZERO,
+            'remarks': remarks or '',
+            'thb_balance': thb_balance,
+            'mmk_balance': mmk_balance,
+        }
+
+
+def with_subtotals(entries, period='month'):
+    """Pass entries through, adding a subtotal entry after the last one of each period"""
+    subtotal = None
+
+    def close(subtotal, last):
+        return {
+            'kind': 'subtotal', **subtotal,
+            'thb_balance': last['thb_balance'], 'mmk_balance': last['mmk_balance'],
+        }
+
+    last = None
+    for entry in entries:
+        if period != 'none':
+            label = period_label(entry['date_time'], period)
+            if subtotal is not None and subtotal['period'] != label:
+                yield close(subtotal, last)
+                subtotal = None
+            if subtotal is None:
+                subtotal = {'period': label, 'count': 0, 'thb': ZERO, 'mmk': ZERO, 'profit': ZERO}
+            subtotal['count'] += 1
+            subtotal['thb'] += entry['thb']
+            subtotal['mmk'] += entry['mmk']
+            subtotal['profit'] += entry['profit']
+        last = entry
+        yield entry
+    if subtotal is not None:
+        yield close(subtotal, last)
+
+
+def customer_statement(customer_id, start_date=None, end_date=None, period='month'):
+    """
+    (opening, entries) of a customer's statement: the (THB, MMK) balance
+    carried in from before start_date and a generator of transaction and
+    subtotal entries.
+    """
+    if period not in STATEMENT_PERIODS:
+        raise ValueError(f"Unknown period: {period}. Use one of {', '.join(STATEMENT_PERIODS)}")
+    opening = opening_balances(customer_id, start_date)
+    rows = statement_rows(statement_queryset(customer_id, start_date, end_date))
+    return opening, with_subtotals(with_balances(rows, opening), period)
+
+
+def new_closing(opening):
+    return {'count': 0, 'thb': ZERO, 'mmk': ZERO, 'profit': ZERO,
+            'thb_balance': opening[0], 'mmk_balance': opening[1]}
+
+
+def with_closing(entries, closing):
+    """Pass entries through, adding each transaction into the closing totals"""
+    for entry in entries:
+        if entry['kind'] == 'transaction':
+            closing['count'] += 1
+            for key in ('thb', 'mmk', 'profit'):
+                closing[key] += entry[key]
+            closing['thb_balance'], closing['mmk_balance'] = entry['thb_balance'], entry['mmk_balance']
+        yield entry
+
+
+def statement_table_rows(opening, entries, typed=False):
+    """
+    Rows under STATEMENT_HEADER: an opening row, the transactions with a
+    subtotal row per period, and a closing row. Amounts stay Decimal, which
+    the CSV writer prints exactly; typed keeps date-times for XLSX cells
+    instead of formatting them as text.
+    """
+    def moment(value):
+        local = local_export_time(value)
+        return local if typed else local.strftime(EXPORT_DATETIME_FORMAT)
+
+    def row(entry):
+        if entry['kind'] == 'subtotal':
+            return [
+                entry['period'], 'SUBTOTAL', f"{entry['count']} transactions", entry['thb'], entry['mmk'],
+                None, entry['profit'], None, entry['thb_balance'], entry['mmk_balance']
+            ]
+        return [
+            moment(entry['date_time']), entry['transaction_type'], entry['id'], entry['thb'], entry['mmk'],
+            entry['rate'], entry['profit'], entry['remarks'] or None, entry['thb_balance'], entry['mmk_balance']
+        ]
+
+    yield ['', 'OPENING', None, None, None, None, None, None, opening[0], opening[1]]
+    closing = new_closing(opening)
+    for entry in with_closing(entries, closing):
+        yield row(entry)
+    yield [
+        '', 'CLOSING', f"{closing['count']} transactions", closing['thb'], closing['mmk'],
+        None, closing['profit'], None, closing['thb_balance'], closing['mmk_balance']
+    ]
+
+
+def statement_json_chunks(customer, opening, entries, meta):
+    """
+    The statement as streamed JSON text: meta, customer, opening, entries,
+    then closing totals. Decimals are strings, as in the rest of the API.
+    """
+    def encode(value):
+        return json.dumps(value, default=lambda o: str(o) if isinstance(o, Decimal) else o.isoformat())
+
+    head = {**meta, 'customer': customer, 'opening': {'thb_balance': opening[0], 'mmk_balance': opening[1]}}
+    yield encode(head)[:-1] + ', "entries": ['
+
+    chunk = []
+    separator = ''
+    closing = new_closing(opening)
+    for entry in with_closing(entries, closing):
+        chunk.append(separator + encode(entry))
+        separator = ','
+        if len(chunk) >= CHUNK_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(f'], "closing": {encode(closing)}}}')
+    yield ''.join(chunk)
@@ -0,0 +1,108 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import DailyBalance, DailyExchangeRate, DeletedRecord, Expense, Transaction
+from .serializers import (
+    DailyBalanceSerializer, DailyExchangeRateSerializer, ExpenseSerializer,
+    narrow_queryset, transaction_rows
+)
+
+# Collection name -> (model, serializer class); transactions use the fast row serializer
+SYNC_COLLECTIONS = {
+    'transactions': (Transaction, None),
+    'expenses': (Expense, ExpenseSerializer),
+    'daily_balances': (DailyBalance, DailyBalanceSerializer),
+    'exchange_rates': (DailyExchangeRate, DailyExchangeRateSerializer),
+}
+
+# A write that was in flight when a token was issued commits with an
+# updated_at slightly before it; tokens point this far back so the next
+# sync still picks it up. Clients see such rows twice and upsert them.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def purge_tombstones(older_than=None):
+    """Delete tombstones older than the retention window; returns how many"""
+    cutoff = timezone.now() - (older_than if older_than is not None else tombstone_retention())
+    deleted, _ = DeletedRecord.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def collection_for(model):
+    for name, (collection_model, _) in SYNC_COLLECTIONS.items():
+        if collection_model is model:
+            return name
+    return None
+
+
+def encode_sync_token(moment):
+    raw = json.dumps({'t': moment.isoformat()}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """Return the moment a token stands for; raises ValueError on a bad token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        moment = parse_datetime(json.loads(raw)['t'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValueError("Invalid sync token")
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError("Invalid sync token")
+    return moment
+
+
+def _serialize(model, serializer_class, queryset):
+    if serializer_class is None:
+        return transaction_rows.serialize(transaction_rows.values(queryset))
+    serializer = serializer_class(many=True)
+    return serializer_class(narrow_queryset(queryset, serializer.child), many=True).data
+
+
+def changes_since(token=None):
+    """
+    Everything that changed after the moment a sync token stands for.
+
+    Without a token this is a full snapshot. So is a token older than the
+    tombstone retention window, whose deletes may have been purged; the
+    client then replaces its copy. Returns a dict with the new token,
+    whether the response is full, the changed rows of every collection and
+    the ids deleted from each. Clients apply the deletes first, then upsert
+    the changed rows by id.
+    """
+    since = decode_sync_token(token) if token else None
+    if since is not None and since < timezone.now() - tombstone_retention():
+        since = None
+    # Taken before reading, so nothing written during the reads is skipped
+    next_token = encode_sync_token(timezone.now() - SYNC_OVERLAP)
+
+    changes = {}
+    deleted = {}
+    for name, (model, serializer_class) in SYNC_COLLECTIONS.items():
+        queryset = model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(updated_at__gte=since)
+        changes[name] = _serialize(model, serializer_class, queryset.order_by('updated_at', 'id'))
+        deleted[name] = []
+
+    if since is not None:
+        for collection, object_id in DeletedRecord.objects.filter(
+            deleted_at__gte=since, collection__in=list(SYNC_COLLECTIONS)
+        ).values_list('collection', 'object_id'):
+            deleted[collection].append(object_id)
+
+    return {
+        'token': next_token,
+        'full': since is None,
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -0,0 +1,27 @@
+from datetime import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from transactions.models import Transaction
+
+
+def local_datetime(value):
+    """Aware datetime for a 'YYYY-MM-DD HH:MM' string in the current timezone"""
+    return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d %H:%M'))
+
+
+def make_transaction(when, transaction_type='BUY', customer='Aung Aung', thb='1000.00', rate='0.0080', **fields):
+    thb = Decimal(thb)
+    rate = Decimal(rate)
+    defaults = {
+        'hundred_k_rate': (Decimal('100000') / rate).quantize(Decimal('0.01')) if rate else Decimal('0'),
+        'profit': Decimal('0'),
+    }
+    if 'mmk_amount' not in fields:
+        defaults['mmk_amount'] = (thb / rate).quantize(Decimal('0.01'))
+    defaults.update(fields)
+    return Transaction.objects.create(
+        transaction_type=transaction_type, date_time=local_datetime(when), customer=customer,
+        thb_amount=thb, rate=rate, **defaults
+    )
@@ -0,0 +1,37 @@
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from .helpers import make_transaction
+
+
+class AsyncViewTests(TransactionTestCase):
+    """
+    The async endpoints run their queries on worker threads with their own
+    connections, so the rows are committed (TransactionTestCase) for those
+    threads to see them.
+    """
+
+    def setUp(self):
+        today = timezone.localdate().strftime('%Y-%m-%d')
+        make_transaction('2026-03-01 09:00', thb='1000.00')
+        make_transaction('2026-03-01 11:00', transaction_type='SELL', thb='600.00', rate='0.0081', profit='4.50')
+        make_transaction(f'{today} 00:05', thb='300.00')
+        make_transaction(f'{today} 00:10', transaction_type='OTHER', thb='50.00', profit='50.00')
+
+    async def test_stats_payload_matches_sync_view(self):
+        expected = (await self.async_client.get('/api/transactions/transactions/stats/')).json()
+        response = await self.async_client.get('/api/transactions/async/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(expected['totalTransactions'], 4)
+
+    async def test_dashboard_payload_matches_sync_view(self):
+        for params in ({}, {'date': '2026-03-01'}):
+            expected = (await self.async_client.get('/api/transactions/dashboard/', params)).json()
+            response = await self.async_client.get('/api/transactions/async/dashboard/', params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected)
+
+    async def test_dashboard_rejects_bad_date(self):
+        response = await self.async_client.get('/api/transactions/async/dashboard/', {'date': '2026-13-01'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+
+from transactions.autocomplete import customer_index
+from transactions.customers import merge_customers
+from transactions.models import Customer
+
+from .helpers import make_transaction
+
+URL = '/api/transactions/customers/autocomplete/'
+
+
+class CustomerAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(7):
+            make_transaction(f'2026-03-01 0{n}:00', customer='Ko Aung')
+        for n in range(3):
+            make_transaction(f'2026-03-01 1{n}:00', customer='Aung Min', rate='0.0081')
+        make_transaction('2026-03-20 09:00', transaction_type='SELL', customer='Aung Aung', rate='0.0079')
+        make_transaction('2026-03-01 09:00', customer='Ma Hla')
+
+    def setUp(self):
+        # The index is per process; load this test's database
+        customer_index.rebuild()
+
+    def names(self, prefix, limit=10):
+        return [row['name'] for row in customer_index.suggest(prefix, limit)]
+
+    def test_prefix_of_any_word_ranked_by_use_and_recency(self):
+        # Seven uses beat one recent use; one use 19 days later beats three uses
+        self.assertEqual(self.names('AUNG'), ['Ko Aung', 'Aung Aung', 'Aung Min'])
+        self.assertEqual(self.names('aung  m'), ['Aung Min'])
+        self.assertEqual(self.names('aung', limit=1), ['Ko Aung'])
+        self.assertEqual(self.names(''), ['Ko Aung', 'Aung Aung', 'Aung Min', 'Ma Hla'])
+        self.assertEqual(self.names('zaw'), [])
+
+        suggestion = customer_index.suggest('aung a')[0]
+        self.assertEqual(
+            (suggestion['transaction_count'], suggestion['last_rate'], suggestion['last_type']), (1, 0.0079, 'SELL')
+        )
+
+    def test_writes_refresh_the_customer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_transaction('2026-03-21 09:00', customer='Aung Thu')
+        self.assertEqual(self.names('aung t'), ['Aung Thu'])
+
+        source = Customer.objects.get(name='Aung Min')
+        target = Customer.objects.get(name='Ko Aung')
+        with self.captureOnCommitCallbacks(execute=True):
+            merge_customers(source, target)
+        # The merged spelling now suggests the kept customer with both histories
+        self.assertEqual(
+            [(row['name'], row['transaction_count']) for row in customer_index.suggest('aung m')], [('Ko Aung', 10)]
+        )
+        self.assertNotIn('Aung Min', self.names(''))
+
+    def test_endpoint(self):
+        response = self.client.get(URL, {'q': 'ma', 'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['name'], 'Ma Hla')
+        for limit in ('0', '51', 'ten'):
+            self.assertEqual(self.client.get(URL, {'q': 'ma', 'limit': limit}).status_code, 400)
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from transactions.caching import data_version, get_or_build
+from transactions.models import Transaction
+
+from .helpers import local_datetime, make_transaction
+
+
+class DataVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.transaction = make_transaction('2026-03-02 09:00')
+
+    def test_version_changes_on_insert_update_and_delete(self):
+        versions = [data_version()]
+        other = make_transaction('2026-03-02 10:00')
+        versions.append(data_version())
+        # A queryset update that sets updated_at, as the profit passes do
+        Transaction.objects.filter(pk=self.transaction.pk).update(
+            profit=5, updated_at=local_datetime('2030-01-01 00:00')
+        )
+        versions.append(data_version())
+        other.delete()
+        versions.append(data_version())
+        self.assertEqual(len(set(versions)), len(versions))
+
+    def test_cached_value_is_rebuilt_after_a_write(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(get_or_build(('test',), build), 1)
+        self.assertEqual(get_or_build(('test',), build), 1)
+        # bulk_create sends no signals; the version still moves with the table
+        Transaction.objects.bulk_create([Transaction(
+            transaction_type='BUY', date_time=local_datetime('2026-03-03 09:00'), customer='Ko Ko',
+            thb_amount=100, mmk_amount=12500, rate='0.0080', hundred_k_rate=12500000, profit=0
+        )])
+        self.assertEqual(get_or_build(('test',), build), 2)
+
+
+class LocalBucketTests(TestCase):
+    def test_update_fields_save_of_date_time_stores_new_buckets(self):
+        transaction = make_transaction('2026-03-02 09:00')  # a Monday
+        transaction.date_time = local_datetime('2026-03-07 21:00')  # a Saturday
+        transaction.save(update_fields=['date_time'])
+
+        stored = Transaction.objects.values('local_hour', 'local_weekday').get(pk=transaction.pk)
+        self.assertEqual(stored, {'local_hour': 21, 'local_weekday': 5})
@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .helpers import make_transaction
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ColumnarExportTests(TestCase):
+    def setUp(self):
+        if pyarrow is None:
+            self.skipTest('pyarrow is not installed')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, *args):
+        call_command('export_transactions_columnar', *args, stdout=io.StringIO())
+
+    def test_month_partitions_follow_local_time(self):
+        with timezone.override('Asia/Yangon'):
+            make_transaction('2026-03-01 09:00', thb='100.00', profit=Decimal('1.25'))
+            make_transaction('2026-03-31 23:30', transaction_type='SELL', customer='Ma Hla', thb='200.00')
+            # 00:30 on 1 April in Yangon is still 31 March in UTC
+            make_transaction('2026-04-01 00:30', thb='300.00', remarks='early')
+            make_transaction('2026-06-15 12:00', thb='400.00')
+            self.export(self.directory.name, '--partition-by', 'month')
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['month=2026-03', 'month=2026-04', 'month=2026-06'])
+        march = pyarrow.parquet.read_table(os.path.join(self.directory.name, 'month=2026-03', 'transactions.parquet'))
+        april = pyarrow.parquet.read_table(os.path.join(self.directory.name, 'month=2026-04', 'transactions.parquet'))
+        self.assertEqual(march.num_rows, 2)
+        self.assertEqual(april.column('remarks').to_pylist(), ['early'])
+
+        # Typed columns: exact decimals, UTC timestamps, categorical strings
+        schema = march.schema
+        self.assertEqual(schema.field('thb_amount').type, pyarrow.decimal128(10, 2))
+        self.assertEqual(schema.field('date_time').type, pyarrow.timestamp('us', tz='UTC'))
+        self.assertTrue(pyarrow.types.is_dictionary(schema.field('customer').type))
+        self.assertEqual(march.column('profit').to_pylist(), [Decimal('1.25'), Decimal('0.00')])
+        self.assertEqual(march.column('transaction_type').to_pylist(), ['BUY', 'SELL'])
+
+    def test_single_arrow_file_with_a_date_range(self):
+        make_transaction('2026-03-01 09:00')
+        make_transaction('2026-03-02 09:00', customer='Ma Hla')
+        path = os.path.join(self.directory.name, 'transactions.arrows')
+        self.export(path, '--format', 'arrow', '--start-date', '2026-03-02', '--batch-rows', '1')
+        with pyarrow.ipc.open_stream(path) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.column('customer').to_pylist(), ['Ma Hla'])
+
+        with self.assertRaises(CommandError):
+            self.export(path, '--start-date', '2 March')
+
+    def test_endpoint_parquet_download(self):
+        make_transaction('2026-03-01 09:00', thb='123.45')
+        response = self.client.get('/api/transactions/export/', {'file_format': 'parquet'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+        table = pyarrow.parquet.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.column('thb_amount').to_pylist(), [Decimal('123.45')])
@@ -0,0 +1,103 @@
+import gzip
+import json
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from core.middleware import CompressionMiddleware, choose_encoding
+
+from .helpers import make_transaction
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def unzstd(data):
+    # Streamed frames carry no content size, so read them through a decompressobj
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('gzip;q=1.0, zstd;q=0.5'), 'gzip')
+        self.assertIsNone(choose_encoding('br, deflate'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('gzip;q=lots'))
+        self.assertIsNone(choose_encoding(''))
+        if zstandard is not None:
+            self.assertEqual(choose_encoding('gzip, zstd'), 'zstd')
+            self.assertEqual(choose_encoding('*'), 'zstd')
+            self.assertEqual(choose_encoding('*;q=0.5, zstd;q=0'), 'gzip')
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"rows": [' + b'"1000.00",' * 500 + b'"0"]}'
+
+    def respond(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_json_is_gzipped_with_vary(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_left_alone(self):
+        small = self.respond(HttpResponse(b'{}', content_type='application/json'))
+        parquet = self.respond(HttpResponse(self.body, content_type='application/vnd.apache.parquet'))
+        ranged = HttpResponse(self.body, content_type='text/csv')
+        ranged['Accept-Ranges'] = 'bytes'
+        ranged = self.respond(ranged)
+        for response in (small, parquet, ranged):
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn(response.content, (b'{}', self.body))
+
+        # Not accepted: uncompressed, but caches still learn it varies
+        response = self.respond(HttpResponse(self.body, content_type='application/json'), accept='br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_strong_etag_is_weakened(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond(response)['ETag'], 'W/"abc"')
+
+    def test_streams_stay_streaming(self):
+        chunks = [b'a,b\n' * 100, b'c,d\n' * 100]
+        response = self.respond(StreamingHttpResponse(iter(chunks), content_type='text/csv'))
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+        if zstandard is not None:
+            response = self.respond(StreamingHttpResponse(iter(chunks), content_type='text/csv'), accept='zstd')
+            self.assertEqual(response['Content-Encoding'], 'zstd')
+            self.assertEqual(unzstd(b''.join(response.streaming_content)), b''.join(chunks))
+
+
+class CompressedEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(60):
+            make_transaction(f'2026-03-01 {n // 6:02d}:{n % 6 * 10:02d}', customer=f'Customer {n}')
+
+    def test_list_and_export_decompress_to_the_plain_response(self):
+        plain = self.client.get('/api/transactions/list/', {'show_all': 'true', 'page_size': 60})
+        zipped = self.client.get(
+            '/api/transactions/list/', {'show_all': 'true', 'page_size': 60}, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(zipped['Content-Encoding'], 'gzip')
+        self.assertLess(len(zipped.content), len(plain.content))
+        self.assertEqual(json.loads(gzip.decompress(zipped.content)), plain.json())
+
+        if zstandard is None:
+            return
+        export = b''.join(self.client.get('/api/transactions/export/').streaming_content)
+        response = self.client.get('/api/transactions/export/', HTTP_ACCEPT_ENCODING='zstd, gzip')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(unzstd(b''.join(response.streaming_content)), export)
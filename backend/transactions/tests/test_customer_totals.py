@@ -0,0 +1,91 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.customer_totals import leaderboard, refresh_customer_totals
+from transactions.models import CustomerMonthlyTotal
+
+from .helpers import local_datetime, make_transaction
+
+URL = '/api/transactions/customers/leaderboard/'
+
+
+class CustomerTotalsTests(TestCase):
+    def create(self, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_transaction(*args, **kwargs)
+
+    def totals(self):
+        return sorted(
+            CustomerMonthlyTotal.objects.values_list('customer', 'month', 'transaction_count', 'thb_volume', 'profit')
+        )
+
+    def test_writes_keep_the_monthly_rows_current(self):
+        first = self.create('2026-03-01 09:00', thb='100.00', profit=Decimal('1.00'))
+        self.create('2026-03-20 09:00', thb='200.00', profit=Decimal('2.00'))
+        self.create('2026-03-05 09:00', customer='Ma Hla', thb='50.00')
+        self.assertEqual(self.totals(), [
+            ('Aung Aung', date(2026, 3, 1), 2, Decimal('300.00'), Decimal('3.00')),
+            ('Ma Hla', date(2026, 3, 1), 1, Decimal('50.00'), Decimal('0.00')),
+        ])
+
+        # Moving a transaction to another month refreshes both months
+        first.date_time = local_datetime('2026-04-02 09:00')
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertEqual(self.totals(), [
+            ('Aung Aung', date(2026, 3, 1), 1, Decimal('200.00'), Decimal('2.00')),
+            ('Aung Aung', date(2026, 4, 1), 1, Decimal('100.00'), Decimal('1.00')),
+            ('Ma Hla', date(2026, 3, 1), 1, Decimal('50.00'), Decimal('0.00')),
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertNotIn(date(2026, 4, 1), [row[1] for row in self.totals()])
+
+    def test_incremental_rows_match_a_full_rebuild(self):
+        for when, customer, thb in (
+            ('2026-02-28 23:00', 'Aung Aung', '10.00'),
+            ('2026-03-01 00:30', 'Aung Aung', '20.00'),
+            ('2026-03-01 12:00', 'Ma Hla', '30.00'),
+        ):
+            self.create(when, customer=customer, thb=thb)
+        incremental = self.totals()
+        refresh_customer_totals()
+        self.assertEqual(self.totals(), incremental)
+        self.assertEqual(len(incremental), 3)
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for when, customer, thb, profit in (
+            ('2026-03-01 09:00', 'Aung Aung', '100.00', '9.00'),
+            ('2026-04-01 09:00', 'Aung Aung', '150.00', '1.00'),
+            ('2026-03-02 09:00', 'Ma Hla', '200.00', '2.00'),
+            ('2026-03-03 09:00', 'Ko Ko', '50.00', '3.00'),
+            ('2026-05-01 09:00', 'Ko Ko', '900.00', '0.00'),
+        ):
+            make_transaction(when, customer=customer, thb=thb, profit=Decimal(profit))
+        refresh_customer_totals()
+
+    def test_months_are_merged_and_ranked(self):
+        rows = leaderboard(date(2026, 3, 1), date(2026, 4, 1))
+        self.assertEqual([(row['customer'], row['thb_volume']) for row in rows],
+                         [('Aung Aung', 250.0), ('Ma Hla', 200.0), ('Ko Ko', 50.0)])
+        self.assertEqual(rows[0]['transaction_count'], 2)
+        self.assertEqual(rows[0]['first_seen'], local_datetime('2026-03-01 09:00'))
+
+        by_profit = leaderboard(date(2026, 3, 1), date(2026, 3, 1), order_by='profit', limit=2)
+        self.assertEqual([(row['customer'], row['profit']) for row in by_profit],
+                         [('Aung Aung', 9.0), ('Ko Ko', 3.0)])
+
+    def test_endpoint(self):
+        response = self.client.get(URL, {'start_month': '2026-05', 'end_month': '2026-05'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['customer'] for row in response.json()['results']], ['Ko Ko'])
+
+        for params in ({'order_by': 'name'}, {'start_month': 'May'}, {'limit': '0'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(URL, params).status_code, 400)
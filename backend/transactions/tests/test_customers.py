@@ -0,0 +1,86 @@
+import io
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from transactions.caching import data_version
+from transactions.customer_totals import refresh_customer_totals
+from transactions.customers import backfill_customer_refs, customer_id_for, merge_customers, normalize_customer_name
+from transactions.models import Customer, CustomerAlias, CustomerMonthlyTotal, Transaction
+
+from .helpers import make_transaction
+
+
+class CustomerDimensionTests(TestCase):
+    def test_spellings_share_one_customer(self):
+        first = make_transaction('2026-03-01 09:00', customer='Aung  Aung ')
+        second = make_transaction('2026-03-02 09:00', customer='aung aung')
+        other = make_transaction('2026-03-03 09:00', customer='Ma Hla')
+        self.assertEqual(normalize_customer_name(' AUNG\tAung'), 'aung aung')
+        self.assertEqual(first.customer_ref_id, second.customer_ref_id)
+        self.assertNotEqual(first.customer_ref_id, other.customer_ref_id)
+        # The first spelling seen becomes the canonical name, tidied up
+        self.assertEqual(first.customer_ref.name, 'Aung Aung')
+        self.assertEqual(customer_id_for('AUNG AUNG'), first.customer_ref_id)
+        self.assertIsNone(customer_id_for('Ko Ko'))
+
+    def test_renaming_a_transaction_moves_its_customer(self):
+        tx = make_transaction('2026-03-01 09:00', customer='Aung Aung')
+        tx.customer = 'Ma Hla'
+        tx.save(update_fields=['customer'])
+        tx.refresh_from_db()
+        self.assertEqual(tx.customer_ref.name, 'Ma Hla')
+
+    def test_backfill_links_transactions_in_chunks(self):
+        for n, name in enumerate(['Aung Aung', 'aung aung', 'Ma Hla', 'Ko Ko', 'MA HLA']):
+            make_transaction(f'2026-03-0{n + 1} 09:00', customer=name)
+        Transaction.objects.update(customer_ref=None)
+        Customer.objects.all().delete()
+
+        self.assertEqual(backfill_customer_refs(chunk_size=2), 5)
+        self.assertFalse(Transaction.objects.filter(customer_ref__isnull=True).exists())
+        self.assertEqual(Customer.objects.count(), 3)
+        # Spellings that differ only in case or spacing share an alias
+        self.assertEqual(CustomerAlias.objects.count(), 3)
+        # Nothing left to link
+        self.assertEqual(backfill_customer_refs(chunk_size=2), 0)
+
+    def test_backfill_moves_the_data_version(self):
+        make_transaction('2026-03-01 09:00')
+        Transaction.objects.update(customer_ref=None)
+        before = data_version()
+        backfill_customer_refs()
+        self.assertNotEqual(data_version(), before)
+
+
+class MergeCustomersTests(TestCase):
+    def setUp(self):
+        self.kept = make_transaction('2026-03-01 09:00', customer='Aung Aung', thb='100.00')
+        self.moved = make_transaction('2026-03-02 09:00', customer='U Aung', thb='50.00')
+        refresh_customer_totals()
+
+    def test_merge_moves_aliases_transactions_and_totals(self):
+        source, target = self.moved.customer_ref, self.kept.customer_ref
+        self.assertEqual(merge_customers(source, target), 1)
+
+        self.assertFalse(Customer.objects.filter(id=source.id).exists())
+        self.assertEqual(customer_id_for('u aung'), target.id)
+        self.moved.refresh_from_db()
+        self.assertEqual(self.moved.customer_ref_id, target.id)
+        # The typed name is kept as entered
+        self.assertEqual(self.moved.customer, 'U Aung')
+        self.assertGreater(self.moved.updated_at, self.kept.updated_at)
+        self.assertEqual(
+            list(CustomerMonthlyTotal.objects.values_list('customer_ref_id', 'transaction_count')), [(target.id, 2)]
+        )
+        # New transactions under the merged spelling go to the kept customer
+        self.assertEqual(make_transaction('2026-03-03 09:00', customer='U AUNG').customer_ref_id, target.id)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('merge_customers', 'u aung', 'AUNG AUNG', stdout=out)
+        self.assertIn('Merged "U Aung" into "Aung Aung" (1 transactions moved)', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('merge_customers', 'Ko Ko', 'Aung Aung')
+        with self.assertRaises(CommandError):
+            call_command('merge_customers', 'U Aung', 'Aung Aung')
@@ -0,0 +1,147 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.balances import DEFAULT_RATE, balance_timeline
+from transactions.models import BankAccount, DailyBalance, DailyExchangeRate
+
+BATCH_URL = '/api/transactions/daily-balances/batch_update/'
+
+
+class BatchUpdateTests(TestCase):
+    def setUp(self):
+        self.accounts = BankAccount.objects.bulk_create([
+            BankAccount(name=f'Account {n:02d}', currency=('THB', 'MMK')[n % 2]) for n in range(30)
+        ])
+        # A third of the accounts already have a balance on the day
+        DailyBalance.objects.bulk_create([
+            DailyBalance(bank_account=account, date=date(2026, 3, 2), balance=Decimal('1.00'), notes='old')
+            for account in self.accounts[:10]
+        ])
+
+    def post(self, balances, day='2026-03-02'):
+        return self.client.post(BATCH_URL, {'date': day, 'balances': balances}, content_type='application/json')
+
+    def test_thirty_accounts_in_a_constant_number_of_queries(self):
+        balances = [
+            {'bank_account': account.id, 'balance': str(100 + n), 'notes': f'n{n}'}
+            for n, account in enumerate(self.accounts)
+        ]
+        # Accounts lookup, existing rows, one upsert, read back
+        with self.assertNumQueries(4):
+            response = self.post(balances)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['updated'] * 10 + ['created'] * 20)
+        self.assertEqual(results[3]['data']['balance'], '103.00')
+        self.assertEqual(DailyBalance.objects.filter(date=date(2026, 3, 2)).count(), 30)
+        saved = DailyBalance.objects.get(bank_account=self.accounts[0], date=date(2026, 3, 2))
+        self.assertEqual((saved.balance, saved.notes), (Decimal('100.00'), 'n0'))
+
+    def test_per_entry_errors_leave_the_rest_saved(self):
+        first, second = self.accounts[20], self.accounts[21]
+        response = self.post([
+            {'bank_account': first.id, 'balance': '5'},
+            {'bank_account': 999999, 'balance': '5'},
+            {'bank_account': second.id, 'balance': 'lots'},
+            {'bank_account': second.id},
+            {'bank_account': first.id, 'balance': '7'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['error', 'error', 'error', 'error', 'created'])
+        self.assertIn('Duplicate bank account', results[0]['error'])
+        self.assertEqual(results[1]['error'], 'Bank account 999999 not found')
+        self.assertEqual(results[2]['error'], 'Invalid balance')
+        self.assertEqual(results[3]['error'], 'Bank account ID and balance are required')
+        # The last entry for an account wins
+        self.assertEqual(DailyBalance.objects.get(bank_account=first, date=date(2026, 3, 2)).balance, Decimal('7.00'))
+        self.assertFalse(DailyBalance.objects.filter(bank_account=second).exists())
+
+    def test_missing_or_bad_date_is_a_400(self):
+        self.assertEqual(self.post([], day='').status_code, 400)
+        self.assertEqual(self.post([], day='02/03/2026').status_code, 400)
+
+
+class LatestBalancesTests(TestCase):
+    url = '/api/transactions/daily-balances/latest/'
+
+    def test_each_active_account_shows_its_own_latest_entry(self):
+        kbz = BankAccount.objects.create(name='KBZ', currency='MMK')
+        scb = BankAccount.objects.create(name='SCB', currency='THB')
+        closed = BankAccount.objects.create(name='Closed', currency='THB', is_active=False)
+        for account, day, balance in (
+            (kbz, date(2026, 3, 1), '100'), (kbz, date(2026, 3, 5), '150'),
+            (scb, date(2026, 3, 3), '70'), (scb, date(2026, 2, 1), '60'),
+            (closed, date(2026, 3, 9), '999'),
+        ):
+            DailyBalance.objects.create(bank_account=account, date=day, balance=Decimal(balance))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        # Ordered by currency then name; the inactive account's later date is ignored
+        self.assertEqual(
+            [(row['bank_account_name'], row['date'], row['balance']) for row in body['balances']],
+            [('KBZ', '2026-03-05', '150.00'), ('SCB', '2026-03-03', '70.00')]
+        )
+        self.assertEqual(body['date'], '2026-03-05')
+
+    def test_no_entries_is_a_404(self):
+        BankAccount.objects.create(name='KBZ', currency='MMK')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class BalanceTimelineTests(TestCase):
+    url = '/api/transactions/balances/timeline/'
+
+    @classmethod
+    def setUpTestData(cls):
+        kbz = BankAccount.objects.create(name='KBZ', currency='MMK')
+        scb = BankAccount.objects.create(name='SCB', currency='THB')
+        for account, day, balance in (
+            (kbz, date(2026, 2, 20), '1'),
+            (kbz, date(2026, 2, 25), '10000'),
+            (scb, date(2026, 3, 2), '500'),
+            (kbz, date(2026, 3, 4), '20000'),
+        ):
+            DailyBalance.objects.create(bank_account=account, date=day, balance=Decimal(balance))
+        DailyExchangeRate.objects.create(date=date(2026, 3, 3), rate=Decimal('0.5000'))
+
+    def test_balances_and_rates_carry_forward(self):
+        # Balance rows and rate rows, however long the range
+        with self.assertNumQueries(2):
+            timeline = balance_timeline(date(2026, 3, 1), date(2026, 3, 5))
+        self.assertEqual(
+            [(day['date'].day, day['thb_total'], day['mmk_total'], day['rate'], day['grand_total_thb'])
+             for day in timeline],
+            [
+                # Before any saved rate, KBZ's February balance at the default rate
+                (1, 0.0, 10000.0, float(DEFAULT_RATE), 12500.0),
+                (2, 500.0, 10000.0, float(DEFAULT_RATE), 13000.0),
+                (3, 500.0, 10000.0, 0.5, 20500.0),
+                (4, 500.0, 20000.0, 0.5, 40500.0),
+                (5, 500.0, 20000.0, 0.5, 40500.0),
+            ]
+        )
+        self.assertEqual([day['balances_entered'] for day in timeline], [False, True, False, True, False])
+        self.assertEqual([day['rate_saved'] for day in timeline], [False, False, True, False, False])
+
+    def test_days_before_the_first_balance_are_left_out(self):
+        timeline = balance_timeline(date(2026, 2, 18), date(2026, 2, 21))
+        self.assertEqual([(day['date'], day['mmk_total']) for day in timeline],
+                         [(date(2026, 2, 20), 1.0), (date(2026, 2, 21), 1.0)])
+
+    def test_endpoint(self):
+        response = self.client.get(self.url, {'start_date': '2026-03-04', 'end_date': '2026-03-05'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([day['mmk_in_thb'] for day in response.json()['days']], [40000.0, 40000.0])
+        self.assertEqual(
+            self.client.get(self.url, {'start_date': '2026-03-05', 'end_date': '2026-03-04'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(self.url, {'start_date': '2026-01-01', 'end_date': '2026-01-31'}).status_code, 404
+        )
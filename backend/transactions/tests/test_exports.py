@@ -0,0 +1,163 @@
+import csv
+import gzip
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from transactions.exports import (
+    CHUNK_ROWS, TRANSACTION_CSV_HEADER, TRANSACTION_XLSX_FORMATS, transaction_csv_rows, transaction_workbook_sheets,
+    transaction_xlsx_rows, write_xlsx
+)
+from transactions.export_jobs import export_data_version, submit_export
+from transactions.models import BankAccount, DailyBalance, DailyProfit, Transaction
+
+from .helpers import local_datetime, make_transaction
+
+
+class TransactionExportRowTests(TestCase):
+    def setUp(self):
+        transaction = make_transaction('2026-03-02 09:15', rate='0.0079', hundred_k_rate=Decimal('800.00'))
+        # Saved with microseconds, as rows entered through the API are
+        Transaction.objects.filter(pk=transaction.pk).update(
+            date_time=transaction.date_time + timedelta(seconds=7, microseconds=123456)
+        )
+        make_transaction('2026-03-02 10:00', rate='0', mmk_amount=Decimal('0'))
+
+    def rows(self):
+        queryset = Transaction.objects.order_by('date_time')
+        return list(transaction_csv_rows(queryset)), list(transaction_xlsx_rows(queryset))
+
+    def test_csv_and_xlsx_write_the_same_values(self):
+        csv_rows, xlsx_rows = self.rows()
+        for csv_row, xlsx_row in zip(csv_rows, xlsx_rows):
+            self.assertEqual(csv_row[2], xlsx_row[2].strftime('%Y-%m-%d %H:%M:%S'))
+            self.assertEqual(csv_row[7], float(xlsx_row[7]))
+        # Derived from the rate, not the stored hundred_k_rate
+        self.assertEqual(xlsx_rows[0][7], Decimal('12658227.85'))
+        self.assertEqual(xlsx_rows[1][7], Decimal('0'))
+
+    def test_xlsx_date_times_have_whole_seconds(self):
+        openpyxl = self._openpyxl()
+        buffer = io.BytesIO()
+        write_xlsx(buffer, [
+            ('Transactions', TRANSACTION_CSV_HEADER,
+             transaction_xlsx_rows(Transaction.objects.order_by('date_time')), TRANSACTION_XLSX_FORMATS)
+        ])
+        buffer.seek(0)
+        sheet = openpyxl.load_workbook(buffer, read_only=True)['Transactions']
+        written = [row[2] for row in sheet.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual([value.microsecond for value in written], [0, 0])
+        self.assertEqual(written[0].strftime('%H:%M:%S'), '09:15:07')
+
+    def test_exports_write_local_time(self):
+        with timezone.override('Asia/Yangon'):
+            # 00:30 on the 3rd in Yangon is still the 2nd in UTC
+            late = make_transaction('2026-03-03 00:30', customer='Ko Ko')
+            account = BankAccount.objects.create(name='KBZ', currency='MMK')
+            DailyBalance.objects.create(bank_account=account, date=date(2026, 3, 3), balance=1000)
+            queryset = Transaction.objects.filter(pk=late.pk)
+
+            self.assertEqual(next(transaction_csv_rows(queryset))[2], '2026-03-03 00:30:00')
+            self.assertEqual(next(transaction_xlsx_rows(queryset))[2], datetime(2026, 3, 3, 0, 30))
+
+            sheets = {title: list(rows) for title, _, rows, _ in transaction_workbook_sheets(queryset)}
+            self.assertEqual([row[0] for row in sheets['Daily Summary']], [date(2026, 3, 3)])
+            self.assertEqual([row[0] for row in sheets['Balances']], [date(2026, 3, 3)])
+
+    def _openpyxl(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl is not installed')
+        return openpyxl
+
+
+class StreamingCsvExportTests(TestCase):
+    url = '/api/transactions/export/'
+
+    @classmethod
+    def setUpTestData(cls):
+        start = local_datetime('2026-03-01 00:00')
+        Transaction.objects.bulk_create([
+            Transaction(
+                transaction_type='BUY', date_time=start + timedelta(minutes=n), customer=f'Customer {n}',
+                thb_amount=Decimal('100.00'), mmk_amount=Decimal('12500.00'), rate=Decimal('0.0080'),
+                hundred_k_rate=Decimal('12500000.00'), profit=Decimal('0')
+            )
+            for n in range(2 * CHUNK_ROWS + 1)
+        ])
+
+    def test_rows_stream_in_chunks_from_one_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with CaptureQueriesContext(connection) as context:
+            chunks = list(response.streaming_content)
+        # Header plus 2 * CHUNK_ROWS + 1 rows: two full chunks and a short one
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('COUNT(', context.captured_queries[0]['sql'].upper())
+
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(rows[0], TRANSACTION_CSV_HEADER)
+        self.assertEqual(len(rows), 2 * CHUNK_ROWS + 2)
+        self.assertEqual(rows[-1][2:4], ['2026-03-01 16:40:00', f'Customer {2 * CHUNK_ROWS}'])
+
+    def test_gzip_download_holds_the_same_csv(self):
+        plain = b''.join(self.client.get(self.url).streaming_content)
+        response = self.client.get(self.url, {'file_format': 'csv.gz'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz"', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_summary_and_balance_exports_stream(self):
+        account = BankAccount.objects.create(name='KBZ', currency='MMK')
+        DailyBalance.objects.create(bank_account=account, date=date(2026, 3, 1), balance=1000)
+        for url, params in (
+            ('/api/transactions/export_daily_summary/', {'date': '2026-03-01', 'period': 'day'}),
+            ('/api/transactions/balances/export/', {'date': '2026-03-01'}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+                self.assertGreater(len(rows), 1)
+
+    def test_unknown_format_is_a_400(self):
+        self.assertEqual(self.client.get(self.url, {'file_format': 'pdf'}).status_code, 400)
+
+
+@override_settings(EXPORT_JOBS_IN_PROCESS=False)
+class ExportArtifactVersionTests(TestCase):
+    def setUp(self):
+        make_transaction('2026-03-02 09:15')
+        account = BankAccount.objects.create(name='KBZ', currency='MMK')
+        self.balance = DailyBalance.objects.create(bank_account=account, date=date(2026, 3, 2), balance=1000)
+
+    def submit(self):
+        return submit_export('transactions', 'xlsx', {'period': 'all'})
+
+    def test_balance_and_daily_profit_writes_change_the_artifact(self):
+        first, created = self.submit()
+        self.assertTrue(created)
+        self.assertEqual(self.submit(), (first, False))
+
+        self.balance.balance = 2000
+        self.balance.save()
+        second, created = self.submit()
+        self.assertTrue(created)
+        self.assertNotEqual(second.artifact_key, first.artifact_key)
+
+        DailyProfit.objects.create(date=date(2026, 3, 2), buy_sell_profit=5)
+        self.assertTrue(self.submit()[1])
+
+    def test_deleted_balance_changes_the_version(self):
+        before = export_data_version()
+        self.balance.delete()
+        self.assertNotEqual(export_data_version(), before)
@@ -0,0 +1,77 @@
+import csv
+import io
+import os
+import tempfile
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from transactions.matching import MATCH_LEDGER_HEADER, apply_matching, match_ledger_rows
+from transactions.models import Transaction
+
+from .helpers import make_transaction
+
+URL = '/api/transactions/export/match_ledger/'
+PROFIT = MATCH_LEDGER_HEADER.index('Profit')
+BOOKED_TO = MATCH_LEDGER_HEADER.index('Profit Booked To')
+
+
+class MatchLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for when, transaction_type, mmk, rate in (
+            ('2026-03-01 09:00', 'BUY', '100000', '0.0080'),
+            ('2026-03-01 10:00', 'BUY', '50000', '0.0078'),
+            ('2026-03-01 12:00', 'SELL', '120000', '0.0082'),
+            ('2026-03-02 09:00', 'BUY', '80000', '0.0079'),
+            ('2026-03-02 11:00', 'SELL', '60000', '0.0081'),
+            ('2026-03-03 10:00', 'SELL', '40000', '0.0083'),
+        ):
+            make_transaction(
+                when, transaction_type=transaction_type, thb=str(Decimal(mmk) * Decimal(rate)), rate=rate,
+                mmk_amount=Decimal(mmk), customer=f'{transaction_type.title()} customer'
+            )
+        make_transaction('2026-03-02 15:00', transaction_type='OTHER', thb='25.00')
+        apply_matching()
+
+    def test_ledger_profit_adds_up_to_the_stored_profits(self):
+        booked = defaultdict(Decimal)
+        for row in match_ledger_rows():
+            booked[row[BOOKED_TO]] += row[PROFIT]
+        stored = dict(Transaction.objects.filter(transaction_type__in=['BUY', 'SELL']).values_list('id', 'profit'))
+        self.assertTrue(any(stored.values()))
+        for pk, profit in stored.items():
+            self.assertEqual(booked.get(pk, Decimal('0')), profit, pk)
+        self.assertEqual(sum(booked.values()), sum(stored.values()))
+
+    def test_matches_are_dated_by_their_later_transaction(self):
+        all_rows = list(match_ledger_rows())
+        later = list(match_ledger_rows(start_date=date(2026, 3, 2)))
+        first_day = list(match_ledger_rows(end_date=date(2026, 3, 1)))
+        self.assertEqual(len(first_day) + len(later), len(all_rows))
+        self.assertTrue(first_day and later)
+        self.assertTrue(all(row[0].date() == date(2026, 3, 1) for row in first_day))
+
+    def csv_rows(self, content):
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_endpoint_and_command_write_the_same_csv(self):
+        response = self.client.get(URL, {'start_date': '2026-03-01', 'end_date': '2026-03-03'})
+        self.assertEqual(response.status_code, 200)
+        from_endpoint = self.csv_rows(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(from_endpoint[0], MATCH_LEDGER_HEADER)
+        self.assertEqual(len(from_endpoint) - 1, len(list(match_ledger_rows())))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ledger.csv')
+            call_command('export_match_ledger', path, '--start-date', '2026-03-01', stdout=io.StringIO())
+            with open(path, encoding='utf-8', newline='') as f:
+                from_command = self.csv_rows(f.read())
+        self.assertEqual(from_command, from_endpoint)
+
+    def test_bad_parameters_are_a_400(self):
+        self.assertEqual(self.client.get(URL, {'start_date': '03/01/2026'}).status_code, 400)
+        self.assertEqual(self.client.get(URL, {'file_format': 'xml'}).status_code, 400)
@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.matching import apply_matching, match_profits
+from transactions.models import Transaction
+
+from .helpers import make_transaction
+
+
+def stored_profits():
+    return dict(Transaction.objects.values_list('id', 'profit'))
+
+
+def full_match():
+    rows = Transaction.objects.filter(transaction_type__in=['BUY', 'SELL']).order_by('date_time', 'id').values_list(
+        'id', 'transaction_type', 'mmk_amount', 'rate'
+    )
+    return match_profits(rows)
+
+
+class MatchingTests(TestCase):
+    def make(self, when, transaction_type, mmk, rate):
+        return make_transaction(
+            when, transaction_type=transaction_type, thb=str(Decimal(mmk) * Decimal(rate)), rate=rate,
+            mmk_amount=Decimal(mmk)
+        )
+
+    def setUp(self):
+        self.buy1 = self.make('2026-03-01 09:00', 'BUY', '1000', '0.0100')
+        self.buy2 = self.make('2026-03-01 10:00', 'BUY', '500', '0.0080')
+        self.sell3 = self.make('2026-03-01 11:00', 'SELL', '1200', '0.0080')
+
+    def test_fifo_profits_are_booked_to_the_used_up_side(self):
+        apply_matching()
+        # SELL 3 uses up BUY 1 (profit to BUY 1) and takes 200 of BUY 2 at the
+        # same rate (no profit, booked to SELL 3, which is used up)
+        self.assertEqual(stored_profits(), {
+            self.buy1.id: Decimal('25000.00'), self.buy2.id: Decimal('0.00'), self.sell3.id: Decimal('0.00'),
+        })
+
+        sell4 = self.make('2026-03-01 12:00', 'SELL', '300', '0.0050')
+        changed = apply_matching(since=sell4.date_time)
+        # SELL 4 uses up the 300 left of BUY 2: 300 / 0.005 - 300 / 0.008
+        self.assertEqual({tx.id for tx in changed}, {self.buy2.id})
+        self.assertEqual(stored_profits()[self.buy2.id], Decimal('22500.00'))
+        self.assertEqual(stored_profits(), full_match())
+
+    def test_rematch_from_a_backdated_row_matches_a_full_rematch(self):
+        apply_matching()
+        early_sell = self.make('2026-03-01 09:30', 'SELL', '400', '0.0090')
+        late_buy = self.make('2026-03-01 13:00', 'BUY', '2000', '0.0095')
+        self.make('2026-03-01 14:00', 'SELL', '900', '0.0085')
+
+        apply_matching(since=early_sell.date_time)
+        self.assertEqual(stored_profits(), full_match())
+        self.assertNotEqual(stored_profits()[self.buy1.id], Decimal('25000.00'))
+        self.assertEqual(stored_profits()[late_buy.id], Decimal('0.00'))
+
+    def test_zero_rate_rows_fall_back_to_a_full_rematch(self):
+        self.make('2026-03-01 08:00', 'BUY', '100', '0')
+        apply_matching()
+        sell = self.make('2026-03-01 12:00', 'SELL', '300', '0.0050')
+        apply_matching(since=sell.date_time)
+        self.assertEqual(stored_profits(), full_match())
+
+
+class BulkCreateMatchingTests(TestCase):
+    def test_bulk_create_rematches_from_the_new_rows(self):
+        make_transaction('2026-03-01 09:00', thb='10.00', rate='0.0100', mmk_amount=Decimal('1000'))
+        apply_matching()
+        response = self.client.post('/api/transactions/create/bulk/', [
+            {'transaction_type': 'SELL', 'customer': 'Ko Ko', 'created_at': '2026-03-01T10:00:00+00:00',
+             'thb_amount': '8.00', 'mmk_amount': '1000.00', 'rate': '0.0080', 'hundred_k_rate': '12500000.00'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['profits_updated'], 1)
+        self.assertEqual(stored_profits(), full_match())
+        self.assertEqual(sum(stored_profits().values()), Decimal('25000.00'))
@@ -0,0 +1,95 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from transactions.models import Transaction
+from transactions.pagination import decode_cursor, encode_cursor, keyset_page
+
+from .helpers import make_transaction
+
+LIST_URL = '/api/transactions/list/'
+VIEWSET_URL = '/api/transactions/transactions/'
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Pairs of rows share a date_time so the id breaks the tie
+        for n in range(7):
+            make_transaction(f'2026-03-0{n // 2 + 1} 09:00', thb=f'{n + 1}.00')
+        cls.newest_first = list(Transaction.objects.order_by('-date_time', '-id').values_list('id', flat=True))
+
+    def walk(self, ordering='-date_time'):
+        ids, cursor = [], None
+        while True:
+            rows, cursor, _ = keyset_page(Transaction.objects.all(), cursor, 3, ordering)
+            ids.extend(row.pk for row in rows)
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        self.assertEqual(self.walk(), self.newest_first)
+        self.assertEqual(self.walk('date_time'), self.newest_first[::-1])
+
+    def test_previous_cursor_returns_the_page_before(self):
+        first, next_cursor, previous_cursor = keyset_page(Transaction.objects.all(), None, 3)
+        self.assertIsNone(previous_cursor)
+        second, _, previous_cursor = keyset_page(Transaction.objects.all(), next_cursor, 3)
+        self.assertEqual([row.pk for row in second], self.newest_first[3:6])
+        back, next_again, previous_cursor = keyset_page(Transaction.objects.all(), previous_cursor, 3)
+        self.assertEqual(back, first)
+        self.assertIsNone(previous_cursor)
+        self.assertEqual(next_again, next_cursor)
+
+    def test_cursor_round_trip_and_bad_cursors(self):
+        row = Transaction.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(row.date_time, row.pk, True)), (row.date_time, row.pk, True))
+        for cursor in ('nonsense', encode_cursor(row.date_time, row.pk)[:-4]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+        with self.assertRaises(ValueError):
+            keyset_page(Transaction.objects.all(), ordering='customer')
+
+
+class CursorEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(5):
+            make_transaction(f'2026-03-0{n + 1} 09:00', thb=f'{n + 1}.00')
+
+    def test_list_transactions_skips_the_count(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(LIST_URL, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in context.captured_queries if 'COUNT(' in q['sql'].upper()])
+        body = response.json()
+        self.assertEqual([row['thb_amount'] for row in body['results']], ['5.00', '4.00'])
+        self.assertTrue(body['has_next'])
+        self.assertFalse(body['has_previous'])
+
+        body = self.client.get(LIST_URL, {'cursor': body['next_cursor'], 'page_size': 2}).json()
+        self.assertEqual([row['thb_amount'] for row in body['results']], ['3.00', '2.00'])
+        self.assertTrue(body['has_previous'])
+
+    def test_viewset_links_follow_the_cursor(self):
+        response = self.client.get(VIEWSET_URL, {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertNotIn('count', body)
+        self.assertIsNone(body['previous'])
+        query = parse_qs(urlparse(body['next']).query)
+        self.assertNotIn('pagination', query)
+
+        body = self.client.get(VIEWSET_URL, {'cursor': query['cursor'][0], 'page_size': 3}).json()
+        self.assertEqual([row['thb_amount'] for row in body['results']], ['2.00', '1.00'])
+        self.assertIsNone(body['next'])
+        self.assertIsNotNone(body['previous'])
+
+        # Without a cursor the page-number response is unchanged
+        self.assertEqual(self.client.get(VIEWSET_URL).json()['count'], 5)
+
+    def test_bad_cursor_is_a_400(self):
+        self.assertEqual(self.client.get(LIST_URL, {'cursor': 'nonsense'}).status_code, 400)
+        self.assertEqual(self.client.get(VIEWSET_URL, {'cursor': 'nonsense'}).status_code, 400)
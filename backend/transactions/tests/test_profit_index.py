@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.models import DailyProfit, Transaction
+from transactions.profit_index import FenwickTree, ProfitRangeIndex
+
+from .helpers import local_datetime, make_transaction
+
+
+class FenwickTreeTests(TestCase):
+    values = [(3, 1), (0, 2), (5, 0), (7, 7), (1, 1), (4, 9), (2, 2)]
+
+    def brute_force(self, values, lo, hi):
+        return [sum(value[k] for value in values[lo:hi + 1]) for k in range(2)]
+
+    def test_range_sums_match_brute_force(self):
+        tree = FenwickTree.from_values(self.values, 2)
+        for lo in range(len(self.values)):
+            for hi in range(lo, len(self.values)):
+                self.assertEqual(tree.range_sum(lo, hi), self.brute_force(self.values, lo, hi))
+
+    def test_empty_range_is_zero(self):
+        tree = FenwickTree.from_values(self.values, 2)
+        self.assertEqual(tree.range_sum(4, 3), [0, 0])
+
+    def test_point_updates(self):
+        values = [list(value) for value in self.values]
+        tree = FenwickTree.from_values(self.values, 2)
+        for index, deltas in ((0, (10, 0)), (3, (-7, 1)), (6, (1, -2)), (3, (2, 2))):
+            tree.add(index, deltas)
+            values[index] = [v + d for v, d in zip(values[index], deltas)]
+        for lo in range(len(values)):
+            for hi in range(lo, len(values)):
+                self.assertEqual(tree.range_sum(lo, hi), self.brute_force(values, lo, hi))
+
+
+class ProfitRangeIndexTests(TestCase):
+    def setUp(self):
+        DailyProfit.objects.create(
+            date=date(2026, 3, 1), buy_sell_profit=Decimal('10.00'), other_profit=Decimal('1.00'),
+            total_profit=Decimal('11.00')
+        )
+        DailyProfit.objects.create(
+            date=date(2026, 3, 3), buy_sell_profit=Decimal('20.00'), other_profit=Decimal('0.00'),
+            total_profit=Decimal('20.00')
+        )
+        make_transaction('2026-03-01 09:00', thb='1000.00')
+        make_transaction('2026-03-01 15:00', transaction_type='SELL', thb='500.00')
+        make_transaction('2026-03-03 10:00', thb='250.00')
+        self.index = ProfitRangeIndex()
+        self.index.rebuild()
+
+    def test_range_totals(self):
+        totals = self.index.range_totals(date(2026, 3, 1), date(2026, 3, 3))
+        self.assertEqual(totals['total_profit'], 31.0)
+        self.assertEqual(totals['thb_volume'], 1750.0)
+        self.assertEqual(totals['transaction_count'], 3)
+
+        totals = self.index.range_totals(date(2026, 3, 2), date(2026, 3, 3))
+        self.assertEqual(totals['buy_sell_profit'], 20.0)
+        self.assertEqual(totals['transaction_count'], 1)
+
+    def test_range_outside_known_days_is_empty(self):
+        totals = self.index.range_totals(date(2025, 1, 1), date(2025, 12, 31))
+        self.assertEqual(totals['total_profit'], 0.0)
+        self.assertEqual(totals['transaction_count'], 0)
+
+    def test_unchanged_data_reads_only_the_version(self):
+        self.index.range_totals(date(2026, 3, 1), date(2026, 3, 3))
+        # Transaction count/updated_at, latest tombstone, DailyProfit count/updated_at
+        with self.assertNumQueries(3):
+            self.index.range_totals(date(2026, 3, 1), date(2026, 3, 3))
+
+    def test_writes_the_process_did_not_see_are_picked_up(self):
+        # bulk_create and queryset updates send no signals, as writes from another worker don't reach this one
+        Transaction.objects.bulk_create([Transaction(
+            transaction_type='BUY', date_time=local_datetime('2026-03-03 18:00'), customer='Ko Ko',
+            thb_amount=Decimal('100.00'), mmk_amount=Decimal('12500.00'), rate=Decimal('0.0080'),
+            hundred_k_rate=Decimal('12500000.00'), profit=Decimal('0')
+        )])
+        DailyProfit.objects.filter(date=date(2026, 3, 1)).update(
+            buy_sell_profit=Decimal('15.00'), total_profit=Decimal('16.00'), updated_at=local_datetime('2030-01-01 00:00')
+        )
+        totals = self.index.range_totals(date(2026, 3, 1), date(2026, 3, 3))
+        self.assertEqual(totals['total_profit'], 36.0)
+        self.assertEqual(totals['thb_volume'], 1850.0)
+        self.assertEqual(totals['transaction_count'], 4)
+
+    def test_endpoint_serves_current_totals(self):
+        url = '/api/transactions/daily-profits/range_totals/'
+        params = {'start_date': '2026-03-01', 'end_date': '2026-03-03'}
+        self.assertEqual(self.client.get(url, params).json()['total_profit'], 31.0)
+        make_transaction('2026-03-02 12:00', thb='40.00')
+        self.assertEqual(self.client.get(url, params).json()['transaction_count'], 4)
+
+    def test_deleted_daily_profit_is_picked_up(self):
+        DailyProfit.objects.filter(date=date(2026, 3, 3)).delete()
+        self.assertEqual(self.index.range_totals(date(2026, 3, 1), date(2026, 3, 3))['total_profit'], 11.0)
+
+
+class DateRangeSummaryTests(TestCase):
+    def test_counts_include_rows_written_without_signals(self):
+        make_transaction('2026-03-01 09:00', thb='1000.00')
+        # bulk_create sends no signals, so no in-process index sees this row
+        Transaction.objects.bulk_create([Transaction(
+            transaction_type='SELL', date_time=local_datetime('2026-03-02 09:00'), customer='Ko Ko',
+            thb_amount=Decimal('800.00'), mmk_amount=Decimal('100000.00'), rate=Decimal('0.0080'),
+            hundred_k_rate=Decimal('12500000.00'), profit=Decimal('0')
+        )])
+
+        response = self.client.get(
+            '/api/transactions/daily-profits/calculate-range/', {'start_date': '2026-03-01', 'end_date': '2026-03-02'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['transaction_count'], 2)
+        self.assertEqual(response.json()['daily_totals']['transaction_count'], 2)
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from transactions.models import Transaction
+
+from .helpers import local_datetime
+
+LIST_URL = '/api/transactions/list/'
+VIEWSET_URL = '/api/transactions/transactions/'
+
+
+class RangeFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # A year of transactions with spread-out amounts and rates, so a week
+        # is a small slice, as in the real ledger
+        started = local_datetime('2026-01-01 08:00')
+        rows = []
+        for n in range(600):
+            mmk = Decimal(100000 + (n * 611953) % 2000000)
+            rate = Decimal('0.0076') + Decimal(n % 9) / Decimal(10000)
+            tx = Transaction(
+                transaction_type=('BUY', 'SELL')[n % 2], date_time=started + timedelta(hours=n * 14.6),
+                customer=f'Customer {n % 40}', thb_amount=(mmk * rate).quantize(Decimal('0.01')),
+                mmk_amount=mmk, rate=rate, hundred_k_rate=(100000 / rate).quantize(Decimal('0.01')),
+                profit=Decimal(n % 50)
+            )
+            tx.refresh_derived_fields()
+            rows.append(tx)
+        Transaction.objects.bulk_create(rows)
+
+    def get(self, url, params):
+        response = self.client.get(url, {**params, 'page_size': 100})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def page_plans(self, url, params):
+        """
+        SQLite query plans of the page queries a request runs. The COUNT is
+        left out: with no ORDER BY either composite index covers it, and
+        without ANALYZE statistics the planner's pick between them is a tie.
+        """
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(self.get(url, params))
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if sql.startswith('SELECT') and 'FROM "transactions_transaction"' in sql and 'ORDER BY' in sql:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plans.append(' / '.join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def assert_uses_index(self, url, params, index):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are checked on SQLite')
+        for plan in self.page_plans(url, params):
+            self.assertIn(index, plan)
+
+    def test_planner_uses_the_composite_indexes(self):
+        week = {'start_date': '2026-01-20', 'end_date': '2026-01-26'}
+        amount = {'min_mmk_amount': '500000', 'max_mmk_amount': '1500000'}
+        for url in (LIST_URL, VIEWSET_URL):
+            with self.subTest(url=url):
+                self.assert_uses_index(url, {**week, **amount}, 'transaction_datetime_mmk_idx')
+                self.assert_uses_index(url, {**week, 'type': 'BUY'}, 'transaction_type_datetime_idx')
+                self.assert_uses_index(url, amount, 'transaction_mmk_datetime_idx')
+
+    def test_min_max_bounds_are_inclusive(self):
+        amounts = sorted(Transaction.objects.values_list('mmk_amount', flat=True))
+        low, high = amounts[100], amounts[110]
+        expected = sum(1 for amount in amounts if low <= amount <= high)
+        for url in (LIST_URL, VIEWSET_URL):
+            with self.subTest(url=url):
+                rows = self.get(url, {'min_mmk_amount': str(low), 'max_mmk_amount': str(high)})
+                self.assertEqual(len(rows), expected)
+                self.assertTrue(all(low <= Decimal(row['mmk_amount']) <= high for row in rows))
+
+    def test_rate_and_profit_filters_combine(self):
+        rows = self.get(LIST_URL, {'min_rate': '0.0080', 'max_rate': '0.0081', 'min_profit': '45'})
+        expected = Transaction.objects.filter(
+            rate__gte=Decimal('0.0080'), rate__lte=Decimal('0.0081'), profit__gte=45
+        ).count()
+        self.assertEqual(len(rows), expected)
+        self.assertGreater(expected, 0)
+
+    def test_bad_bounds_are_rejected(self):
+        for url in (LIST_URL, VIEWSET_URL):
+            for params in ({'min_mmk_amount': 'lots'}, {'max_rate': 'NaN'}, {'min_profit': 'Infinity'}):
+                with self.subTest(url=url, params=params):
+                    response = self.client.get(url, params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('must be a number', response.json()['detail'])
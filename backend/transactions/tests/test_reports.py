@@ -0,0 +1,111 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from transactions.reports import ReportError, daily_summary, run_report
+
+from .helpers import make_transaction
+
+URL = '/api/transactions/reports/'
+
+
+class ReportEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_transaction('2026-03-02 09:00', thb='100.00', profit=Decimal('1.00'))
+        make_transaction('2026-03-02 14:00', transaction_type='SELL', thb='200.00', profit=Decimal('2.50'))
+        make_transaction('2026-03-03 09:30', customer='Ma Hla', thb='300.00', rate='0.0100', profit=Decimal('4.00'))
+        make_transaction('2026-04-01 10:00', transaction_type='OTHER', thb='50.00', rate='0', mmk_amount=0)
+
+    def test_metrics_by_dimensions_in_one_query(self):
+        with self.assertNumQueries(1):
+            report = run_report('count,thb_volume,profit', 'day,type', {'end_date': '2026-03-31'})
+        self.assertEqual(report['row_count'], 3)
+        self.assertEqual(report['columns'], {
+            'day': ['2026-03-02', '2026-03-02', '2026-03-03'],
+            'type': ['BUY', 'SELL', 'BUY'],
+            'count': [1, 1, 1],
+            'thb_volume': [100.0, 200.0, 300.0],
+            'profit': [1.0, 2.5, 4.0],
+        })
+
+    def test_month_week_hour_and_weekday_buckets(self):
+        self.assertEqual(run_report('count', 'month')['columns'], {
+            'month': ['2026-03-01', '2026-04-01'], 'count': [3, 1]
+        })
+        self.assertEqual(run_report('count', 'week')['columns']['week'], ['2026-03-02', '2026-03-30'])
+        self.assertEqual(run_report('count', 'hour')['columns'], {'hour': [9, 10, 14], 'count': [2, 1, 1]})
+        # Mondays 2 March and 30 March, Tuesday 3 March, Wednesday 1 April
+        self.assertEqual(run_report('count', 'weekday')['columns'], {'weekday': [0, 1, 2], 'count': [2, 1, 1]})
+
+    def test_customer_dimension_returns_names(self):
+        report = run_report('count,thb_volume', 'customer', {'type': 'buy,sell'})
+        self.assertEqual(report['columns'], {
+            'customer': ['Aung Aung', 'Ma Hla'], 'count': [2, 1], 'thb_volume': [300.0, 300.0]
+        })
+
+    def test_no_dimensions_is_one_row_of_totals(self):
+        report = run_report(['count', 'mmk_volume', 'avg_rate'], filters={'customer': 'Ma Hla'})
+        self.assertEqual(report['row_count'], 1)
+        self.assertEqual(report['columns'], {'count': [1], 'mmk_volume': [30000.0], 'avg_rate': [0.01]})
+
+    def test_range_filters_are_inclusive(self):
+        report = run_report('count', 'type', {'min_thb_amount': '100', 'max_thb_amount': '200'})
+        self.assertEqual(report['columns'], {'type': ['BUY', 'SELL'], 'count': [1, 1]})
+
+    def test_daily_summary_rows(self):
+        self.assertEqual(daily_summary('2026-03-03', '2026-03-03'), [{
+            'date': '2026-03-03', 'thb_volume': 300.0, 'mmk_volume': 30000.0, 'profit': 4.0, 'transaction_count': 1
+        }])
+
+    def test_bad_definitions_raise_report_error(self):
+        for metrics, dimensions, filters in (
+            ('', 'day', None),
+            ('count,median', 'day', None),
+            ('count', 'year', None),
+            ('count,count', 'day', None),
+            ('count', 'day', {'start_date': '02/03/2026'}),
+            ('count', 'day', {'type': 'GIFT'}),
+            ('count', 'day', {'colour': 'red'}),
+            ('count', 'day', {'min_rate': 'high'}),
+            ('count', 'day', {'customer_id': 'x'}),
+        ):
+            with self.subTest(metrics=metrics, dimensions=dimensions, filters=filters):
+                with self.assertRaises(ReportError):
+                    run_report(metrics, dimensions, filters)
+
+    def test_endpoint(self):
+        response = self.client.get(URL, {'metrics': 'count', 'dimensions': 'type', 'start_date': '2026-04-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['columns'], {'type': ['OTHER'], 'count': [1]})
+
+        response = self.client.get(URL, {'metrics': 'count', 'dimensions': 'colour'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown dimension(s): colour', response.json()['error'])
+
+
+class VolumeHeatmapTests(TestCase):
+    url = '/api/transactions/reports/heatmap/'
+
+    def test_weekday_by_hour_matrices(self):
+        today = timezone.localdate()
+        make_transaction(f'{today} 09:15', thb='100.00')
+        make_transaction(f'{today} 09:45', thb='50.00')
+        # Outside the one-week window
+        make_transaction(f'{today - timedelta(days=7)} 09:00', thb='999.00')
+
+        response = self.client.get(self.url, {'weeks': 1})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['start_date'], (today - timedelta(days=6)).isoformat())
+        counts = body['metrics']['count']
+        self.assertEqual((len(counts), len(counts[0])), (7, 24))
+        self.assertEqual(counts[today.weekday()][9], 2)
+        self.assertEqual(sum(map(sum, counts)), 2)
+        self.assertEqual(body['metrics']['thb_volume'][today.weekday()][9], 150.0)
+
+    def test_weeks_out_of_range_is_a_400(self):
+        for weeks in ('0', '521', 'many'):
+            self.assertEqual(self.client.get(self.url, {'weeks': weeks}).status_code, 400)
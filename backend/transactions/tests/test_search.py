@@ -0,0 +1,63 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from transactions.models import Transaction
+from transactions.search import FTS_TABLE, SEARCH_TRIGGERS, search_transactions
+
+from .helpers import make_transaction
+
+
+class SearchIndexTests(TestCase):
+    """Rows written after migrate reach the search index (the FTS5 triggers survive the migrations)"""
+
+    def setUp(self):
+        self.aung = make_transaction('2026-03-01 09:00', customer='Aung Aung', remarks='KBZ transfer')
+        self.hla = make_transaction('2026-03-01 10:00', customer='Ma Hla')
+
+    def search_ids(self, query):
+        response = self.client.get('/api/transactions/list/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_new_transaction_is_found_by_search(self):
+        self.assertEqual(self.search_ids('aung'), {self.aung.id})
+        self.assertEqual(self.search_ids('kbz'), {self.aung.id})
+
+    def test_updated_and_deleted_transactions_follow_the_index(self):
+        self.hla.customer = 'Aung Hla'
+        self.hla.save()
+        self.assertEqual(self.search_ids('aung'), {self.aung.id, self.hla.id})
+
+        self.aung.delete()
+        self.assertEqual(self.search_ids('aung'), {self.hla.id})
+
+    def triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'transactions_transaction'"
+            )
+            return {name for name, in cursor.fetchall()}
+
+    def test_triggers_exist_after_migrate(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 index is SQLite only')
+        self.assertTrue({f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'} <= self.triggers())
+
+    def test_migrate_restores_triggers_a_table_rebuild_dropped(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 index is SQLite only')
+        # What SQLite's table remake does to them on an AlterField/AddField
+        with connection.cursor() as cursor:
+            for name in SEARCH_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        missed = make_transaction('2026-03-02 09:00', customer='Thida Win')
+        self.assertEqual(self.search_ids('thida'), set())
+
+        call_command('migrate', 'transactions', verbosity=0)
+        self.assertTrue(set(SEARCH_TRIGGERS) <= self.triggers())
+        self.assertEqual(self.search_ids('thida'), {missed.id})
+
+    def test_search_composes_with_filters(self):
+        queryset = search_transactions(Transaction.objects.filter(transaction_type='SELL'), 'aung')
+        self.assertFalse(queryset.exists())
@@ -0,0 +1,49 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer, transaction_rows
+
+from .helpers import make_transaction
+
+
+class FastRowSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_transaction('2026-03-01 09:00', thb='1234567.89', rate='0.0123', remarks='cash')
+        make_transaction('2026-03-01 23:59', transaction_type='SELL', customer='မောင်မောင်', thb='0.10',
+                         profit=Decimal('-12.34'), remarks=None)
+        tx = make_transaction('2026-03-02 00:00', transaction_type='OTHER', thb='5.00', rate='0', mmk_amount=0)
+        # Sub-second timestamps, as saved through the API with date_time omitted
+        Transaction.objects.filter(pk=tx.pk).update(date_time=tx.date_time + timedelta(microseconds=123456))
+
+    def assertSameOutput(self, fields=None):
+        queryset = Transaction.objects.order_by('id')
+        expected = TransactionSerializer(queryset, many=True).data
+        if fields:
+            expected = [{name: row[name] for name in fields} for row in expected]
+        actual = transaction_rows.serialize(transaction_rows.values(queryset, fields), fields)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_rows_render_byte_identical_to_the_serializer(self):
+        self.assertSameOutput()
+        for zone in ('Asia/Yangon', 'America/New_York'):
+            with self.subTest(zone=zone), override_settings(TIME_ZONE=zone):
+                self.assertSameOutput()
+
+    def test_sparse_fields_keep_their_order(self):
+        self.assertSameOutput(['id', 'rate', 'date_time'])
+        self.assertSameOutput(['customer', 'profit'])
+
+    def test_list_endpoints_use_the_same_format(self):
+        expected = json.loads(JSONRenderer().render(
+            TransactionSerializer(Transaction.objects.order_by('-date_time'), many=True).data
+        ))
+        listed = self.client.get('/api/transactions/list/', {'show_all': 'true'}).json()['results']
+        self.assertEqual(listed, expected)
+        viewset = self.client.get('/api/transactions/transactions/').json()['results']
+        self.assertEqual(viewset, expected)
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.models import CustomerMonthlyTotal
+
+from .helpers import make_transaction
+
+
+class TransactionSavedTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transaction = make_transaction('2026-03-02 09:00', customer='Aung Aung')
+
+    def test_profit_only_save_skips_the_per_customer_refresh(self):
+        self.transaction.profit = Decimal('12.50')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertNumQueries(1):
+                self.transaction.save(update_fields=['profit'])
+        self.assertEqual(callbacks, [])
+        # The matching pass refreshes the totals itself; the save left them alone
+        self.assertEqual(CustomerMonthlyTotal.objects.get().profit, Decimal('0'))
+
+    def test_amount_save_refreshes_the_customer_totals(self):
+        self.transaction.thb_amount = Decimal('2000.00')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.transaction.save(update_fields=['thb_amount'])
+        self.assertTrue(callbacks)
+        self.assertEqual(CustomerMonthlyTotal.objects.get().thb_volume, Decimal('2000.00'))
@@ -0,0 +1,81 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from transactions.models import Expense, ExpenseType
+from transactions.serializers import TransactionSerializer
+
+from .helpers import make_transaction
+
+EXPENSES_URL = '/api/transactions/expenses/'
+# Expense output: 'amount' is write-only, read back as amount_thb
+EXPENSE_COLUMNS = ['id', 'expense_type', 'expense_type_name', 'description', 'remarks', 'date', 'amount_thb']
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        rent = ExpenseType.objects.create(name='Rent')
+        Expense.objects.create(
+            expense_type=rent, amount=Decimal('1500.00'), description='Shop rent', remarks='March', date=date(2026, 3, 1)
+        )
+
+    def test_fields_narrow_the_output_and_the_select(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(EXPENSES_URL, {'fields': 'date,amount_thb,expense_type_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'expense_type_name': 'Rent', 'date': '2026-03-01', 'amount_thb': '1500.00'}])
+        select = next(query['sql'] for query in context.captured_queries if 'transactions_expense' in query['sql'])
+        self.assertNotIn('"description"', select)
+        self.assertIn('"transactions_expensetype"."name"', select)
+
+    def test_unknown_fields_are_a_400_on_every_viewset(self):
+        for url in (EXPENSES_URL, '/api/transactions/daily-balances/', '/api/transactions/daily-profits/',
+                    '/api/transactions/transactions/', '/api/transactions/list/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'fields': 'id,nope'})
+                self.assertEqual(response.status_code, 400)
+                body = json.dumps(response.json())
+                self.assertIn('Unknown field(s): nope', body)
+                self.assertNotIn('Failed to list', body)
+
+    def test_fields_are_ignored_on_writes(self):
+        response = self.client.post(
+            f'{EXPENSES_URL}?fields=id', {
+                'expense_type': ExpenseType.objects.get().id, 'amount': '20.00',
+                'description': 'Tea', 'date': '2026-03-02'
+            }
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(response.json()), set(EXPENSE_COLUMNS))
+
+
+class ColumnarRendererTests(TestCase):
+    def get(self, url, params=None):
+        response = self.client.get(url, {**(params or {}), 'format': 'columnar'})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_rows_follow_the_columns(self):
+        make_transaction('2026-03-01 09:00', customer='Aung Aung')
+        body = self.get('/api/transactions/list/', {'fields': 'customer,id'})
+        self.assertEqual(body['results']['columns'], ['id', 'customer'])
+        self.assertEqual(body['results']['rows'][0][1], 'Aung Aung')
+
+    def test_empty_pages_keep_the_schema(self):
+        all_fields = list(TransactionSerializer().fields)
+        for url in ('/api/transactions/list/', '/api/transactions/transactions/'):
+            with self.subTest(url=url):
+                body = self.get(url)
+                self.assertEqual(body['results'], {'columns': all_fields, 'rows': []})
+                self.assertEqual(self.get(url, {'fields': 'rate,id'})['results']['columns'], ['id', 'rate'])
+
+        self.assertEqual(self.get(EXPENSES_URL), {'columns': EXPENSE_COLUMNS, 'rows': []})
+
+    def test_errors_are_not_reshaped(self):
+        response = self.client.get('/api/transactions/list/', {'format': 'columnar', 'min_rate': 'lots'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from transactions.statements import customer_statement
+
+from .helpers import make_transaction
+
+URL = '/api/transactions/customers/statement/'
+
+
+class CustomerStatementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Before the statement range: BUY 1000 THB / 125000 MMK, SELL 400 THB / 50000 MMK
+        first = make_transaction('2026-02-20 10:00', thb='1000.00')
+        make_transaction('2026-02-25 10:00', transaction_type='SELL', thb='400.00')
+        # 1 March 2026 is a Sunday, so the 2nd starts a new ISO week
+        make_transaction('2026-03-01 09:00', thb='100.00', profit=Decimal('1.50'))
+        make_transaction('2026-03-02 09:00', transaction_type='SELL', thb='200.00', profit=Decimal('2.50'))
+        make_transaction('2026-03-31 18:00', transaction_type='OTHER', thb='50.00', profit=Decimal('50.00'))
+        make_transaction('2026-04-01 08:00', thb='80.00', remarks='cash')
+        make_transaction('2026-03-05 12:00', customer='Ma Hla', thb='999.00')
+        cls.customer_id = first.customer_ref_id
+
+    def statement(self, period='month', start_date=date(2026, 3, 1)):
+        opening, entries = customer_statement(self.customer_id, start_date, date(2026, 4, 30), period)
+        return opening, list(entries)
+
+    def get(self, **params):
+        response = self.client.get(URL, {
+            'customer_id': self.customer_id, 'start_date': '2026-03-01', 'end_date': '2026-04-30', **params
+        })
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_opening_balance_carries_from_before_start_date(self):
+        opening, entries = self.statement()
+        self.assertEqual(opening, (Decimal('-600.00'), Decimal('75000.00')))
+        first = entries[0]
+        self.assertEqual((first['thb'], first['mmk']), (Decimal('-100.00'), Decimal('12500.00')))
+        self.assertEqual((first['thb_balance'], first['mmk_balance']), (Decimal('-700.00'), Decimal('87500.00')))
+
+        opening, entries = self.statement(start_date=None)
+        self.assertEqual(opening, (Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(entries[0]['thb_balance'], Decimal('-1000.00'))
+
+    def test_month_subtotals_close_each_month(self):
+        _, entries = self.statement('month')
+        self.assertEqual(
+            [entry['period'] if entry['kind'] == 'subtotal' else entry['kind'] for entry in entries],
+            ['transaction', 'transaction', 'transaction', '2026-03', 'transaction', '2026-04']
+        )
+        march = entries[3]
+        self.assertEqual(march['count'], 3)
+        self.assertEqual((march['thb'], march['mmk'], march['profit']),
+                         (Decimal('150.00'), Decimal('-12500.00'), Decimal('54.00')))
+        # A subtotal carries the running balance after its last transaction
+        self.assertEqual((march['thb_balance'], march['mmk_balance']), (Decimal('-450.00'), Decimal('62500.00')))
+
+    def test_week_subtotals_follow_iso_weeks(self):
+        _, entries = self.statement('week')
+        subtotals = [(entry['period'], entry['count']) for entry in entries if entry['kind'] == 'subtotal']
+        self.assertEqual(subtotals, [('2026-W09', 1), ('2026-W10', 1), ('2026-W14', 2)])
+
+    def test_no_period_has_no_subtotals(self):
+        _, entries = self.statement('none')
+        self.assertEqual({entry['kind'] for entry in entries}, {'transaction'})
+
+    def test_json_closing_totals(self):
+        body = json.loads(self.get())
+        self.assertEqual(body['opening'], {'thb_balance': '-600.00', 'mmk_balance': '75000.00'})
+        self.assertEqual(body['closing'], {
+            'count': 4, 'thb': '70.00', 'mmk': '-2500.00', 'profit': '54.00',
+            'thb_balance': '-530.00', 'mmk_balance': '72500.00',
+        })
+        self.assertEqual(len(body['entries']), 6)
+
+    def test_csv_has_opening_and_closing_rows(self):
+        rows = list(csv.reader(io.StringIO(self.get(file_format='csv').decode('utf-8'))))
+        self.assertEqual(rows[0][:3], ['Date & Time', 'Type', 'ID'])
+        self.assertEqual(rows[1][1:2] + rows[1][8:], ['OPENING', '-600.00', '75000.00'])
+        self.assertEqual(rows[2][0], '2026-03-01 09:00:00')
+        self.assertEqual(rows[-1], ['', 'CLOSING', '4 transactions', '70.00', '-2500.00', '', '54.00', '',
+                                    '-530.00', '72500.00'])
+
+    def test_xlsx_keeps_typed_cells(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl is not installed')
+        response = self.client.get(URL, {'customer_id': self.customer_id, 'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        sheet = openpyxl.load_workbook(io.BytesIO(content), read_only=True)['Statement']
+        rows = list(sheet.iter_rows(values_only=True))
+        # Header, opening, six transactions with three month subtotals, closing
+        self.assertEqual(len(rows), 1 + 1 + 6 + 3 + 1)
+        self.assertEqual(rows[2][0], datetime(2026, 2, 20, 10, 0))
+        self.assertEqual(rows[-1][1], 'CLOSING')
+
+    def test_unknown_period_is_a_400(self):
+        response = self.client.get(URL, {'customer_id': self.customer_id, 'period': 'fortnight'})
+        self.assertEqual(response.status_code, 400)
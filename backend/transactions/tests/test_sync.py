@@ -0,0 +1,52 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from transactions.models import DeletedRecord
+from transactions.sync import encode_sync_token
+
+from .helpers import make_transaction
+
+
+@override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+class SyncRetentionTests(TestCase):
+    def sync(self, since=None):
+        response = self.client.get('/api/transactions/sync/', {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_recent_token_gets_changes_and_deletes(self):
+        kept = make_transaction('2026-03-01 09:00')
+        removed = make_transaction('2026-03-01 10:00')
+        token = encode_sync_token(timezone.now() - timedelta(days=1))
+        removed_id = removed.id
+        removed.delete()
+
+        payload = self.sync(token)
+        self.assertFalse(payload['full'])
+        self.assertEqual(payload['deleted']['transactions'], [removed_id])
+        self.assertEqual([row['id'] for row in payload['changes']['transactions']], [kept.id])
+
+    def test_token_older_than_retention_gets_a_full_snapshot(self):
+        kept = make_transaction('2026-03-01 09:00')
+        token = encode_sync_token(timezone.now() - timedelta(days=31))
+
+        payload = self.sync(token)
+        self.assertTrue(payload['full'])
+        self.assertEqual([row['id'] for row in payload['changes']['transactions']], [kept.id])
+        self.assertEqual(payload['deleted']['transactions'], [])
+
+    def test_purge_command_drops_only_old_tombstones(self):
+        old = DeletedRecord.objects.create(collection='transactions', object_id=1)
+        DeletedRecord.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=45))
+        recent = DeletedRecord.objects.create(collection='transactions', object_id=2)
+
+        call_command('purge_sync_tombstones', stdout=StringIO())
+        self.assertEqual(list(DeletedRecord.objects.values_list('pk', flat=True)), [recent.pk])
+
+    def test_bad_token_is_rejected(self):
+        response = self.client.get('/api/transactions/sync/', {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, 400)
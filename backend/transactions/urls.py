@@ -35,14 +35,39 @@ urlpatterns = [
     path('calculate_profits/', views.calculate_profits, name='calculate-profits'),
     path('dashboard/', views.dashboard, name='dashboard'),
     
+    # Async (ASGI) versions of the dashboard and stats endpoints
+    path('async/dashboard/', views.dashboard_async, name='dashboard-async'),
+    path('async/stats/', views.stats_async, name='stats-async'),
+    
+    # Grouped reports (metrics x dimensions in one query)
+    path('reports/', views.transaction_report, name='transaction-report'),
+    path('reports/heatmap/', views.volume_heatmap, name='volume-heatmap'),
+    
+    # Customer leaderboard from the maintained per-customer monthly totals
+    path('customers/leaderboard/', views.customer_leaderboard, name='customer-leaderboard'),
+    path('customers/autocomplete/', views.customer_autocomplete, name='customer-autocomplete'),
+    path('customers/statement/', views.customer_statement, name='customer-statement'),
+    
     # Add export endpoint
     path('export/', views.export_transactions, name='export-transactions'),
     
     # Add endpoint for exporting daily summary data
     path('export_daily_summary/', views.export_daily_summary, name='export-daily-summary'),
+
+    # BUY/SELL pairings of the profit matching, for audit
+    path('export/match_ledger/', views.export_match_ledger, name='export-match-ledger'),
+
+    # Background export jobs: create, poll, then download (with Range support)
+    path('export/jobs/', views.create_export_job, name='create-export-job'),
+    path('export/jobs/<uuid:job_id>/', views.export_job_status, name='export-job-status'),
+    path('export/jobs/<uuid:job_id>/download/', views.download_export_job, name='export-job-download'),
     
     # Add direct transaction creation endpoint with proper decimal handling
     path('create/', views.create_transaction, name='create-transaction'),
+    path('create/bulk/', views.bulk_create_transactions, name='bulk-create-transactions'),
+    
+    # CSV/XLSX ledger import
+    path('import/', views.import_transactions, name='import-transactions'),
     
     # Add a direct list endpoint for transactions
     path('list/', views.list_transactions, name='list-transactions'),
@@ -50,10 +75,19 @@ urlpatterns = [
     # Add endpoint to get the timestamp of the last transaction
     path('last_transaction_time/', views.last_transaction_time, name='last-transaction-time'),
     
+    # Delta sync: rows changed and deleted since the client's last token
+    path('sync/', views.sync_changes, name='sync-changes'),
+    
     # Balance API endpoints
     path('balances/summary/', views.balance_summary, name='balance-summary'),
+    path('balances/timeline/', views.balance_timeline, name='balance-timeline'),
     path('balances/export/', views.export_balances, name='export-balances'),
     
+    # Daily profit calculation endpoints - listed before the router so the
+    # daily-profits/<pk>/ detail route does not swallow them
+    path('daily-profits/calculate/', views.calculate_daily_profits, name='calculate-daily-profits'),
+    path('daily-profits/calculate-range/', views.calculate_date_range_profits, name='calculate-date-range-profits'),
+    
     # Include bank account and balance router URLs
     path('', include(bank_router.urls)),
     
@@ -62,10 +96,4 @@ urlpatterns = [
     
     # Include expense router URLs
     path('', include(expense_router.urls)),
-    
-    # Add daily profits calculation endpoint
-    path('daily-profits/calculate/', views.calculate_daily_profits, name='calculate-daily-profits'),
-    
-    # Add date range profits calculation endpoint
-    path('daily-profits/calculate-range/', views.calculate_date_range_profits, name='calculate-date-range-profits'),
 ] 
\ No newline at end of file
@@ -2,14 +2,17 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view
-from django.db.models import Sum, F, Q, Avg, Count
+from rest_framework.exceptions import ValidationError
+from django.db.models import Sum, F, Q, Avg, Count, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 import json
 import logging
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.settings import api_settings
 from .models import Transaction, BankAccount, DailyBalance, DailyExchangeRate, DailyProfit, Expense, ExpenseType
 # Remove dependency on api.models - we'll handle currencies directly in this app
 # from api.models import Currency
@@ -17,10 +20,30 @@ from .serializers import (
     TransactionSerializer, BankAccountSerializer, 
     DailyBalanceSerializer, DailyBalanceSummarySerializer,
     DailyExchangeRateSerializer, DailyProfitSerializer,
-    ExpenseSerializer, ExpenseTypeSerializer
+    ExpenseSerializer, ExpenseTypeSerializer, transaction_rows,
+    narrow_queryset, requested_fields
 )
-import csv
-from django.http import HttpResponse
+from .profit_index import profit_index
+from . import reports
+from .autocomplete import customer_index
+from .caching import get_or_build
+from .customer_totals import leaderboard, parse_month, refresh_customer_totals
+from .exports import (
+    BALANCE_HEADER, BALANCE_XLSX_FORMATS, COLUMNAR_FORMATS, CSV_FORMATS, DAILY_SUMMARY_CSV_HEADER,
+    DAILY_SUMMARY_XLSX_FORMATS, TRANSACTION_CSV_HEADER, csv_download, daily_summary_csv_rows,
+    daily_summary_range, daily_summary_xlsx_rows, download_response, file_chunks, transaction_csv_rows,
+    transaction_workbook_sheets, transactions_export_queryset, write_columnar, xlsx_download
+)
+from .pagination import TransactionPagination, keyset_page
+from .renderers import ColumnarJSONRenderer, columnar_serializer
+from .search import search_transactions
+from .reports import ReportError, daily_summary, run_report
+import asyncio
+import tempfile
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -37,10 +60,35 @@ def currencies_list(request):
     ]
     return Response(currencies)
 
+def apply_range_filters(queryset, params):
+    """min_/max_ filters on mmk_amount, thb_amount, rate and profit; raises ReportError"""
+    return reports.apply_filters(queryset, {name: params.get(name) for name in reports.RANGE_FILTERS})
+
+# Response formats for list endpoints: the defaults plus ?format=columnar
+LIST_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+
+class SparseFieldsViewMixin:
+    """
+    List endpoints: ?fields=a,b returns (and SELECTs) only those fields and
+    ?format=columnar returns column names plus row arrays
+    """
+    renderer_classes = LIST_RENDERER_CLASSES
+
+    def narrow_queryset(self, queryset):
+        return narrow_queryset(queryset, self.get_serializer())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = self.narrow_queryset(queryset)
+        return queryset
+
 class TransactionViewSet(viewsets.ModelViewSet):
     queryset = Transaction.objects.all().order_by('-date_time')
     serializer_class = TransactionSerializer
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access
+    pagination_class = TransactionPagination
+    renderer_classes = LIST_RENDERER_CLASSES
     
     @action(detail=False, methods=['get'])
     def currencies(self, request):
@@ -73,49 +121,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
         today = timezone.now()
         today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Calculate statistics
-        total_transactions = Transaction.objects.count()
-        today_transactions = Transaction.objects.filter(
-            date_time__gte=today_start
-        ).count()
-
-        # Calculate volumes
-        buy_transactions = Transaction.objects.filter(transaction_type='BUY')
-        sell_transactions = Transaction.objects.filter(transaction_type='SELL')
-        
-        total_buy_volume = buy_transactions.aggregate(
-            total=Sum('thb_amount')
-        )['total'] or 0
-        
-        total_sell_volume = sell_transactions.aggregate(
-            total=Sum('thb_amount')
-        )['total'] or 0
-
-        # Calculate average rate
-        average_rate = Transaction.objects.aggregate(
-            avg_rate=Avg('rate')
-        )['avg_rate'] or 0
-
-        # Calculate profits
-        total_profit = Transaction.objects.aggregate(
-            total=Sum('profit')
-        )['total'] or 0
-        
-        today_profit = Transaction.objects.filter(
-            date_time__gte=today_start
-        ).aggregate(
-            total=Sum('profit')
-        )['total'] or 0
-
-        return Response({
-            'totalTransactions': total_transactions,
-            'todayTransactions': today_transactions,
-            'totalBuyVolume': float(total_buy_volume),
-            'totalSellVolume': float(total_sell_volume),
-            'averageRate': float(average_rate),
-            'totalProfit': float(total_profit),
-            'todayProfit': float(today_profit),
-        })
+        results = {name: query() for name, query in _stats_queries(today_start).items()}
+        return Response(_stats_payload(results))
 
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
@@ -225,14 +232,28 @@ class TransactionViewSet(viewsets.ModelViewSet):
         if transaction_type:
             queryset = queryset.filter(transaction_type=transaction_type.upper())
         
+        try:
+            queryset = apply_range_filters(queryset, request.query_params)
+        except ReportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Same search as list_transactions
+        search = request.query_params.get('search', '')
+        if search:
+            queryset = search_transactions(queryset, search)
+        
         # Apply the filtered queryset to the instance
         self.queryset = queryset
         
-        # Debug: print queryset count before pagination
-        print(f"Filtered queryset count: {queryset.count()}")
-        
-        # Use the parent's list method to handle pagination
-        response = super().list(request, *args, **kwargs)
+        # Same flow as ListModelMixin.list, but rows go through the read-only
+        # fast path instead of building a TransactionSerializer per row
+        fields = requested_fields(request, list(transaction_rows.fields))
+        queryset = transaction_rows.values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(transaction_rows.serialize(page, fields))
+        else:
+            response = Response(transaction_rows.serialize(queryset, fields))
         
         # Debug: print response data structure
         print(f"Response data type: {type(response.data)}")
@@ -257,7 +278,7 @@ def calculate_profits(request):
         # Use database transaction to ensure all updates are atomic
         with transaction.atomic():
             # Reset profit values for BUY/SELL transactions to zero first
-            Transaction.objects.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0)
+            Transaction.objects.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0, updated_at=timezone.now())
             
             # Handle 'OTHER' profit transactions - these have direct profit values
             other_profits = Transaction.objects.filter(transaction_type='OTHER')
@@ -588,6 +609,9 @@ def calculate_profits(request):
             print(f"Remaining BUY transactions: {len(remaining_buy)}")
             print(f"Remaining SELL transactions: {len(remaining_sell)}")
         
+        # Profits changed across the board; rebuild the per-customer totals once
+        refresh_customer_totals()
+        
         # Calculate total profit including OTHER transactions
         total_profit = total_profit_buysell + other_profit_total
         
@@ -610,6 +634,84 @@ def calculate_profits(request):
         traceback.print_exc()
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _dashboard_other_profit():
+    """Sum of direct profit from 'OTHER' transactions"""
+    return Transaction.objects.filter(transaction_type='OTHER').aggregate(
+        total=Sum('thb_amount')
+    )['total'] or Decimal('0.00')
+
+def _dashboard_totals():
+    """All-time transaction count, THB amount and profit"""
+    totals = Transaction.objects.aggregate(
+        count=Count('id'), thb_amount=Sum('thb_amount'), profit=Sum('profit')
+    )
+    return {
+        'count': totals['count'],
+        'thb_amount': totals['thb_amount'] or 0,
+        'profit': totals['profit'] or 0,
+    }
+
+def _dashboard_day_totals(day):
+    """Transaction count, THB amount and profit for one day"""
+    day_start = timezone.datetime.combine(day, timezone.datetime.min.time())
+    day_end = timezone.datetime.combine(day, timezone.datetime.max.time())
+    totals = Transaction.objects.filter(
+        date_time__gte=day_start, date_time__lte=day_end
+    ).aggregate(count=Count('id'), thb_amount=Sum('thb_amount'), profit=Sum('profit'))
+    return {
+        'count': totals['count'],
+        'thb_amount': totals['thb_amount'] or 0,
+        'profit': totals['profit'] or 0,
+    }
+
+def _dashboard_month_profit(day):
+    """Profit from the first of the month up to and including day"""
+    return Transaction.objects.filter(
+        date_time__date__gte=day.replace(day=1),
+        date_time__date__lte=day
+    ).aggregate(total=Sum('profit'))['total'] or 0
+
+def _dashboard_queries(day, specific_date):
+    """
+    The dashboard's independent aggregate groups as zero-argument callables,
+    so the sync view can run them in turn and the async view concurrently
+    """
+    # Daily summary: the selected date plus 3 days either side when a date
+    # was requested, otherwise the last 30 days
+    if specific_date:
+        start_date, end_date = day - timedelta(days=3), day + timedelta(days=3)
+    else:
+        start_date, end_date = day - timedelta(days=29), day
+
+    return {
+        'totals': _dashboard_totals,
+        'day_totals': lambda: _dashboard_day_totals(day),
+        'month_profit': lambda: _dashboard_month_profit(day),
+        'daily_summary': lambda: daily_summary(start_date, end_date),
+    }
+
+def _dashboard_payload(day, results, other_profit_total, remaining_transactions):
+    totals = results['totals']
+    day_totals = results['day_totals']
+
+    # Print debug info for profit values
+    print(f"Dashboard profit values - Total: {totals['profit']}, Selected day: {day_totals['profit']}, Month: {results['month_profit']}")
+    print(f"Including 'OTHER' profit contribution: {other_profit_total}")
+
+    return {
+        'total_transactions': totals['count'],
+        'total_amount': float(totals['thb_amount']),
+        'today_transactions': day_totals['count'],
+        'today_amount': float(day_totals['thb_amount']),
+        'total_profit_thb': float(totals['profit']),
+        'today_profit_thb': float(day_totals['profit']),
+        'month_profit_thb': float(results['month_profit']),
+        'other_profit_total': float(other_profit_total),
+        'selected_date': day.strftime('%Y-%m-%d'),
+        'daily_summary': results['daily_summary'],
+        'remaining_transactions': remaining_transactions
+    }
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def dashboard(request):
@@ -658,105 +760,300 @@ def dashboard(request):
             print("Using existing profit data for dashboard (skipping calculation)")
             
             # Handle 'OTHER' profit transactions for profit calculations
-            other_profits = Transaction.objects.filter(transaction_type='OTHER')
-            for tx in other_profits:
-                other_profit_total += tx.thb_amount
-                
-        # Get total transactions and amount
-        total_transactions = Transaction.objects.count()
-        total_amount = Transaction.objects.aggregate(Sum('thb_amount'))['thb_amount__sum'] or 0
+            other_profit_total = _dashboard_other_profit()
 
         # Get today's date range - if date parameter provided, use that date instead
         if date_param:
             day = selected_date
         else:
             day = timezone.now().date()
-            
-        # Get day start/end for filtering
-        day_start = timezone.datetime.combine(day, timezone.datetime.min.time())
-        day_end = timezone.datetime.combine(day, timezone.datetime.max.time())
-
-        # Get selected day's transactions
-        day_transactions = Transaction.objects.filter(date_time__gte=day_start, date_time__lte=day_end)
-        day_count = day_transactions.count()
-        day_amount = day_transactions.aggregate(Sum('thb_amount'))['thb_amount__sum'] or 0
-
-        # Calculate total profit (all time)
-        total_profit = Transaction.objects.aggregate(Sum('profit'))
-        total_profit_thb = total_profit['profit__sum'] if total_profit['profit__sum'] is not None else 0
-        
-        # Calculate selected day's profit
-        day_profit = day_transactions.aggregate(Sum('profit'))
-        day_profit_thb = day_profit['profit__sum'] if day_profit['profit__sum'] is not None else 0
-        
-        # Calculate this month's profit
-        month_start = day.replace(day=1)
-        month_profit = Transaction.objects.filter(
-            date_time__date__gte=month_start,
-            date_time__date__lte=day
-        ).aggregate(Sum('profit'))
-        month_profit_thb = month_profit['profit__sum'] if month_profit['profit__sum'] is not None else 0
-        
-        # Get daily summary - if specific date requested, show that date plus surrounding dates
-        # otherwise show last 30 days
-        if date_param:
-            # Show the selected date plus 3 days before and after (7 days total)
-            start_date = day - timedelta(days=3)
-            end_date = day + timedelta(days=3)
-        else:
-            # Default to last 30 days
-            end_date = day
-            start_date = end_date - timedelta(days=29)
-            
-        daily_data = []
-        
-        # Get data for each day in the range
-        current_date = start_date
-        while current_date <= end_date:
-            day_txns = Transaction.objects.filter(
-                date_time__date=current_date
-            )
-            
-            thb_volume = day_txns.aggregate(Sum('thb_amount'))['thb_amount__sum'] or 0
-            mmk_volume = day_txns.aggregate(Sum('mmk_amount'))['mmk_amount__sum'] or 0
-            profit = day_txns.aggregate(Sum('profit'))['profit__sum'] or 0
-            count = day_txns.count()
-            
-            if count > 0:
-                daily_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'thb_volume': float(thb_volume),
-                    'mmk_volume': float(mmk_volume),
-                    'profit': float(profit),
-                    'transaction_count': count
-                })
-                
-            current_date += timedelta(days=1)
 
-        # Print debug info for profit values
-        print(f"Dashboard profit values - Total: {total_profit_thb}, Selected day: {day_profit_thb}, Month: {month_profit_thb}")
-        print(f"Including 'OTHER' profit contribution: {other_profit_total}")
+        results = {name: query() for name, query in _dashboard_queries(day, bool(date_param)).items()}
         
         # Return the data with remaining_transactions included
-        return Response({
-            'total_transactions': total_transactions,
-            'total_amount': float(total_amount),
-            'today_transactions': day_count,
-            'today_amount': float(day_amount),
-            'total_profit_thb': float(total_profit_thb),
-            'today_profit_thb': float(day_profit_thb),
-            'month_profit_thb': float(month_profit_thb),
-            'other_profit_total': float(other_profit_total),
-            'selected_date': day.strftime('%Y-%m-%d'),
-            'daily_summary': daily_data,
-            'remaining_transactions': remaining_transactions
-        })
+        return Response(_dashboard_payload(day, results, other_profit_total, remaining_transactions))
     except Exception as e:
         print(f"Dashboard error: {str(e)}")
         import traceback
         traceback.print_exc()
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def transaction_report(request):
+    """
+    Grouped transaction report compiled into a single query.
+
+    Query parameters:
+        metrics     comma separated: count, thb_volume, mmk_volume, profit, avg_rate,
+                    first_seen, last_seen
+        dimensions  comma separated: day, week, month, hour, weekday, type, customer
+        start_date, end_date (YYYY-MM-DD), type, customer (any spelling), customer_id
+    """
+    metrics = request.query_params.get('metrics', 'count,thb_volume,mmk_volume,profit')
+    dimensions = request.query_params.get('dimensions', '')
+    filters = {
+        name: request.query_params.get(name)
+        for name in reports.FILTERS
+    }
+
+    try:
+        return Response(run_report(metrics, dimensions, filters))
+    except ReportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def volume_heatmap(request):
+    """
+    Transaction count and THB/MMK volume by weekday and hour of day over the
+    last N weeks (?weeks=, default 8), cached until the next transaction write
+    """
+    try:
+        weeks = int(request.query_params.get('weeks', 8))
+    except ValueError:
+        weeks = 0
+    if not 1 <= weeks <= 520:
+        return Response(
+            {"error": "weeks must be a whole number between 1 and 520."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    heatmap = get_or_build(
+        ('heatmap', weeks, timezone.localdate().isoformat()),
+        lambda: reports.volume_heatmap(weeks)
+    )
+    return Response(heatmap)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def customer_leaderboard(request):
+    """
+    Top customers for a month range from the per-customer monthly totals.
+
+    Query parameters: start_month, end_month (YYYY-MM, default this month),
+    order_by (thb_volume, mmk_volume, profit, transaction_count), limit
+    """
+    this_month = timezone.localdate().strftime('%Y-%m')
+    order_by = request.query_params.get('order_by', 'thb_volume')
+
+    try:
+        start_month = parse_month(request.query_params.get('start_month', this_month))
+        end_month = parse_month(request.query_params.get('end_month', this_month))
+        limit = int(request.query_params.get('limit', 10))
+        if not 1 <= limit <= 500:
+            raise ValueError("limit must be between 1 and 500")
+        results = leaderboard(start_month, end_month, order_by, limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'start_month': start_month.strftime('%Y-%m'),
+        'end_month': end_month.strftime('%Y-%m'),
+        'order_by': order_by,
+        'results': results
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def customer_autocomplete(request):
+    """
+    Customer name suggestions for a typed prefix, most frequent and most
+    recent first, with the rate of each customer's last transaction.
+
+    Query parameters: q (prefix of the name or of any word in it), limit
+    """
+    try:
+        limit = int(request.query_params.get('limit', 10))
+        if not 1 <= limit <= 50:
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'limit must be between 1 and 50'}, status=status.HTTP_400_BAD_REQUEST)
+
+    query = request.query_params.get('q', '')
+    return Response({
+        'query': query,
+        'results': customer_index.suggest(query, limit)
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def customer_statement(request):
+    """
+    One customer's transactions in date order with running THB and MMK
+    balances, a subtotal per period and opening/closing totals, streamed.
+
+    Query parameters: customer_id (or customer, any known spelling of the
+    name), start_date, end_date (YYYY-MM-DD), period (day, week, month,
+    year or none; default month), file_format (json, csv, csv.gz or xlsx)
+    """
+    from django.utils.text import slugify
+    from .customers import customer_id_for
+    from .models import Customer
+    from .statements import STATEMENT_HEADER, STATEMENT_XLSX_FORMATS, statement_json_chunks, statement_table_rows
+    from .statements import customer_statement as build_statement
+
+    params = request.query_params
+    customer_id = params.get('customer_id')
+    if not customer_id and not params.get('customer'):
+        return Response({'error': 'Pass customer_id or customer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not customer_id:
+        customer_id = customer_id_for(params['customer'])
+    customer = Customer.objects.filter(pk=customer_id).first() if str(customer_id).isdigit() else None
+    if customer is None:
+        return Response({'error': 'Customer not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    file_format = params.get('file_format', 'json').lower()
+    if file_format not in ('json', *CSV_FORMATS, 'xlsx'):
+        return Response(
+            {'error': f"Unknown file_format: {file_format}. Use {', '.join(['json', *CSV_FORMATS, 'xlsx'])}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        dates = {
+            name: datetime.strptime(params[name], '%Y-%m-%d').date() if params.get(name) else None
+            for name in ('start_date', 'end_date')
+        }
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+    period = params.get('period', 'month')
+    try:
+        opening, entries = build_statement(customer.id, dates['start_date'], dates['end_date'], period)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    print(f"Statement for customer {customer.id} ({customer.name}) as {file_format}")
+    filename = f"statement_{slugify(customer.name) or customer.id}_{timezone.localdate()}"
+    if file_format == 'xlsx':
+        rows = statement_table_rows(opening, entries, typed=True)
+        return xlsx_download([('Statement', STATEMENT_HEADER, rows, STATEMENT_XLSX_FORMATS)], f'{filename}.xlsx')
+    if file_format != 'json':
+        return csv_download(STATEMENT_HEADER, statement_table_rows(opening, entries), f'{filename}.csv', file_format)
+
+    meta = {
+        'start_date': dates['start_date'],
+        'end_date': dates['end_date'],
+        'period': period,
+    }
+    chunks = statement_json_chunks({'id': customer.id, 'name': customer.name}, opening, entries, meta)
+    return StreamingHttpResponse(chunks, content_type='application/json')
+
+def _stats_queries(today_start):
+    """Independent aggregate groups behind the stats endpoint"""
+    def overall():
+        return Transaction.objects.aggregate(
+            total_transactions=Count('id'),
+            total_buy_volume=Sum('thb_amount', filter=Q(transaction_type='BUY')),
+            total_sell_volume=Sum('thb_amount', filter=Q(transaction_type='SELL')),
+            average_rate=Avg('rate'),
+            total_profit=Sum('profit'),
+        )
+
+    def today():
+        return Transaction.objects.filter(date_time__gte=today_start).aggregate(
+            today_transactions=Count('id'),
+            today_profit=Sum('profit'),
+        )
+
+    return {'overall': overall, 'today': today}
+
+def _stats_payload(results):
+    overall = results['overall']
+    today = results['today']
+    return {
+        'totalTransactions': overall['total_transactions'],
+        'todayTransactions': today['today_transactions'],
+        'totalBuyVolume': float(overall['total_buy_volume'] or 0),
+        'totalSellVolume': float(overall['total_sell_volume'] or 0),
+        'averageRate': float(overall['average_rate'] or 0),
+        'totalProfit': float(overall['total_profit'] or 0),
+        'todayProfit': float(today['today_profit'] or 0),
+    }
+
+async def _run_concurrently(queries):
+    """
+    Run independent ORM callables at the same time, each in its own worker
+    thread with its own database connection.
+
+    Django's async ORM methods (aaggregate, acount, ...) all hop onto the one
+    thread-sensitive executor, so awaiting several of them with gather() still
+    runs them one after another. Running each group with
+    thread_sensitive=False is what actually overlaps the queries.
+    """
+    def isolated(query):
+        try:
+            return query()
+        finally:
+            # Worker threads outlive the request, so release their connections
+            close_old_connections()
+
+    names = list(queries)
+    values = await asyncio.gather(*(
+        sync_to_async(isolated, thread_sensitive=False)(queries[name]) for name in names
+    ))
+    return dict(zip(names, values))
+
+async def dashboard_async(request):
+    """
+    Async (ASGI) version of the dashboard endpoint. Returns the same payload,
+    but the independent aggregate groups run concurrently, so latency is
+    that of the slowest group rather than the sum of all of them.
+    """
+    try:
+        force_calculate = request.GET.get('force_calculate') == 'true'
+        date_param = request.GET.get('date')
+
+        if date_param:
+            try:
+                day = datetime.strptime(date_param, '%Y-%m-%d').date()
+            except ValueError:
+                return JsonResponse(
+                    {"error": "Invalid date format. Use YYYY-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            day = timezone.now().date()
+
+        remaining_transactions = {'buy': [], 'sell': []}
+        queries = _dashboard_queries(day, bool(date_param))
+
+        if force_calculate:
+            # Recalculation writes to every BUY/SELL row, so it has to finish
+            # before the read-only groups start
+            try:
+                profit_calculation_result = await sync_to_async(calculate_profits)(request)
+                if hasattr(profit_calculation_result, 'data'):
+                    remaining_transactions = profit_calculation_result.data.get(
+                        'remaining_transactions', {'buy': [], 'sell': []}
+                    )
+            except Exception as calc_error:
+                print(f"Error in profit calculation for dashboard: {calc_error}")
+        else:
+            queries['other_profit'] = _dashboard_other_profit
+
+        results = await _run_concurrently(queries)
+        other_profit_total = results.get('other_profit', Decimal('0.00'))
+
+        return JsonResponse(
+            _dashboard_payload(day, results, other_profit_total, remaining_transactions),
+            encoder=DjangoJSONEncoder
+        )
+    except Exception as e:
+        print(f"Async dashboard error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+async def stats_async(request):
+    """
+    Async (ASGI) version of the transaction stats endpoint
+    """
+    today = timezone.now()
+    today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    results = await _run_concurrently(_stats_queries(today_start))
+    return JsonResponse(_stats_payload(results))
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def create_transaction(request):
@@ -833,15 +1130,188 @@ def create_transaction(request):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
-            {"error": str(e)}, 
+            {"error": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+# Largest batch accepted by bulk_create_transactions
+MAX_BULK_TRANSACTIONS = 1000
+
+
+def _parse_created_at(value):
+    """Parse a client created_at the way create_transaction does; raises ValueError"""
+    from django.utils.dateparse import parse_datetime
+
+    custom_datetime = parse_datetime(value)
+    if custom_datetime is None:
+        try:
+            custom_datetime = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Unable to parse datetime format: {value}")
+    if custom_datetime.tzinfo is None:
+        return timezone.make_aware(custom_datetime)
+    return timezone.localtime(custom_datetime)
+
+
+def _validate_bulk_item(item):
+    """Return (validated_data, None) or (None, errors) for one bulk item"""
+    if not isinstance(item, dict):
+        return None, {'error': 'Each transaction must be an object'}
+    data = dict(item)
+
+    if data.get('created_at'):
+        try:
+            data['date_time'] = _parse_created_at(str(data['created_at']))
+        except ValueError as e:
+            return None, {'created_at': [f'Invalid datetime format: {str(e)}']}
+    data.pop('created_at', None)
+
+    if data.get('transaction_type') == 'OTHER':
+        if not data.get('customer'):
+            return None, {'customer': ['Customer field is required for OTHER transactions']}
+        if not data.get('remarks'):
+            return None, {'remarks': ['Remarks field is required for OTHER transactions']}
+        try:
+            if Decimal(str(data.get('thb_amount'))) <= 0:
+                return None, {'thb_amount': ['THB amount must be greater than zero for OTHER transactions']}
+        except InvalidOperation:
+            return None, {'thb_amount': ['A valid number is required.']}
+        data['profit'] = data['thb_amount']
+    else:
+        # BUY/SELL profit is set by the matching pass
+        data.setdefault('profit', '0')
+
+    serializer = TransactionSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.validated_data, None
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def bulk_create_transactions(request):
+    """
+    Create many transactions in one request.
+
+    Body: a list of transactions (same fields as create/), or
+    {"transactions": [...]}. Every item is validated on its own; the valid
+    ones are inserted with one bulk_create in one database transaction and
+    then BUY/SELL profits are re-matched once for the whole batch. Invalid
+    items are reported and skipped.
+
+    Returns one result per item, in order: {"index", "status": "created",
+    "transaction"} or {"index", "status": "error", "errors"}. The status code
+    is 201 when all were created, 207 when some were, 400 when none were.
+    """
+    from django.db import transaction as db_transaction
+    from .customers import assign_customer_refs
+    from .matching import apply_matching
+    from .signals import transactions_bulk_created
+
+    items = request.data.get('transactions') if isinstance(request.data, dict) else request.data
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'Expected a non-empty list of transactions'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > MAX_BULK_TRANSACTIONS:
+        return Response(
+            {'error': f'At most {MAX_BULK_TRANSACTIONS} transactions per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        validated, errors = _validate_bulk_item(item)
+        if errors is not None:
+            results[index] = {'index': index, 'status': 'error', 'errors': errors}
+        else:
+            valid.append((index, Transaction(**validated)))
+
+    matched = []
+    if valid:
+        new_transactions = [tx for _, tx in valid]
+        for tx in new_transactions:
+            tx.refresh_derived_fields()
+        try:
+            with db_transaction.atomic():
+                assign_customer_refs(new_transactions)
+                Transaction.objects.bulk_create(new_transactions, batch_size=500)
+                transactions_bulk_created(new_transactions)
+                matched_times = [tx.date_time for tx in new_transactions if tx.transaction_type in ('BUY', 'SELL')]
+                if matched_times:
+                    # Profits before the earliest new BUY/SELL cannot change
+                    matched = apply_matching(since=min(matched_times))
+        except Exception as e:
+            print(f"Error in bulk transaction create: {str(e)}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        profits = {tx.id: tx.profit for tx in matched}
+        for tx in new_transactions:
+            tx.profit = profits.get(tx.id, tx.profit)
+        for index, tx in valid:
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'transaction': TransactionSerializer(tx).data
+            }
+
+    created = len(valid)
+    failed = len(items) - created
+    print(f"Bulk create: {created} created, {failed} rejected, {len(matched)} profits re-matched")
+
+    if failed == 0:
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({
+        'created': created,
+        'failed': failed,
+        'profits_updated': len(matched),
+        'results': results
+    }, status=response_status)
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def import_transactions(request):
+    """
+    Import a CSV or XLSX ledger uploaded as the multipart field `file`.
+
+    Columns are matched by header (the export/ headers work); rows already
+    stored are skipped by fingerprint. Returns the import summary with the
+    first invalid rows and their line numbers.
+    """
+    from .importer import TransactionImportError, detect_format
+    from .importer import import_transactions as run_import
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload the ledger as the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        result = run_import(upload.file, file_format)
+    except TransactionImportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f"Error importing transactions: {str(e)}")
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    print(f"Imported {result['created']} of {result['rows']} rows from {upload.name}")
+    return Response(result)
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def export_transactions(request):
     """
-    Export transactions as a CSV file
+    Export transactions as a CSV file (file_format=csv.gz for a gzip-compressed
+    download), with file_format=parquet|arrow as a
+    typed columnar file (decimals, UTC timestamps, categorical type/customer),
+    or with file_format=xlsx as an Excel workbook with typed cells and
+    Transactions, Daily Summary and Balances sheets
     """
     try:
         # Get query parameters
@@ -849,83 +1319,37 @@ def export_transactions(request):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         
-        # Set up the queryset
-        queryset = Transaction.objects.all().order_by('date_time')
-        
-        # Apply filters based on period
-        today = timezone.now().date()
-        if period == 'today':
-            queryset = queryset.filter(date_time__date=today)
-        elif period == 'week':
-            week_start = today - timedelta(days=today.weekday())
-            queryset = queryset.filter(date_time__date__gte=week_start)
-        elif period == 'month':
-            month_start = today.replace(day=1)
-            queryset = queryset.filter(date_time__date__gte=month_start)
-        
-        # Apply custom date range if provided
-        if start_date:
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(date_time__date__gte=start)
-            except ValueError:
-                pass
-                
-        if end_date:
-            try:
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(date_time__date__lte=end)
-            except ValueError:
-                pass
+        queryset = transactions_export_queryset(period, start_date, end_date)
+        today = timezone.localdate()
+        
+        # file_format=parquet|arrow for typed columnar output (?format is DRF's renderer switch)
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format in COLUMNAR_FORMATS:
+            extension, content_type = COLUMNAR_FORMATS[file_format]
+            filename = f"money_exchange_transactions_{today.strftime('%Y-%m-%d')}.{extension}"
+            # Parquet writes its footer last, so the file is built first;
+            # the spooled file moves to disk once it outgrows memory
+            output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+            rows = write_columnar(queryset, output, file_format)
+            print(f"Exported {rows} transactions to {file_format} file: {filename}")
+            return download_response(file_chunks(output), filename, content_type)
+        if file_format == 'xlsx':
+            filename = f"money_exchange_transactions_{today.strftime('%Y-%m-%d')}.xlsx"
+            return xlsx_download(transaction_workbook_sheets(queryset), filename)
+        if file_format not in CSV_FORMATS:
+            return HttpResponse(
+                f"Unknown file_format: {file_format}. Use {', '.join([*CSV_FORMATS, *COLUMNAR_FORMATS, 'xlsx'])}.",
+                content_type="text/plain",
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Generate filename
         filename = f"money_exchange_transactions_{today.strftime('%Y-%m-%d')}.csv"
         
-        # Create a response object with CSV content type
-        response = HttpResponse(content_type='text/csv')
-        
-        # Set headers for file download - use stronger download forcing
-        response['Content-Disposition'] = f'attachment; filename="{filename}"; filename*=UTF-8\'\'{filename}'
-        
-        # Add CORS headers to ensure browser allows the download
-        response['Access-Control-Allow-Origin'] = '*'
-        response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Content-Disposition'
-        
-        # Add cache control to prevent caching
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        
-        # Create CSV writer
-        writer = csv.writer(response)
-        
-        # Write CSV header
-        writer.writerow([
-            'ID', 'Transaction Type', 'Date & Time', 'Customer Name',
-            'THB Amount', 'MMK Amount', 'Rate', '100K Rate', 'Profit', 'Remarks'
-        ])
-        
-        # Write transaction data
-        for transaction in queryset:
-            # Calculate 100K rate correctly
-            hundred_k_rate = 100000 / float(transaction.rate) if transaction.rate else 0
-            
-            writer.writerow([
-                transaction.id,
-                transaction.transaction_type,
-                transaction.date_time.strftime('%Y-%m-%d %H:%M:%S'),
-                transaction.customer,
-                float(transaction.thb_amount),
-                float(transaction.mmk_amount),
-                float(transaction.rate),
-                float(hundred_k_rate),
-                float(transaction.profit or 0),
-                transaction.remarks or ''  # Include remarks (empty string if None)
-            ])
-        
-        print(f"Exporting {queryset.count()} transactions to CSV file: {filename}")
-        return response
+        # Rows are read in chunks and written as they are produced, so memory
+        # stays flat and the download starts before the last row is read
+        print(f"Streaming transactions to CSV file: {filename}")
+        return csv_download(TRANSACTION_CSV_HEADER, transaction_csv_rows(queryset), filename, file_format)
     except Exception as e:
         print(f"Error exporting transactions: {str(e)}")
         import traceback
@@ -959,7 +1383,7 @@ class BankAccountViewSet(viewsets.ModelViewSet):
         
         return queryset
 
-class DailyBalanceViewSet(viewsets.ModelViewSet):
+class DailyBalanceViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = DailyBalance.objects.all()
     serializer_class = DailyBalanceSerializer
     permission_classes = [permissions.AllowAny]
@@ -993,22 +1417,22 @@ class DailyBalanceViewSet(viewsets.ModelViewSet):
         """
         Get the latest balance entry for each bank account
         """
-        # Get the latest date for which we have balance entries
-        latest_entry = DailyBalance.objects.order_by('-date').first()
-        
-        if not latest_entry:
+        # Each active account's most recent entry, picked by a window over the
+        # (bank_account, date) unique index, however long the history is
+        latest_balances = DailyBalance.objects.filter(bank_account__is_active=True).annotate(
+            recency=Window(RowNumber(), partition_by=[F('bank_account_id')], order_by=F('date').desc())
+        ).filter(recency=1).select_related('bank_account').order_by('bank_account__currency', 'bank_account__name')
+        latest_balances = list(latest_balances)
+        
+        if not latest_balances:
             return Response({
                 'message': 'No balance entries found'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        latest_date = latest_entry.date
-        
-        # Get all entries for the latest date
-        latest_balances = DailyBalance.objects.filter(date=latest_date)
         serializer = self.get_serializer(latest_balances, many=True)
         
         return Response({
-            'date': latest_date,
+            'date': max(balance.date for balance in latest_balances),
             'balances': serializer.data
         })
     
@@ -1032,43 +1456,73 @@ class DailyBalanceViewSet(viewsets.ModelViewSet):
                 'error': 'Invalid date format. Use YYYY-MM-DD'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        results = []
-        
-        for balance_data in balances:
-            account_id = balance_data.get('bank_account')
+        # Validate the whole batch first, then write it in one upsert
+        def account_key(balance_data):
+            try:
+                return int(balance_data.get('bank_account'))
+            except (TypeError, ValueError):
+                return None
+
+        results = [None] * len(balances)
+        valid = {}
+        account_ids = {account_key(item) for item in balances} - {None}
+        known_accounts = set(BankAccount.objects.filter(pk__in=account_ids).values_list('pk', flat=True))
+
+        for index, balance_data in enumerate(balances):
+            account_id = account_key(balance_data)
             balance_amount = balance_data.get('balance')
-            notes = balance_data.get('notes', '')
-            
+
             if not account_id or balance_amount is None:
-                results.append({
-                    'status': 'error',
-                    'error': 'Bank account ID and balance are required',
-                    'data': balance_data
-                })
+                error = 'Bank account ID and balance are required'
+            elif account_id not in known_accounts:
+                error = f'Bank account {account_id} not found'
+            else:
+                try:
+                    amount = Decimal(str(balance_amount))
+                    error = None if amount.is_finite() else 'Invalid balance'
+                except InvalidOperation:
+                    error = 'Invalid balance'
+            if error:
+                results[index] = {'status': 'error', 'error': error, 'data': balance_data}
                 continue
-            
+
+            if account_id in valid:
+                # The last entry for an account is the one saved
+                earlier = valid[account_id][0]
+                results[earlier] = {
+                    'status': 'error',
+                    'error': 'Duplicate bank account in batch; a later entry was saved',
+                    'data': balances[earlier]
+                }
+            valid[account_id] = (index, DailyBalance(
+                bank_account_id=account_id, date=date_obj, balance=amount, notes=balance_data.get('notes', '')
+            ))
+
+        if valid:
             try:
-                # Try to find existing entry for this account and date
-                entry, created = DailyBalance.objects.update_or_create(
-                    bank_account_id=account_id,
-                    date=date_obj,
-                    defaults={
-                        'balance': Decimal(str(balance_amount)),
-                        'notes': notes
-                    }
+                existing = set(DailyBalance.objects.filter(
+                    date=date_obj, bank_account_id__in=valid
+                ).order_by().values_list('bank_account_id', flat=True))
+                DailyBalance.objects.bulk_create(
+                    [entry for _, entry in valid.values()],
+                    update_conflicts=True,
+                    unique_fields=['bank_account', 'date'],
+                    update_fields=['balance', 'notes', 'updated_at']
                 )
-                
-                serializer = self.get_serializer(entry)
-                results.append({
-                    'status': 'created' if created else 'updated',
-                    'data': serializer.data
-                })
             except Exception as e:
-                results.append({
-                    'status': 'error',
-                    'error': str(e),
-                    'data': balance_data
-                })
+                print(f"Error saving balance batch: {str(e)}")
+                for index, _ in valid.values():
+                    results[index] = {'status': 'error', 'error': str(e), 'data': balances[index]}
+            else:
+                saved = DailyBalance.objects.filter(
+                    date=date_obj, bank_account_id__in=valid
+                ).select_related('bank_account')
+                for entry in saved:
+                    index = valid[entry.bank_account_id][0]
+                    results[index] = {
+                        'status': 'updated' if entry.bank_account_id in existing else 'created',
+                        'data': self.get_serializer(entry).data
+                    }
         
         return Response({
             'date': date,
@@ -1303,11 +1757,47 @@ def balance_summary(request):
             'error': 'An unexpected error occurred'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def balance_timeline(request):
+    """
+    Daily THB, MMK and MMK-in-THB totals from start_date to end_date
+    (default: the 90 days up to today). Days without entered balances or a
+    saved rate carry forward the last ones before them.
+    """
+    from .balances import MAX_TIMELINE_DAYS
+    from .balances import balance_timeline as build_timeline
+
+    try:
+        end_param = request.query_params.get('end_date')
+        end_date = datetime.strptime(end_param, '%Y-%m-%d').date() if end_param else timezone.now().date()
+        start_param = request.query_params.get('start_date')
+        start_date = datetime.strptime(start_param, '%Y-%m-%d').date() if start_param else end_date - timedelta(days=89)
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if start_date > end_date:
+        return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+    if (end_date - start_date).days >= MAX_TIMELINE_DAYS:
+        return Response(
+            {'error': f'At most {MAX_TIMELINE_DAYS} days per request'}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        timeline = build_timeline(start_date, end_date)
+    except Exception as e:
+        print(f"Error building balance timeline: {str(e)}")
+        return Response({'error': 'Error retrieving balance data'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if not timeline:
+        return Response({'error': 'No balance data found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'start_date': start_date, 'end_date': end_date, 'days': timeline})
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def export_balances(request):
     """
-    Export bank balances as a CSV file
+    Export bank balances as a CSV file (csv.gz compressed, or xlsx for Excel)
     """
     try:
         # Get query parameters
@@ -1318,9 +1808,9 @@ def export_balances(request):
             try:
                 date = datetime.strptime(date_param, '%Y-%m-%d').date()
             except ValueError:
-                date = timezone.now().date()
+                date = timezone.localdate()
         else:
-            date = timezone.now().date()
+            date = timezone.localdate()
         
         # Get all bank accounts
         accounts = BankAccount.objects.filter(is_active=True).order_by('currency', 'name')
@@ -1331,83 +1821,59 @@ def export_balances(request):
         # Create a mapping of account_id to balance
         balance_map = {b.bank_account_id: b for b in balances}
         
+        # csv, csv.gz for a compressed download, or xlsx
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in (*CSV_FORMATS, 'xlsx'):
+            return HttpResponse(
+                f"Unknown file_format: {file_format}. Use {', '.join([*CSV_FORMATS, 'xlsx'])}.",
+                content_type="text/plain",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         # Generate filename
         filename = f"bank_balances_{date}.csv"
         
-        # Create a response object with CSV content type
-        response = HttpResponse(content_type='text/csv')
-        
-        # Set headers for file download - use stronger download forcing
-        response['Content-Disposition'] = f'attachment; filename="{filename}"; filename*=UTF-8\'\'{filename}'
-        
-        # Add CORS headers to ensure browser allows the download
-        response['Access-Control-Allow-Origin'] = '*'
-        response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Content-Disposition'
-        
-        # Add cache control to prevent caching
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        
-        # Create CSV writer
-        writer = csv.writer(response)
-        
-        # Write CSV header
-        writer.writerow([
-            'Date', 'Currency', 'Bank Name', 'Balance', 'Notes'
-        ])
-        
-        # Write THB accounts first
-        thb_accounts = accounts.filter(currency='THB')
-        for account in thb_accounts:
-            balance = balance_map.get(account.id)
-            writer.writerow([
-                date,
-                'THB',
-                account.name,
-                float(balance.balance) if balance else 0,
-                balance.notes if balance and balance.notes else ''
-            ])
-        
-        # Write MMK accounts
-        mmk_accounts = accounts.filter(currency='MMK')
-        for account in mmk_accounts:
-            balance = balance_map.get(account.id)
-            writer.writerow([
-                date,
-                'MMK',
-                account.name,
-                float(balance.balance) if balance else 0,
-                balance.notes if balance and balance.notes else ''
-            ])
-        
-        # Write summary row
         rate_param = request.query_params.get('rate', '0.8')
         try:
             rate = Decimal(str(rate_param))
         except InvalidOperation:
             rate = Decimal('0.8')
         
-        # Calculate currency totals
-        thb_total = sum(float(balance_map.get(a.id).balance) if balance_map.get(a.id) else 0 for a in thb_accounts)
-        mmk_total = sum(float(balance_map.get(a.id).balance) if balance_map.get(a.id) else 0 for a in mmk_accounts)
-        
-        # Convert MMK to THB
-        mmk_in_thb = mmk_total / float(rate) if float(rate) > 0 else 0
-        grand_total_thb = thb_total + mmk_in_thb
-        
-        # Add summary rows
-        writer.writerow([])
-        writer.writerow(['Date', date, '', '', ''])
-        writer.writerow(['THB Total', thb_total, '', '', ''])
-        writer.writerow(['MMK Total', mmk_total, '', '', ''])
-        writer.writerow(['Exchange Rate (MMK/THB)', float(rate), '', '', ''])
-        writer.writerow(['MMK in THB', mmk_in_thb, '', '', ''])
-        writer.writerow(['Grand Total (THB)', grand_total_thb, '', '', ''])
+        def balance_rows():
+            # THB accounts first, then MMK
+            totals = {'THB': 0, 'MMK': 0}
+            for currency in ('THB', 'MMK'):
+                for account in accounts.filter(currency=currency).iterator():
+                    balance = balance_map.get(account.id)
+                    totals[currency] += float(balance.balance) if balance else 0
+                    yield [
+                        date,
+                        currency,
+                        account.name,
+                        float(balance.balance) if balance else 0,
+                        balance.notes if balance and balance.notes else ''
+                    ]
+            
+            # Convert MMK to THB
+            mmk_in_thb = totals['MMK'] / float(rate) if float(rate) > 0 else 0
+            grand_total_thb = totals['THB'] + mmk_in_thb
+            
+            # Add summary rows
+            yield []
+            yield ['Date', date, '', '', '']
+            yield ['THB Total', totals['THB'], '', '', '']
+            yield ['MMK Total', totals['MMK'], '', '', '']
+            yield ['Exchange Rate (MMK/THB)', float(rate), '', '', '']
+            yield ['MMK in THB', mmk_in_thb, '', '', '']
+            yield ['Grand Total (THB)', grand_total_thb, '', '', '']
+        
+        if file_format == 'xlsx':
+            return xlsx_download(
+                [('Balances', BALANCE_HEADER, balance_rows(), BALANCE_XLSX_FORMATS)], f"bank_balances_{date}.xlsx"
+            )
         
         print(f"Exporting bank balances for {date} to CSV file: {filename}")
-        return response
+        return csv_download(BALANCE_HEADER, balance_rows(), filename, file_format)
     except Exception as e:
         print(f"Error exporting balances: {str(e)}")
         import traceback
@@ -1420,8 +1886,10 @@ def export_balances(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@columnar_serializer(TransactionSerializer)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@renderer_classes(LIST_RENDERER_CLASSES)
 def list_transactions(request):
     # Get query parameters
     start_date = request.query_params.get('start_date')
@@ -1430,11 +1898,17 @@ def list_transactions(request):
     show_all = request.query_params.get('show_all', 'false').lower() == 'true'
     search = request.query_params.get('search', '')
     
-    # Pagination parameters
+    # Pagination parameters. A cursor (or pagination=cursor for the first
+    # page) switches to keyset pagination, which skips the OFFSET and COUNT
     page = int(request.query_params.get('page', 1))
     page_size = int(request.query_params.get('page_size', 10))
+    cursor = request.query_params.get('cursor')
+    use_cursor = cursor is not None or request.query_params.get('pagination') == 'cursor'
     
-    # Ordering parameters
+    # Sparse fieldset (?fields=id,customer,...); None means every field
+    fields = requested_fields(request, list(transaction_rows.fields))
+    
+    # Ordering parameters (ordering=relevance ranks search matches)
     ordering = request.query_params.get('ordering', '-date_time')
     
     # Debug logging
@@ -1445,12 +1919,9 @@ def list_transactions(request):
     # Initialize queryset with all transactions
     queryset = Transaction.objects.all()
     
-    # Apply search filter if provided
+    # Apply search filter if provided (full-text index; every token must match)
     if search:
-        queryset = queryset.filter(
-            Q(customer__icontains=search) |
-            Q(remarks__icontains=search)
-        )
+        queryset = search_transactions(queryset, search, rank=ordering == 'relevance')
     
     # If show_all is True, we don't apply date filters but still apply other filters
     if not show_all:
@@ -1490,9 +1961,38 @@ def list_transactions(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    # Amount, rate and profit ranges (min_mmk_amount=...&max_mmk_amount=...)
+    try:
+        queryset = apply_range_filters(queryset, request.query_params)
+    except ReportError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if use_cursor:
+        try:
+            transactions, next_cursor, previous_cursor = keyset_page(
+                transaction_rows.values(queryset, fields), cursor or None, page_size, ordering
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        print(f"Returning {len(transactions)} transactions by cursor")
+        
+        return Response({
+            'results': transaction_rows.serialize(transactions, fields),
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+            'has_next': next_cursor is not None,
+            'has_previous': previous_cursor is not None
+        })
+    
     # Apply ordering
+    if ordering == 'relevance':
+        ordering = ['-search_rank', '-date_time'] if search else ['-date_time']
+    else:
+        ordering = [ordering]
     try:
-        queryset = queryset.order_by(ordering)
+        queryset = queryset.order_by(*ordering)
     except:
         # Default ordering if invalid ordering field provided
         queryset = queryset.order_by('-date_time')
@@ -1503,16 +2003,14 @@ def list_transactions(request):
     # Apply pagination
     start_index = (page - 1) * page_size
     end_index = start_index + page_size
-    paginated_queryset = queryset[start_index:end_index]
+    # Read-only fast path: only the serialized columns, formatted without DRF field objects
+    results = transaction_rows.serialize(transaction_rows.values(queryset, fields)[start_index:end_index], fields)
     
     # Log the count of transactions being returned
-    print(f"Total transactions: {total_count}, returning page {page} with {len(paginated_queryset)} transactions")
-    
-    # Serialize and return with pagination info
-    serializer = TransactionSerializer(paginated_queryset, many=True)
+    print(f"Total transactions: {total_count}, returning page {page} with {len(results)} transactions")
     
     return Response({
-        'results': serializer.data,
+        'results': results,
         'count': total_count,
         'page': page,
         'page_size': page_size,
@@ -1640,17 +2138,175 @@ def last_transaction_time(request):
         print(f"Error getting last transaction time: {str(e)}")
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def sync_changes(request):
+    """
+    Delta sync for clients that keep a local copy.
+
+    Without `since` this returns every transaction, expense, daily balance
+    and exchange rate along with a token; passing that token back as
+    `since` returns only the rows changed since then plus the ids deleted
+    meanwhile, and a new token. A token older than the tombstone retention
+    (SYNC_TOMBSTONE_RETENTION_DAYS) gets a full snapshot ("full": true).
+    """
+    from .sync import changes_since
+
+    try:
+        payload = changes_since(request.query_params.get('since') or None)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    print(f"Sync: {', '.join(f'{name}={len(rows)}' for name, rows in payload['changes'].items())}")
+    return Response(payload)
+
+def _export_job_payload(request, job):
+    from django.urls import reverse
+
+    download_url = None
+    if job.status == 'done':
+        download_url = request.build_absolute_uri(reverse('export-job-download', args=[job.id]))
+    return {
+        'id': str(job.id),
+        'kind': job.kind,
+        'file_format': job.file_format,
+        'params': job.params,
+        'status': job.status,
+        'rows': job.rows,
+        'size': job.size,
+        'file_name': job.file_name or None,
+        'error': job.error or None,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+        'status_url': request.build_absolute_uri(reverse('export-job-status', args=[job.id])),
+        'download_url': download_url,
+    }
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def create_export_job(request):
+    """
+    Generate an export in the background instead of within the request.
+
+    Body: kind (transactions or daily_summary), file_format, and the
+    parameters of the matching export endpoint (period, start_date,
+    end_date / date). Returns the job with its status_url; poll it until
+    status is done and download from download_url. A request matching an
+    existing job at the current data version returns that job (200) rather
+    than queueing another (202).
+    """
+    from .exports import ExportError
+    from .export_jobs import submit_export
+
+    kind = request.data.get('kind', 'transactions')
+    file_format = str(request.data.get('file_format', 'csv')).lower()
+    try:
+        job, created = submit_export(kind, file_format, request.data)
+    except ExportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    print(f"Export job {job.id}: {'queued' if created else 'reused'} ({job.status})")
+    payload = _export_job_payload(request, job)
+    payload['reused'] = not created
+    return Response(payload, status=status.HTTP_200_OK if job.status == 'done' else status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def export_job_status(request, job_id):
+    """Status of a background export job, with download_url once it is done"""
+    from .models import ExportJob
+
+    job = ExportJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_export_job_payload(request, job))
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def download_export_job(request, job_id):
+    """
+    Download a finished export. Range requests are honoured (206 Partial
+    Content), so an interrupted download can resume from the bytes it has.
+    """
+    from .export_jobs import artifact_path, content_type
+    from .exports import ranged_file_response
+    from .models import ExportJob
+
+    job = ExportJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status != 'done':
+        return Response(
+            {'error': f'Export is not ready (status: {job.status})', 'status': job.status},
+            status=status.HTTP_409_CONFLICT
+        )
+    path = artifact_path(job)
+    if not path.exists():
+        return Response({'error': 'Export file has been removed; request it again'}, status=status.HTTP_410_GONE)
+
+    return ranged_file_response(request, path, job.file_name, content_type(job.file_format), f'"{job.id}-{job.size}"')
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def export_match_ledger(request):
+    """
+    Export which BUY was paired with which SELL by the profit matching, at
+    what rates and for what profit, as CSV (csv.gz) or Parquet.
+
+    Query parameters: start_date, end_date (YYYY-MM-DD; a match is dated
+    by its later transaction), file_format (csv, csv.gz or parquet)
+    """
+    from .exports import match_ledger_arrow_schema, match_ledger_csv_rows, record_batches, write_batches
+    from .matching import MATCH_LEDGER_HEADER, match_ledger_rows
+
+    try:
+        dates = {
+            name: datetime.strptime(request.query_params[name], '%Y-%m-%d').date()
+            if request.query_params.get(name) else None
+            for name in ('start_date', 'end_date')
+        }
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+    file_format = request.query_params.get('file_format', 'csv').lower()
+    if file_format not in (*CSV_FORMATS, 'parquet'):
+        return Response(
+            {'error': f"Unknown file_format: {file_format}. Use {', '.join([*CSV_FORMATS, 'parquet'])}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    rows = match_ledger_rows(dates['start_date'], dates['end_date'])
+    filename = f"match_ledger_{timezone.localdate().strftime('%Y-%m-%d')}"
+    if file_format == 'parquet':
+        # Parquet writes its footer last, so the file is built first
+        output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+        schema = match_ledger_arrow_schema()
+        count = write_batches(output, schema, record_batches(rows, schema), 'parquet')
+        print(f"Exported {count} matches to parquet file: {filename}.parquet")
+        return download_response(file_chunks(output), f'{filename}.parquet', COLUMNAR_FORMATS['parquet'][1])
+
+    print(f"Streaming match ledger to CSV file: {filename}.csv")
+    return csv_download(MATCH_LEDGER_HEADER, match_ledger_csv_rows(rows), f'{filename}.csv', file_format)
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def export_daily_summary(request):
     """
     Export daily summary data as a CSV file, similar to the dashboard's Recent Activity section
+    (file_format=csv.gz compressed, or xlsx for an Excel workbook)
     """
     try:
         # Get query parameters
         period = request.query_params.get('period', 'all')
         date_param = request.query_params.get('date')
         
+        # csv, csv.gz for a compressed download, or xlsx
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in (*CSV_FORMATS, 'xlsx'):
+            return Response(
+                {"error": f"Unknown file_format: {file_format}. Use {', '.join([*CSV_FORMATS, 'xlsx'])}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         # Set up the date range
         if date_param:
             try:
@@ -1661,84 +2317,27 @@ def export_daily_summary(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         else:
-            selected_date = timezone.now().date()
+            selected_date = timezone.localdate()
         
         # Determine date range based on period
-        if period == 'month':
-            # Get data for the month of the selected date
-            start_date = selected_date.replace(day=1)
-            if selected_date.month == 12:
-                next_month = selected_date.replace(year=selected_date.year + 1, month=1, day=1)
-            else:
-                next_month = selected_date.replace(month=selected_date.month + 1, day=1)
-            end_date = next_month - timedelta(days=1)
-            filename = f"daily_summary_{start_date.strftime('%Y-%m')}.csv"
-        else:
-            # Get all data
-            start_date = Transaction.objects.order_by('date_time').first()
-            if start_date:
-                start_date = start_date.date_time.date()
-            else:
-                start_date = selected_date  # Default to current date if no transactions
-            end_date = selected_date
-            filename = f"daily_summary_all_to_{selected_date.strftime('%Y-%m-%d')}.csv"
+        start_date, end_date, filename = daily_summary_range(period, selected_date)
         
         print(f"Exporting daily summary from {start_date} to {end_date}")
         
-        # Create a response object with CSV content type
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"; filename*=UTF-8\'\'{filename}'
-        
-        # Add CORS headers
-        response['Access-Control-Allow-Origin'] = '*'
-        response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Content-Disposition'
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        
-        # Create CSV writer
-        writer = csv.writer(response)
-        
-        # Write CSV header (similar to the Recent Activity table)
-        writer.writerow(['Date', 'Transactions', 'THB Volume', 'MMK Volume', 'Profit (THB)'])
-        
-        # Process each day in the range
-        current_date = start_date
-        daily_data = []
-        
-        while current_date <= end_date:
-            day_txns = Transaction.objects.filter(date_time__date=current_date)
-            
-            if day_txns.exists():
-                # Calculate daily summary data
-                thb_volume = day_txns.aggregate(Sum('thb_amount'))['thb_amount__sum'] or 0
-                mmk_volume = day_txns.aggregate(Sum('mmk_amount'))['mmk_amount__sum'] or 0
-                profit = day_txns.aggregate(Sum('profit'))['profit__sum'] or 0
-                count = day_txns.count()
-                
-                # Write data to CSV
-                writer.writerow([
-                    current_date.strftime('%Y-%m-%d'),
-                    count,
-                    float(thb_volume),
-                    float(mmk_volume),
-                    float(profit)
-                ])
-                
-                # Store data for logging
-                daily_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'transaction_count': count,
-                    'thb_volume': float(thb_volume),
-                    'mmk_volume': float(mmk_volume),
-                    'profit': float(profit),
-                })
-            
-            current_date += timedelta(days=1)
+        if file_format == 'xlsx':
+            return xlsx_download(
+                [('Daily Summary', DAILY_SUMMARY_CSV_HEADER, daily_summary_xlsx_rows(start_date, end_date),
+                  DAILY_SUMMARY_XLSX_FORMATS)],
+                filename.replace('.csv', '.xlsx')
+            )
         
-        print(f"Exported {len(daily_data)} days of daily summary data to CSV")
-        return response
+        # One grouped query for the whole range, streamed day by day
+        return csv_download(
+            DAILY_SUMMARY_CSV_HEADER,
+            daily_summary_csv_rows(start_date, end_date),
+            filename,
+            file_format
+        )
         
     except Exception as e:
         print(f"Error exporting daily summary: {str(e)}")
@@ -1785,7 +2384,7 @@ def calculate_daily_profits(request):
             print(f"Found {day_transactions.count()} transactions for {target_date}")
 
             # Reset profit values for this day's BUY/SELL transactions
-            day_transactions.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0)
+            day_transactions.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0, updated_at=timezone.now())
             
             # Handle 'OTHER' profit transactions - these have direct profit values
             other_transactions = day_transactions.filter(transaction_type='OTHER')
@@ -1959,6 +2558,8 @@ def calculate_daily_profits(request):
             print(f"Daily profit calculation complete for {target_date}")
             print(f"Buy/Sell profit: {buy_sell_profit}, Other profit: {other_profit}")
 
+        refresh_customer_totals(start_date=target_date, end_date=target_date)
+
         # Create or update DailyProfit record
         try:
             daily_profit, created = DailyProfit.objects.update_or_create(
@@ -2038,7 +2639,7 @@ def calculate_date_range_profits(request):
             print(f"Found {range_transactions.count()} transactions in date range {start_date} to {end_date}")
 
             # Reset profit values for this range's BUY/SELL transactions
-            range_transactions.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0)
+            range_transactions.filter(transaction_type__in=['BUY', 'SELL']).update(profit=0, updated_at=timezone.now())
             
             # Handle 'OTHER' profit transactions - these have direct profit values
             other_transactions = range_transactions.filter(transaction_type='OTHER')
@@ -2245,6 +2846,11 @@ def calculate_date_range_profits(request):
             print(f"Date range profit calculation complete for {start_date} to {end_date}")
             print(f"Buy/Sell profit: {buy_sell_profit}, Other profit: {other_profit}")
 
+        refresh_customer_totals(start_date=start_date, end_date=end_date)
+
+        # Stored per-day totals for the same range, from the prefix-sum index
+        daily_totals = profit_index.range_totals(start_date, end_date)
+
         # Return comprehensive result
         return Response({
             'start_date': start_date.strftime('%Y-%m-%d'),
@@ -2253,7 +2859,8 @@ def calculate_date_range_profits(request):
             'other_profit': float(other_profit),
             'total_profit': float(buy_sell_profit + other_profit),
             'transaction_count': range_transactions.count(),
-            'profit_details': profit_details
+            'profit_details': profit_details,
+            'daily_totals': daily_totals
         })
 
     except Exception as e:
@@ -2263,7 +2870,7 @@ def calculate_date_range_profits(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class DailyProfitViewSet(viewsets.ModelViewSet):
+class DailyProfitViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = DailyProfit.objects.all()
     serializer_class = DailyProfitSerializer
     permission_classes = [permissions.AllowAny]
@@ -2275,7 +2882,43 @@ class DailyProfitViewSet(viewsets.ModelViewSet):
         """
         return calculate_daily_profits(request._request)  # Use the original Django request
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def range_totals(self, request):
+        """
+        Profit, volume and transaction count totals for a date range, served
+        from the in-process prefix-sum index (rebuilt when the data changes)
+        """
+        start_date_str = request.query_params.get('start_date')
+        end_date_str = request.query_params.get('end_date')
+
+        if not start_date_str or not end_date_str:
+            return Response(
+                {"error": "Both start_date and end_date are required. Use YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if start_date > end_date:
+            return Response(
+                {"error": "start_date must be less than or equal to end_date."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            **profit_index.range_totals(start_date, end_date)
+        })
+
+class ExpenseViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Expense.objects.all().order_by('-date', '-created_at')
     serializer_class = ExpenseSerializer
     permission_classes = [permissions.AllowAny]
@@ -2350,9 +2993,12 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             elif start_date and end_date:
                 queryset = queryset.filter(date__range=[start_date, end_date])
 
-            serializer = self.get_serializer(queryset, many=True)
+            serializer = self.get_serializer(self.narrow_queryset(queryset), many=True)
             print(f"Successfully retrieved expenses: {len(serializer.data)} items")
             return Response(serializer.data)
+        except ValidationError:
+            # Unknown ?fields= names: a 400 naming the valid fields, as on the other viewsets
+            raise
         except Exception as e:
             print(f"Failed to list expenses: {str(e)}")
             return Response(